@@ -0,0 +1,128 @@
+"""
+Animación de deslizamiento y fusión de fichas con presupuesto por fotograma.
+
+AnimadorFichas no sabe nada de wx: recibe los desplazamientos del último
+movimiento (Logica2048.desplazamientos), descarta las fichas que no se
+mueven y, en cada fotograma, devuelve solo las posiciones interpoladas de
+las que sí lo hacen. La posición depende del tiempo transcurrido y no del
+número de fotogramas, así que un fotograma tardío se salta (se cuenta como
+perdido) en vez de alargar la animación; si el dibujo se pasa del
+presupuesto varias veces seguidas, la animación termina de golpe.
+"""
+import math
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from game_logic import Desplazamiento
+
+DURACION_S = 0.1
+INTERVALO_S = 1 / 60 # Presupuesto de cada fotograma
+# Fotogramas seguidos por encima del presupuesto antes de saltar al final
+MAX_SOBRE_PRESUPUESTO = 2
+
+Posicion = Tuple[int, int]
+
+
+class FichaAnimada(NamedTuple):
+    valor: int
+    fila: float
+    columna: float
+
+
+def suavizar(t: float) -> float:
+    """Curva de salida cúbica: rápida al principio, frena al llegar."""
+    return 1 - (1 - t) ** 3
+
+
+def celdas_cubiertas(ficha: FichaAnimada) -> List[Tuple[Posicion, float, float]]:
+    """
+    Celdas que pisa una ficha en movimiento (como mucho dos: se mueve en un
+    solo eje) con su desplazamiento respecto a cada una, en celdas.
+    """
+    resultado = []
+    for r in {math.floor(ficha.fila), math.ceil(ficha.fila)}:
+        for c in {math.floor(ficha.columna), math.ceil(ficha.columna)}:
+            resultado.append(((r, c), ficha.fila - r, ficha.columna - c))
+    return resultado
+
+
+class AnimadorFichas:
+    def __init__(self, duracion: float = DURACION_S, intervalo: float = INTERVALO_S,
+                 reloj: Callable[[], float] = time.perf_counter):
+        self.duracion = duracion
+        self.intervalo = intervalo
+        self.reloj = reloj
+        self.moviles: List[Desplazamiento] = []
+        self.ocultas: Set[Posicion] = set() # Celdas que muestran el valor final antes de tiempo
+        self._inicio = 0.0
+        self._ultimo = 0.0
+        self.fotogramas = 0
+        self.perdidos = 0
+        self.coste_total = 0.0
+        self.coste_max = 0.0
+        self._sobre_presupuesto = 0
+        self.activa = False
+
+    def iniciar(self, desplazamientos: Iterable[Desplazamiento],
+                ocultas: Iterable[Posicion] = ()) -> bool:
+        """
+        Prepara una animación. 'ocultas' son celdas extra que se muestran vacías
+        hasta el final (la ficha nueva). Devuelve False si no hay nada que mover.
+        """
+        self.moviles = [d for d in desplazamientos if d.origen != d.destino or d.fusion]
+        if not self.moviles:
+            self.activa = False
+            return False
+        self.ocultas = {d.destino for d in self.moviles} | set(ocultas)
+        self._inicio = self._ultimo = self.reloj()
+        self.fotogramas = 0
+        self.perdidos = 0
+        self.coste_total = 0.0
+        self.coste_max = 0.0
+        self._sobre_presupuesto = 0
+        self.activa = True
+        return True
+
+    def fotograma(self) -> Optional[List[FichaAnimada]]:
+        """Posiciones de las fichas móviles en este instante; None si la animación acabó."""
+        if not self.activa:
+            return None
+        ahora = self.reloj()
+        # Huecos de más de un intervalo: los fotogramas que debían ir en medio se perdieron
+        retraso = ahora - self._ultimo
+        if self.fotogramas and retraso > 1.5 * self.intervalo:
+            self.perdidos += int(retraso / self.intervalo + 0.5) - 1
+        self._ultimo = ahora
+        t = (ahora - self._inicio) / self.duracion if self.duracion > 0 else 1.0
+        if t >= 1.0 or self._sobre_presupuesto >= MAX_SOBRE_PRESUPUESTO:
+            self.activa = False
+            return None
+        self.fotogramas += 1
+        k = suavizar(t)
+        return [FichaAnimada(d.valor,
+                             d.origen[0] + (d.destino[0] - d.origen[0]) * k,
+                             d.origen[1] + (d.destino[1] - d.origen[1]) * k)
+                for d in self.moviles]
+
+    def registrar_coste(self, segundos: float) -> None:
+        """Tiempo que tardó en dibujarse el último fotograma."""
+        self.coste_total += segundos
+        self.coste_max = max(self.coste_max, segundos)
+        if segundos > self.intervalo:
+            self._sobre_presupuesto += 1
+        else:
+            self._sobre_presupuesto = 0
+
+    def terminar(self) -> Dict[str, float]:
+        """Corta la animación (p. ej. al llegar otra tecla) y devuelve el informe."""
+        self.activa = False
+        return self.informe()
+
+    def informe(self) -> Dict[str, float]:
+        return {
+            'fotogramas': self.fotogramas,
+            'perdidos': self.perdidos,
+            'fichas': len(self.moviles),
+            'coste_medio_ms': 1000 * self.coste_total / self.fotogramas if self.fotogramas else 0.0,
+            'coste_max_ms': 1000 * self.coste_max,
+        }
@@ -0,0 +1,98 @@
+"""Planificador de anuncios para el lector de pantalla."""
+import time
+from collections import deque
+from typing import Callable, Deque, Optional
+
+
+class PlanificadorAnuncios:
+    """
+    Se sitúa entre el juego y la notificación WinAPI de la celda enfocada.
+
+    Los anuncios de una misma pulsación se unen en un solo texto; los de una
+    pulsación anterior que aún no se han emitido quedan sustituidos por los
+    nuevos, así el lector solo oye el estado actual. Las emisiones se agrupan
+    en una ventana corta y se limitan a una cada 'intervalo_min_ms'.
+    """
+    def __init__(self,
+                 emitir: Callable[[str], None],
+                 programar: Callable[[int, Callable[[], None]], None],
+                 reloj: Callable[[], float] = time.monotonic,
+                 ventana_ms: int = 60,
+                 intervalo_min_ms: int = 120,
+                 max_historial: int = 20):
+        self.emitir = emitir
+        self.programar = programar
+        self.reloj = reloj
+        self.ventana_ms = ventana_ms
+        self.intervalo_min_ms = intervalo_min_ms
+        self.historial: Deque[str] = deque(maxlen=max_historial)
+
+        self._pendiente: Optional[str] = None
+        self._generacion_pendiente = -1
+        self._generacion = 0
+        self._programado = False
+        self._ultima_emision = float('-inf')
+
+        # Estadísticas
+        self.recibidos = 0
+        self.emitidos = 0
+        self.sustituidos = 0
+
+    def nueva_entrada(self) -> None:
+        """Marca el inicio de una nueva pulsación: lo pendiente pasa a ser obsoleto."""
+        self._generacion += 1
+
+    def anunciar(self, mensaje: str, historial: bool = True, inmediato: bool = False) -> None:
+        """
+        Encola un anuncio. Un mensaje vacío pide releer la celda enfocada.
+        'inmediato' lo emite ya (p. ej. antes de abrir un diálogo modal).
+        """
+        self.recibidos += 1
+        if mensaje and historial and (not self.historial or self.historial[-1] != mensaje):
+            self.historial.append(mensaje)
+
+        if self._pendiente is None:
+            self._pendiente = mensaje
+        elif self._generacion_pendiente == self._generacion:
+            # Misma pulsación: se combinan
+            if mensaje and mensaje != self._pendiente:
+                self._pendiente = f"{self._pendiente}. {mensaje}" if self._pendiente else mensaje
+        else:
+            # Pulsación más reciente: el anuncio anterior ya no es el estado actual
+            self._pendiente = mensaje
+            self.sustituidos += 1
+        self._generacion_pendiente = self._generacion
+
+        if inmediato:
+            self._emitir_pendiente()
+        elif not self._programado:
+            self._programado = True
+            self.programar(self._retardo_ms(), self._vaciar)
+
+    def cancelar(self) -> None:
+        self._pendiente = None
+
+    def _retardo_ms(self) -> int:
+        transcurrido = (self.reloj() - self._ultima_emision) * 1000.0
+        return int(max(self.ventana_ms, self.intervalo_min_ms - transcurrido))
+
+    def _vaciar(self) -> None:
+        self._programado = False
+        if self._pendiente is None:
+            return
+        transcurrido = (self.reloj() - self._ultima_emision) * 1000.0
+        if transcurrido < self.intervalo_min_ms:
+            # Aún dentro del límite de frecuencia: reintentar más tarde
+            self._programado = True
+            self.programar(int(self.intervalo_min_ms - transcurrido), self._vaciar)
+            return
+        self._emitir_pendiente()
+
+    def _emitir_pendiente(self) -> None:
+        if self._pendiente is None:
+            return
+        mensaje = self._pendiente
+        self._pendiente = None
+        self._ultima_emision = self.reloj()
+        self.emitidos += 1
+        self.emitir(mensaje)
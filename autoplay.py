@@ -0,0 +1,59 @@
+"""Juego automático sobre Logica2048 usando el motor de sugerencias."""
+import time
+from typing import Callable, List, Optional
+
+from game_logic import Logica2048
+from hint_engine import buscar
+
+
+class Autojugador:
+    """
+    Aplica movimientos elegidos por el motor de sugerencias sin guardar en
+    disco en cada jugada. No sabe nada de la UI: quien lo use decide cuándo
+    dibujar y cuándo guardar.
+    """
+    def __init__(self, juego: Logica2048, profundidad: int = 1,
+                 elegir: Optional[Callable[[List[List[int]]], str]] = None,
+                 al_mover: Optional[Callable[[str], None]] = None):
+        self.juego = juego
+        self.profundidad = profundidad
+        self.elegir = elegir or self._elegir_por_defecto
+        self.al_mover = al_mover
+        self.movimientos = 0
+        self.terminado = False
+        self.inicio = time.perf_counter()
+
+    def _elegir_por_defecto(self, tablero: List[List[int]]) -> str:
+        if self.profundidad <= 1:
+            return self.juego.obtener_sugerencia()
+        return buscar(tablero, self.profundidad).direccion
+
+    def paso(self) -> bool:
+        """Hace un movimiento. Devuelve False si la partida ha terminado."""
+        if self.terminado:
+            return False
+        direccion = self.elegir(self.juego.tablero)
+        if direccion == "Ninguna" or not self.juego.mover(direccion, guardar=False):
+            self.terminado = True
+            return False
+        self.movimientos += 1
+        if self.al_mover is not None:
+            self.al_mover(direccion)
+        if self.juego.juego_terminado():
+            self.terminado = True
+        return True
+
+    def ejecutar(self, max_movimientos: int, presupuesto_s: Optional[float] = None) -> int:
+        """Hace hasta max_movimientos sin pasar del presupuesto de tiempo. Devuelve los hechos."""
+        limite = time.perf_counter() + presupuesto_s if presupuesto_s is not None else None
+        hechos = 0
+        while hechos < max_movimientos and self.paso():
+            hechos += 1
+            if limite is not None and time.perf_counter() >= limite:
+                break
+        return hechos
+
+    @property
+    def movimientos_por_segundo(self) -> float:
+        transcurrido = time.perf_counter() - self.inicio
+        return self.movimientos / transcurrido if transcurrido > 0 else 0.0
@@ -0,0 +1,293 @@
+"""
+Sesión de juego compacta para servidores y simulaciones.
+
+SesionCompacta sigue las reglas de Logica2048 (mismo orden de consumo del
+generador aleatorio, así que con la misma semilla las partidas coinciden)
+pero guarda el tablero como un bytearray de exponentes y el historial de
+deshacer como registros de tamaño fijo en otro bytearray. No tiene
+__dict__, ni narrativa, ni ajustes, y su constructor no toca el disco.
+
+    python compact_session.py --sesiones 20000   # mide bytes por sesión
+"""
+import argparse
+import random
+import struct
+import sys
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from constants import VALOR_VICTORIA
+from game_logic import Logica2048
+
+Tablero = List[List[int]]
+
+MAX_HISTORIAL = 3 # Igual que Logica2048
+_PUNTOS = struct.Struct('<I') # Puntuación en cada registro del historial
+
+_LINEAS: Dict[Tuple[int, str], List[List[int]]] = {}
+
+
+def lineas_tablero(n: int, direccion: str) -> List[List[int]]:
+    """Índices de cada línea en el orden en que se desliza (la celda destino primero)."""
+    clave = (n, direccion)
+    lineas = _LINEAS.get(clave)
+    if lineas is None:
+        if direccion == 'IZQUIERDA':
+            lineas = [[r * n + c for c in range(n)] for r in range(n)]
+        elif direccion == 'DERECHA':
+            lineas = [[r * n + c for c in reversed(range(n))] for r in range(n)]
+        elif direccion == 'ARRIBA':
+            lineas = [[r * n + c for r in range(n)] for c in range(n)]
+        elif direccion == 'ABAJO':
+            lineas = [[r * n + c for r in reversed(range(n))] for c in range(n)]
+        else:
+            raise ValueError(f"Dirección desconocida: {direccion}")
+        _LINEAS[clave] = lineas
+    return lineas
+
+
+def _exponente(valor: int) -> int:
+    return valor.bit_length() - 1 if valor else 0
+
+
+class SesionCompacta:
+    __slots__ = ('tamano', 'celdas', 'historial', 'puntuacion', 'max_ficha',
+                 'high_score', 'hitos', 'ganado', 'victoria_anunciada', 'sin_records')
+
+    def __init__(self, tamano: int = 4, iniciar: bool = True):
+        self.tamano = tamano
+        self.celdas = bytearray(tamano * tamano) # Exponentes: 0 vacía, 1 = 2, 2 = 4...
+        self.historial = bytearray() # Registros: celdas + puntuación (uint32) + exponente máximo
+        self.puntuacion = 0
+        self.max_ficha = 0
+        self.high_score = 0
+        self.hitos = 0 # Bit e activo: hito 2^e alcanzado
+        self.ganado = False
+        self.victoria_anunciada = False
+        self.sin_records = False # Partida de desafío: no mueve el récord
+        if iniciar:
+            self.iniciar_juego()
+
+    # --- Reglas ---
+    def iniciar_juego(self) -> None:
+        self.celdas = bytearray(self.tamano * self.tamano)
+        self.historial = bytearray()
+        self.puntuacion = 0
+        self.max_ficha = 0
+        self.sin_records = False
+        self.agregar_ficha_random()
+        self.agregar_ficha_random()
+
+    def agregar_ficha_random(self) -> Optional[Tuple[int, int, int]]:
+        # Mismo orden de llamadas que Logica2048.agregar_ficha_random
+        libres = [i for i, e in enumerate(self.celdas) if not e]
+        if not libres:
+            return None
+        i = random.choice(libres)
+        valor = 4 if random.random() > 0.9 else 2
+        self.celdas[i] = _exponente(valor)
+        return divmod(i, self.tamano) + (valor,)
+
+    def _tamano_registro(self) -> int:
+        return self.tamano * self.tamano + _PUNTOS.size + 1
+
+    def mover(self, direccion: str, guardar: bool = False) -> bool:
+        """
+        Aplica un movimiento y añade la ficha nueva. 'guardar' existe solo por
+        compatibilidad con Logica2048: una sesión compacta nunca escribe a disco.
+        """
+        antes = self.celdas
+        nuevo = bytearray(antes)
+        puntos = 0
+        for linea in lineas_tablero(self.tamano, direccion):
+            fichas = [antes[i] for i in linea if antes[i]]
+            j = 0
+            k = 0
+            while k < len(fichas):
+                e = fichas[k]
+                if k + 1 < len(fichas) and fichas[k + 1] == e:
+                    e += 1
+                    puntos += 1 << e
+                    k += 2
+                else:
+                    k += 1
+                nuevo[linea[j]] = e
+                j += 1
+            for i in linea[j:]:
+                nuevo[i] = 0
+        if nuevo == antes:
+            return False
+
+        registro = bytes(antes) + _PUNTOS.pack(self.puntuacion) + bytes([_exponente(self.max_ficha)])
+        self.historial += registro
+        if len(self.historial) > MAX_HISTORIAL * len(registro):
+            del self.historial[:len(registro)]
+
+        self.celdas = nuevo
+        self.puntuacion += puntos
+        if self.puntuacion > self.high_score and not self.sin_records:
+            self.high_score = self.puntuacion
+        self.agregar_ficha_random()
+        maximo = 1 << max(self.celdas)
+        if maximo > self.max_ficha:
+            self.max_ficha = maximo
+            if maximo >= VALOR_VICTORIA:
+                self.ganado = True
+        return True
+
+    def deshacer(self) -> bool:
+        tam = self._tamano_registro()
+        if len(self.historial) < tam:
+            return False
+        registro = self.historial[-tam:]
+        del self.historial[-tam:]
+        n = self.tamano * self.tamano
+        self.celdas = bytearray(registro[:n])
+        (self.puntuacion,) = _PUNTOS.unpack_from(registro, n)
+        e = registro[-1]
+        self.max_ficha = 1 << e if e else 0
+        return True
+
+    def celdas_libres(self) -> List[Tuple[int, int]]:
+        return [divmod(i, self.tamano) for i, e in enumerate(self.celdas) if not e]
+
+    def juego_terminado(self) -> bool:
+        c = self.celdas
+        n = self.tamano
+        if 0 in c:
+            return False
+        for r in range(n):
+            for col in range(n):
+                e = c[r * n + col]
+                if col + 1 < n and c[r * n + col + 1] == e:
+                    return False
+                if r + 1 < n and c[(r + 1) * n + col] == e:
+                    return False
+        return True
+
+    @property
+    def tablero(self) -> Tablero:
+        """Tablero con valores (una copia nueva en cada acceso)."""
+        n = self.tamano
+        c = self.celdas
+        return [[1 << e if e else 0 for e in c[r * n:(r + 1) * n]] for r in range(n)]
+
+    @property
+    def hitos_alcanzados(self) -> List[int]:
+        return [1 << e for e in range(self.hitos.bit_length()) if self.hitos >> e & 1]
+
+    # --- Conversión ---
+    def _tablero_de(self, datos: bytes) -> Tablero:
+        n = self.tamano
+        return [[1 << e if e else 0 for e in datos[r * n:(r + 1) * n]] for r in range(n)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Mismo esquema que Logica2048.to_dict (más el tamaño)."""
+        tam = self._tamano_registro()
+        n = self.tamano * self.tamano
+        historia = []
+        for i in range(0, len(self.historial), tam):
+            registro = self.historial[i:i + tam]
+            e = registro[-1]
+            historia.append({
+                'tablero': self._tablero_de(registro[:n]),
+                'puntuacion': _PUNTOS.unpack_from(registro, n)[0],
+                'max_ficha': 1 << e if e else 0,
+            })
+        return {
+            'tamano': self.tamano,
+            'tablero': self.tablero,
+            'puntuacion': self.puntuacion,
+            'max_ficha': self.max_ficha,
+            'high_score': self.high_score,
+            'history': historia,
+            'ganado': self.ganado,
+            'victoria_anunciada': self.victoria_anunciada,
+            'hitos_alcanzados': self.hitos_alcanzados,
+            'sin_records': self.sin_records,
+        }
+
+    def from_dict(self, data: Any) -> bool:
+        """Restaura desde el formato de Logica2048.to_dict. Devuelve False si no encaja."""
+        if not isinstance(data, dict):
+            return False
+        tablero = data.get('tablero')
+        n = self.tamano
+        if not (isinstance(tablero, list) and len(tablero) == n
+                and all(isinstance(fila, list) and len(fila) == n for fila in tablero)):
+            return False
+        try:
+            celdas = bytearray(_exponente(int(v)) for fila in tablero for v in fila)
+            historial = bytearray()
+            for estado in list(data.get('history', []))[-MAX_HISTORIAL:]:
+                historial += bytes(_exponente(int(v)) for fila in estado['tablero'] for v in fila)
+                historial += _PUNTOS.pack(int(estado['puntuacion']))
+                historial.append(_exponente(int(estado['max_ficha'])))
+            high_score = int(data.get('high_score', self.high_score))
+            puntuacion = int(data.get('puntuacion', 0))
+            max_ficha = int(data.get('max_ficha', 0))
+            hitos = 0
+            for hito in data.get('hitos_alcanzados', []):
+                hitos |= 1 << _exponente(int(hito))
+        except (KeyError, TypeError, ValueError, struct.error):
+            return False
+        # Todo validado: un diccionario rechazado no deja la sesión a medias
+        self.celdas = celdas
+        self.historial = historial
+        self.high_score = high_score
+        self.puntuacion = puntuacion
+        self.max_ficha = max_ficha
+        self.ganado = bool(data.get('ganado', False))
+        self.victoria_anunciada = bool(data.get('victoria_anunciada', False))
+        self.hitos = hitos
+        self.sin_records = bool(data.get('sin_records', False))
+        return True
+
+    @classmethod
+    def desde_logica(cls, juego: Logica2048) -> "SesionCompacta":
+        sesion = cls(juego.tamano, iniciar=False)
+        sesion.from_dict(juego.to_dict())
+        return sesion
+
+    def a_logica(self, crear: Callable[[int], Logica2048] = Logica2048) -> Logica2048:
+        """Crea una Logica2048 con este estado (su constructor sí lee los ajustes)."""
+        juego = crear(self.tamano)
+        juego.from_dict(self.to_dict())
+        return juego
+
+
+def medir_bytes_por_sesion(crear: Callable[[], Any], sesiones: int, movimientos: int = 20,
+                           semilla: int = 0) -> float:
+    """Memoria media por sesión residente (tracemalloc), tras unos movimientos en cada una."""
+    random.seed(semilla)
+    direcciones = ('IZQUIERDA', 'ABAJO', 'DERECHA', 'ABAJO')
+    tracemalloc.start()
+    try:
+        base = tracemalloc.take_snapshot()
+        residentes = []
+        for _ in range(sesiones):
+            juego = crear()
+            for i in range(movimientos):
+                juego.mover(direcciones[i % len(direcciones)], guardar=False)
+            residentes.append(juego)
+        final = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    total = sum(s.size_diff for s in final.compare_to(base, 'filename'))
+    return total / sesiones
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Memoria por sesión: Logica2048 frente a SesionCompacta")
+    parser.add_argument('--sesiones', type=int, default=10000)
+    parser.add_argument('--movimientos', type=int, default=20)
+    args = parser.parse_args(argv)
+    for nombre, crear in (("Logica2048", Logica2048), ("SesionCompacta", SesionCompacta)):
+        por_sesion = medir_bytes_por_sesion(crear, args.sesiones, args.movimientos)
+        print(f"{nombre}: {por_sesion:.0f} bytes/sesión, "
+              f"{por_sesion * 100000 / 2 ** 20:.0f} MiB por cada 100k sesiones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,19 @@
 # Game Configuration
 ARCHIVO_GUARDADO = "savegame.json"
 ARCHIVO_AJUSTES = "settings.json"
+ARCHIVO_BD = "game_data.db"
+PERFIL_DEFECTO = "Jugador"
+ARCHIVO_REPETICION = "replay.json"
+ARCHIVO_PESOS = "hint_weights.json"
+ARCHIVO_NTUPLAS = "ntuple_weights.bin"
+ARCHIVO_LIBRO = "opening_book.bin"
+ARCHIVO_BLOQUEOS = "ui_stalls.log"
+ARCHIVO_DESAFIOS = "desafios.bin"
 VALOR_VICTORIA = 2048
+# Tamaños de tablero admitidos (interfaz y servidor)
+TAMANO_MINIMO = 4
+TAMANO_MAXIMO = 10
+TAMANO_DEFECTO = 4
 
 # UI Colors - Standard
 COLOR_FONDO_TABLERO = (187, 173, 160)
@@ -44,6 +56,7 @@ COLORES_TEXTO_HC = {
 }
 
 # Windows Accessibility Constants
+EVENT_OBJECT_FOCUS = 0x8005
 EVENT_OBJECT_NAMECHANGE = 0x800C
 OBJID_CLIENT = -4
 CHILDID_SELF = 0
@@ -0,0 +1,185 @@
+"""
+Evaluador heurístico basado en tablas por línea.
+
+Cada fila y columna se empaqueta como un entero (4 bits por celda con el
+exponente de la ficha) y su puntuación se busca en una tabla precalculada.
+La puntuación de un tablero es la suma de n búsquedas de filas y n de
+columnas, así que el coste por evaluación no depende de los términos.
+"""
+import json
+import logging
+import os
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+from constants import ARCHIVO_PESOS
+
+Tablero = List[List[int]]
+
+PESOS_DEFECTO: Dict[str, float] = {
+    'vacias': 270.0,         # Celdas libres
+    'fusiones': 700.0,       # Parejas adyacentes iguales (fusiones posibles)
+    'monotonicidad': 47.0,   # Penalización por líneas no monótonas
+    'suavidad': 10.0,        # Penalización por saltos de exponente entre vecinas
+}
+POTENCIA_MONOTONIA = 4.0
+
+
+def cargar_pesos_evaluador(ruta: str = ARCHIVO_PESOS) -> Dict[str, float]:
+    """
+    Pesos ajustados con tune_weights.py (comparte archivo con los de
+    obtener_sugerencia); las claves ausentes o inválidas toman el valor por defecto.
+    """
+    pesos = dict(PESOS_DEFECTO)
+    if os.path.exists(ruta):
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for clave in pesos:
+                if clave in data:
+                    pesos[clave] = float(data[clave])
+        except Exception as e:
+            logging.error(f"Error cargando pesos del evaluador: {e}")
+    return pesos
+
+BITS = 4
+MASCARA = (1 << BITS) - 1
+# Hasta 2^15 la línea cabe en 4 bits por celda; por encima se usa la tabla perezosa
+MAX_EXP_TABLA = MASCARA
+# Líneas recordadas por la tabla perezosa (LRU); tantas como la tabla 4x4
+MAX_TABLA_PEREZOSA = 1 << 16
+
+_EXPONENTES: Dict[int, int] = {0: 0}
+for _e in range(1, 32):
+    _EXPONENTES[1 << _e] = _e
+# Solo los valores que caben en la tabla 4x4 (un KeyError indica la vía perezosa)
+_NIBBLES: Dict[int, int] = {v: e for v, e in _EXPONENTES.items() if e <= MAX_EXP_TABLA}
+
+
+def exponentes(linea: Sequence[int]) -> List[int]:
+    return [_EXPONENTES[v] for v in linea]
+
+
+def empaquetar(exps: Sequence[int]) -> int:
+    """Empaqueta exponentes (celda 0 en los bits bajos)."""
+    clave = 0
+    for i, e in enumerate(exps):
+        clave |= e << (BITS * i)
+    return clave
+
+
+def desempaquetar(clave: int, n: int) -> List[int]:
+    return [(clave >> (BITS * i)) & MASCARA for i in range(n)]
+
+
+def puntuar_linea(exps: Sequence[int], pesos: Dict[str, float]) -> float:
+    """Puntuación heurística de una línea de exponentes (cálculo directo, sin tabla)."""
+    n = len(exps)
+    vacias = 0
+    fusiones = 0
+    previo = 0
+    for e in exps:
+        if e == 0:
+            vacias += 1
+        else:
+            if e == previo:
+                fusiones += 1
+            previo = e
+
+    mono_izq = 0.0
+    mono_der = 0.0
+    suavidad = 0.0
+    for i in range(1, n):
+        a, b = exps[i - 1], exps[i]
+        if a > b:
+            mono_izq += a ** POTENCIA_MONOTONIA - b ** POTENCIA_MONOTONIA
+        else:
+            mono_der += b ** POTENCIA_MONOTONIA - a ** POTENCIA_MONOTONIA
+        if a and b:
+            suavidad += abs(a - b)
+
+    return (pesos.get('vacias', 0.0) * vacias
+            + pesos.get('fusiones', 0.0) * fusiones
+            - pesos.get('monotonicidad', 0.0) * min(mono_izq, mono_der)
+            - pesos.get('suavidad', 0.0) * suavidad)
+
+
+class EvaluadorTablas:
+    """
+    Evalúa tableros sumando puntuaciones de línea precalculadas. En tableros
+    4x4 la tabla completa (16^4 entradas) se genera al construirlo (o en la
+    primera evaluación si precalcular=False); en tamaños mayores, o con fichas
+    por encima de 32768, se rellena bajo demanda y olvida las líneas menos
+    usadas al pasar de max_perezosa.
+    """
+    def __init__(self, tamano: int = 4, pesos: Optional[Dict[str, float]] = None, precalcular: bool = True,
+                 max_perezosa: int = MAX_TABLA_PEREZOSA):
+        self.tamano = tamano
+        self.pesos = dict(PESOS_DEFECTO)
+        if pesos:
+            self.pesos.update(pesos)
+        # Identifica los valores que da (libro de aperturas): cambia con los pesos
+        self.firma = zlib.crc32(repr(("EvaluadorTablas", sorted(self.pesos.items()))).encode('utf-8'))
+        self.tabla: Optional[List[float]] = None
+        self.max_perezosa = max_perezosa
+        self.tabla_perezosa: "OrderedDict[tuple, float]" = OrderedDict()
+        if tamano == 4 and precalcular:
+            self.construir_tabla()
+
+    def construir_tabla(self) -> None:
+        self.tabla = [puntuar_linea(desempaquetar(k, 4), self.pesos) for k in range(1 << (BITS * 4))]
+
+    def puntuar(self, exps: Sequence[int]) -> float:
+        """Busca la puntuación de una línea de exponentes."""
+        if self.tabla is not None and len(exps) == 4 and max(exps) <= MAX_EXP_TABLA:
+            return self.tabla[empaquetar(exps)]
+        clave = tuple(exps)
+        perezosa = self.tabla_perezosa
+        valor = perezosa.get(clave)
+        if valor is not None:
+            perezosa.move_to_end(clave)
+            return valor
+        valor = puntuar_linea(exps, self.pesos)
+        perezosa[clave] = valor
+        if len(perezosa) > self.max_perezosa:
+            perezosa.popitem(last=False)
+        return valor
+
+    def evaluar_empaquetado(self, filas: Sequence[int], columnas: Sequence[int]) -> float:
+        """Suma de n búsquedas de filas y n de columnas ya empaquetadas (solo 4x4)."""
+        tabla = self.tabla
+        total = 0.0
+        for k in filas:
+            total += tabla[k]
+        for k in columnas:
+            total += tabla[k]
+        return total
+
+    def evaluar(self, tablero: Tablero) -> float:
+        if len(tablero) == 4:
+            if self.tabla is None:
+                self.construir_tabla()
+            try:
+                return self._evaluar_4x4(tablero)
+            except KeyError:
+                pass # Ficha > 32768: vía perezosa
+        exps = [[_EXPONENTES[v] for v in fila] for fila in tablero]
+        total = 0.0
+        for fila in exps:
+            total += self.puntuar(fila)
+        for columna in zip(*exps):
+            total += self.puntuar(columna)
+        return total
+
+    def _evaluar_4x4(self, tablero: Tablero) -> float:
+        n = _NIBBLES
+        t = self.tabla
+        (a0, a1, a2, a3), (b0, b1, b2, b3), (c0, c1, c2, c3), (d0, d1, d2, d3) = [
+            [n[v] for v in fila] for fila in tablero]
+        return (t[a0 | a1 << 4 | a2 << 8 | a3 << 12] + t[b0 | b1 << 4 | b2 << 8 | b3 << 12]
+                + t[c0 | c1 << 4 | c2 << 8 | c3 << 12] + t[d0 | d1 << 4 | d2 << 8 | d3 << 12]
+                + t[a0 | b0 << 4 | c0 << 8 | d0 << 12] + t[a1 | b1 << 4 | c1 << 8 | d1 << 12]
+                + t[a2 | b2 << 4 | c2 << 8 | d2 << 12] + t[a3 | b3 << 4 | c3 << 8 | d3 << 12])
+
+    __call__ = evaluar
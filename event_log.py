@@ -0,0 +1,137 @@
+"""Registro de eventos asíncrono en JSON Lines con rotación comprimida."""
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+from typing import Iterable, Optional, Set
+
+NOMBRE_LOGGER = "2048_Accesible"
+MAX_BYTES_DEFECTO = 2 * 1024 * 1024
+COPIAS_DEFECTO = 5
+
+logger = logging.getLogger(NOMBRE_LOGGER)
+
+# Categorías silenciadas: se descartan antes de formatear nada
+_categorias_desactivadas: Set[str] = set()
+
+_registro_activo: Optional["RegistroEventos"] = None
+
+# Silencio global temporal (p. ej. durante el juego automático)
+_silenciado = False
+
+
+def categoria_activa(categoria: str) -> bool:
+    """Indica si la categoría se registra (comprobación O(1) sin formateo)."""
+    return not _silenciado and categoria not in _categorias_desactivadas
+
+
+def silenciar(activo: bool) -> None:
+    global _silenciado
+    _silenciado = activo
+
+
+def activar_categoria(categoria: str, activa: bool = True) -> None:
+    if activa:
+        _categorias_desactivadas.discard(categoria)
+    else:
+        _categorias_desactivadas.add(categoria)
+
+
+def fijar_categorias_desactivadas(categorias: Iterable[str]) -> None:
+    _categorias_desactivadas.clear()
+    _categorias_desactivadas.update(categorias)
+
+
+def registrar(categoria: str, mensaje: str, *args) -> None:
+    """
+    Encola un evento. Los argumentos se combinan con el mensaje (estilo %)
+    en el hilo de escritura, nunca en el hilo que llama.
+    """
+    if _silenciado or categoria in _categorias_desactivadas:
+        return
+    logger.info(mensaje, *args, extra={'categoria': categoria})
+
+
+class FormateadorJSON(logging.Formatter):
+    """Serializa cada registro como una línea JSON compacta."""
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            'ts': round(record.created, 3),
+            'lvl': record.levelname,
+            'cat': getattr(record, 'categoria', 'GENERAL'),
+            # Limpiamos espacios al final (usados para forzar lectura)
+            'msg': record.getMessage().rstrip()
+        }
+        return json.dumps(datos, ensure_ascii=False, separators=(',', ':'))
+
+
+class ManejadorRotativoGzip(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler que comprime con gzip cada archivo rotado."""
+    def __init__(self, ruta: str, max_bytes: int, copias: int):
+        super().__init__(ruta, mode='a', maxBytes=max_bytes, backupCount=copias, encoding='utf-8')
+        self.namer = self._nombre_comprimido
+        self.rotator = self._rotar_comprimiendo
+
+    @staticmethod
+    def _nombre_comprimido(nombre: str) -> str:
+        return nombre + ".gz"
+
+    @staticmethod
+    def _rotar_comprimiendo(origen: str, destino: str) -> None:
+        with open(origen, 'rb') as f_in, gzip.open(destino, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(origen)
+
+
+class _ManejadorCola(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Sin formatear aquí: el listener lo hace en segundo plano
+        return record
+
+
+class RegistroEventos:
+    """
+    Pipeline de logging basado en cola: el hilo de la UI solo encola
+    registros y un QueueListener los formatea y escribe a disco.
+    """
+    def __init__(self, ruta: str, max_bytes: int = MAX_BYTES_DEFECTO, copias: int = COPIAS_DEFECTO):
+        self.ruta = ruta
+        self.cola: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self.manejador = ManejadorRotativoGzip(ruta, max_bytes, copias)
+        self.manejador.setFormatter(FormateadorJSON())
+        self.listener = logging.handlers.QueueListener(self.cola, self.manejador)
+        self.manejador_cola = _ManejadorCola(self.cola)
+
+    def iniciar(self) -> None:
+        for h in list(logger.handlers):
+            logger.removeHandler(h)
+        logger.addHandler(self.manejador_cola)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        self.listener.start()
+
+    def detener(self) -> None:
+        """Vacía la cola pendiente y cierra el archivo."""
+        logger.removeHandler(self.manejador_cola)
+        self.listener.stop()
+        self.manejador.close()
+
+
+def iniciar(ruta: str, max_bytes: int = MAX_BYTES_DEFECTO, copias: int = COPIAS_DEFECTO) -> RegistroEventos:
+    """Arranca (o reinicia) el registro global hacia 'ruta'."""
+    global _registro_activo
+    if _registro_activo is not None:
+        _registro_activo.detener()
+    _registro_activo = RegistroEventos(ruta, max_bytes, copias)
+    _registro_activo.iniciar()
+    return _registro_activo
+
+
+def detener() -> None:
+    global _registro_activo
+    if _registro_activo is not None:
+        _registro_activo.detener()
+        _registro_activo = None
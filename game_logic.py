@@ -2,8 +2,9 @@ import json
 import logging
 import os
 import random
-from typing import List, Dict, Any, Tuple, cast
-from constants import ARCHIVO_GUARDADO, ARCHIVO_AJUSTES
+from typing import List, Dict, Any, NamedTuple, Optional, Set, Tuple, cast
+from constants import ARCHIVO_GUARDADO, ARCHIVO_AJUSTES, ARCHIVO_PESOS, PERFIL_DEFECTO
+from tile_index import IndiceFichas
 
 def coord_nombre(r, c):
     # e.g., A1, B3
@@ -12,19 +13,178 @@ def coord_nombre(r, c):
     col = c + 1
     return f"{fila}{col}"
 
+DIRECCIONES = ('IZQUIERDA', 'DERECHA', 'ARRIBA', 'ABAJO')
+
+def deslizar_linea(linea: List[int]) -> Tuple[List[int], int]:
+    """Desliza y fusiona una línea hacia el índice 0. Devuelve (nueva línea, puntos)."""
+    fichas = [v for v in linea if v]
+    resultado: List[int] = []
+    pts = 0
+    i = 0
+    n = len(fichas)
+    while i < n:
+        v = fichas[i]
+        if i + 1 < n and fichas[i + 1] == v:
+            v *= 2
+            pts += v
+            i += 2
+        else:
+            i += 1
+        resultado.append(v)
+    resultado.extend([0] * (len(linea) - len(resultado)))
+    return resultado, pts
+
+def desplazar_tablero(tablero: List[List[int]], direccion: str) -> Tuple[List[List[int]], int, bool]:
+    """
+    Aplica un movimiento sin efectos secundarios (sin ficha nueva, sin guardar).
+    Devuelve (nuevo tablero, puntos obtenidos, si cambió algo).
+    """
+    n = len(tablero)
+    pts = 0
+    if direccion == 'IZQUIERDA' or direccion == 'DERECHA':
+        nuevo = []
+        for fila in tablero:
+            linea = fila if direccion == 'IZQUIERDA' else fila[::-1]
+            res, p = deslizar_linea(linea)
+            pts += p
+            nuevo.append(res if direccion == 'IZQUIERDA' else res[::-1])
+    else:
+        nuevo = [[0] * n for _ in range(n)]
+        for c in range(n):
+            col = [tablero[r][c] for r in range(n)]
+            if direccion == 'ABAJO':
+                col.reverse()
+            res, p = deslizar_linea(col)
+            pts += p
+            if direccion == 'ABAJO':
+                res.reverse()
+            for r in range(n):
+                nuevo[r][c] = res[r]
+    return nuevo, pts, nuevo != tablero
+
+class Desplazamiento(NamedTuple):
+    valor: int # Valor antes del movimiento
+    origen: Tuple[int, int]
+    destino: Tuple[int, int]
+    fusion: bool # Se fusiona con otra ficha en el destino
+
+def _celdas_linea(n: int, direccion: str, k: int) -> List[Tuple[int, int]]:
+    """Celdas de la línea k en el orden en que se desliza (la de destino primero)."""
+    if direccion == 'IZQUIERDA':
+        return [(k, c) for c in range(n)]
+    if direccion == 'DERECHA':
+        return [(k, c) for c in reversed(range(n))]
+    if direccion == 'ARRIBA':
+        return [(r, k) for r in range(n)]
+    return [(r, k) for r in reversed(range(n))]
+
+def desplazamientos_tablero(tablero: List[List[int]], direccion: str) -> List[Desplazamiento]:
+    """Origen y destino de cada ficha al aplicar el movimiento (misma regla que deslizar_linea)."""
+    n = len(tablero)
+    resultado: List[Desplazamiento] = []
+    for k in range(n):
+        celdas = _celdas_linea(n, direccion, k)
+        fichas = [(pos, tablero[pos[0]][pos[1]]) for pos in celdas if tablero[pos[0]][pos[1]]]
+        j = 0
+        i = 0
+        while i < len(fichas):
+            pos, v = fichas[i]
+            if i + 1 < len(fichas) and fichas[i + 1][1] == v:
+                resultado.append(Desplazamiento(v, pos, celdas[j], True))
+                resultado.append(Desplazamiento(v, fichas[i + 1][0], celdas[j], True))
+                i += 2
+            else:
+                resultado.append(Desplazamiento(v, pos, celdas[j], False))
+                i += 1
+            j += 1
+    return resultado
+
+def simetrias(tablero: List[List[int]]) -> List[List[List[int]]]:
+    """Las 8 simetrías del tablero (4 giros, cada uno con su reflejo); la primera es la identidad."""
+    resultado = []
+    t = [fila[:] for fila in tablero]
+    for _ in range(4):
+        resultado.append(t)
+        resultado.append([fila[::-1] for fila in t])
+        t = [list(fila) for fila in zip(*t[::-1])] # Giro de 90° en sentido horario
+    return resultado
+
+def simetria_canonica(tablero: List[List[int]]) -> Tuple[Tuple[Tuple[int, ...], ...], int]:
+    """Representante común de las 8 simetrías (el menor) y el índice de la simetría que lo da."""
+    return min((tuple(tuple(fila) for fila in t), k) for k, t in enumerate(simetrias(tablero)))
+
+def tablero_canonico(tablero: List[List[int]]) -> Tuple[Tuple[int, ...], ...]:
+    return simetria_canonica(tablero)[0]
+
+def _mapas_direcciones() -> List[Dict[str, str]]:
+    # Cada simetría lleva el vector de una dirección a otro: se averigua con una sonda 3x3
+    vectores = {'IZQUIERDA': (0, -1), 'DERECHA': (0, 1), 'ARRIBA': (-1, 0), 'ABAJO': (1, 0)}
+    por_vector = {v: d for d, v in vectores.items()}
+    mapas: List[Dict[str, str]] = [{} for _ in range(8)]
+    for d, (dr, dc) in vectores.items():
+        sonda = [[0] * 3 for _ in range(3)]
+        sonda[1 + dr][1 + dc] = 1
+        for k, t in enumerate(simetrias(sonda)):
+            r, c = next((r, c) for r in range(3) for c in range(3) if t[r][c])
+            mapas[k][d] = por_vector[(r - 1, c - 1)]
+    return mapas
+
+_MAPAS_DIRECCIONES = _mapas_direcciones()
+
+def direccion_simetrica(direccion: str, k: int) -> str:
+    """Dirección equivalente tras aplicar la simetría k al tablero."""
+    return _MAPAS_DIRECCIONES[k][direccion]
+
+def direccion_original(direccion: str, k: int) -> str:
+    """Inversa de direccion_simetrica: del tablero transformado al original."""
+    for d, dt in _MAPAS_DIRECCIONES[k].items():
+        if dt == direccion:
+            return d
+    raise ValueError(direccion)
+
+# Pesos de la heurística de obtener_sugerencia (ajustables con tune_weights.py)
+PESOS_SUGERENCIA_DEFECTO: Dict[str, float] = {
+    'puntos': 1.0,   # Puntos ganados con el movimiento
+    'libres': 10.0,  # Por cada celda libre tras el movimiento
+    'esquina': 2.0,  # Multiplica la ficha máxima si queda en una esquina
+}
+
+def cargar_pesos_sugerencia(ruta: str = ARCHIVO_PESOS) -> Dict[str, float]:
+    """Lee los pesos ajustados; las claves ausentes o inválidas toman el valor por defecto."""
+    pesos = dict(PESOS_SUGERENCIA_DEFECTO)
+    if os.path.exists(ruta):
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for clave in pesos:
+                if clave in data:
+                    pesos[clave] = float(data[clave])
+        except Exception as e:
+            logging.error(f"Error cargando pesos de sugerencia: {e}")
+    return pesos
+
 class Logica2048:
     """
     Core engine for the 2048 game logic.
     Handles board state, move calculations, score, and undo history.
+
+    Con un 'almacen' (storage.AlmacenJuego) la partida, los ajustes y los
+    récords se guardan en el perfil indicado; sin él se usan los archivos
+    JSON del directorio actual (herramientas y pruebas).
     """
-    def __init__(self, tamano: int = 4):
+    def __init__(self, tamano: int = 4, almacen: Optional[Any] = None, perfil: str = PERFIL_DEFECTO):
         self.tamano: int = tamano
+        self.almacen = almacen
+        self.perfil = perfil
         self.tablero: List[List[int]] = []
         self.puntuacion: int = 0
         self.max_ficha: int = 0
         self.narrativa: List[str] = []
         self.ultimo_evento: str = "" # 'MOVE', 'MERGE', ""
         self.merge_info: Tuple[float, float, int] = (0.0, 0.0, 0) # (start_pan, end_pan, val)
+        self.ultima_ficha = None # (r, c, val) de la última ficha añadida tras un movimiento
+        self.ultima_direccion: Optional[str] = None
+        self._tablero_previo: Optional[List[List[int]]] = None # Antes del último movimiento
         self.moved_count: int = 0
         self.merge_count: int = 0 
         self._temp_merge_val: int = 0
@@ -37,26 +197,73 @@ class Logica2048:
         self.ganado = False # Si llegó a 2048
         self.victoria_anunciada = False # Para no repetir el mensaje
         self.hitos_alcanzados: List[int] = [] # Hitos de victoria (2048, 4096, etc.)
+        self.sin_records = False # Partida de desafío: no cuenta para récords ni estadísticas
         self.ARCHIVO_GUARDADO = ARCHIVO_GUARDADO
         self.ARCHIVO_AJUSTES = ARCHIVO_AJUSTES
+        self.pesos_sugerencia: Dict[str, float] = cargar_pesos_sugerencia()
         
         # Accessibility Config
         self.verbosidad = 1 # 0: Brief, 1: Normal, 2: Verbose
         self.alto_contraste = False
+        self.tablero_unico = False # Un solo lienzo en vez de un panel por celda
+        self.animacion = True # Deslizar las fichas al mover (F6)
+        self.log_desactivadas: List[str] = [] # Categorías de log silenciadas
         
         # Undo History
         self.history: List[Dict[str, Any]] = []
         
+        # Celdas modificadas desde la última vez que la UI las consumió
+        self.celdas_cambiadas: Set[Tuple[int, int]] = set()
+        
+        # Valor -> celdas, para saltar a una ficha sin recorrer el tablero
+        self._indice = IndiceFichas()
+        
         self.cargar_ajustes() # Load user preferences before starting logic
         self.iniciar_juego()
 
     def iniciar_juego(self):
         self.tablero = [[0] * self.tamano for _ in range(self.tamano)]
+        if self.almacen is not None:
+            self.high_score = self.almacen.record(self.perfil, self.tamano)[0]
         self.puntuacion = 0
         self.max_ficha = 0
         self.history = []
+        self.sin_records = False
+        self._tablero_previo = None
+        self._indice.reconstruir(self.tablero)
         self.agregar_ficha_random()
         self.agregar_ficha_random()
+        self.marcar_todas_cambiadas()
+
+    @property
+    def indice(self) -> IndiceFichas:
+        """
+        Índice de posiciones por valor. mover, deshacer y las fichas nuevas lo
+        mantienen al día; si se asigna otro tablero desde fuera (repeticiones),
+        se reconstruye en el primer acceso.
+        """
+        if self._indice.tablero is not self.tablero:
+            self._indice.reconstruir(self.tablero)
+        return self._indice
+
+    def marcar_todas_cambiadas(self) -> None:
+        """Marca todo el tablero como modificado (nueva partida, carga, etc.)."""
+        self.celdas_cambiadas = {(r, c) for r in range(self.tamano) for c in range(self.tamano)}
+
+    def _registrar_cambios(self, tablero_ant: List[List[int]]) -> None:
+        """Acumula las celdas cuyo valor difiere entre tablero_ant y el tablero actual."""
+        for r in range(self.tamano):
+            fila_ant = tablero_ant[r]
+            fila = self.tablero[r]
+            for c in range(self.tamano):
+                if fila_ant[c] != fila[c]:
+                    self.celdas_cambiadas.add((r, c))
+
+    def consumir_celdas_cambiadas(self) -> Set[Tuple[int, int]]:
+        """Devuelve y reinicia el conjunto de celdas modificadas."""
+        cambiadas = self.celdas_cambiadas
+        self.celdas_cambiadas = set()
+        return cambiadas
 
     def to_dict(self):
         """Convierte el estado esencial de la partida a un diccionario."""
@@ -68,27 +275,41 @@ class Logica2048:
             'history': self.history,
             'ganado': self.ganado,
             'victoria_anunciada': self.victoria_anunciada,
-            'hitos_alcanzados': self.hitos_alcanzados
+            'hitos_alcanzados': self.hitos_alcanzados,
+            'sin_records': self.sin_records
         }
 
     def guardar_ajustes(self) -> None:
         """Persiste los ajustes de accesibilidad de forma atómica."""
         ajustes: Dict[str, Any] = {
             'verbosidad': self.verbosidad,
-            'alto_contraste': self.alto_contraste
+            'alto_contraste': self.alto_contraste,
+            'tablero_unico': self.tablero_unico,
+            'animacion': self.animacion,
+            'log_desactivadas': self.log_desactivadas
         }
-        self.guardar_json_atomico(self.ARCHIVO_AJUSTES, ajustes)
+        if self.almacen is not None:
+            self.almacen.guardar_ajustes(self.perfil, ajustes)
+        else:
+            self.guardar_json_atomico(self.ARCHIVO_AJUSTES, ajustes)
+
+    def _aplicar_ajustes(self, data: Dict[str, Any]) -> None:
+        self.verbosidad = int(data.get('verbosidad', 1))
+        self.alto_contraste = bool(data.get('alto_contraste', False))
+        self.tablero_unico = bool(data.get('tablero_unico', False))
+        self.animacion = bool(data.get('animacion', True))
+        self.log_desactivadas = [str(c) for c in data.get('log_desactivadas', [])]
 
     def cargar_ajustes(self):
-        """Carga configuraciones de usuario desde settings.json."""
-        if os.path.exists(self.ARCHIVO_AJUSTES):
-            try:
+        """Carga configuraciones de usuario desde el almacén o settings.json."""
+        try:
+            if self.almacen is not None:
+                self._aplicar_ajustes(self.almacen.cargar_ajustes(self.perfil))
+            elif os.path.exists(self.ARCHIVO_AJUSTES):
                 with open(self.ARCHIVO_AJUSTES, 'r') as f:
-                    data = json.load(f)
-                    self.verbosidad = int(data.get('verbosidad', 1))
-                    self.alto_contraste = bool(data.get('alto_contraste', False))
-            except Exception as e:
-                logging.error(f"Error cargando ajustes: {e}")
+                    self._aplicar_ajustes(json.load(f))
+        except Exception as e:
+            logging.error(f"Error cargando ajustes: {e}")
 
     def from_dict(self, data):
         """Restaura el estado desde un diccionario deserializado de JSON."""
@@ -108,10 +329,27 @@ class Logica2048:
                   self.ganado = bool(data.get('ganado', False))
                   self.victoria_anunciada = bool(data.get('victoria_anunciada', False))
                   self.hitos_alcanzados = list(data.get('hitos_alcanzados', []))
+                  self.sin_records = bool(data.get('sin_records', False))
+                  self.marcar_todas_cambiadas()
                   return True
         return False
 
     def cargar_juego(self):
+        if self.almacen is not None:
+            try:
+                data = self.almacen.cargar_partida(self.perfil)
+                if data is not None:
+                    tamano_previo = self.tamano
+                    self.tamano = len(data.get('tablero') or []) or self.tamano
+                    if self.from_dict(data):
+                        # El récord del perfil puede venir de otra instancia del juego
+                        self.high_score = max(self.high_score, self.almacen.record(self.perfil, self.tamano)[0])
+                        logging.info("Game loaded successfully.")
+                        return True
+                    self.tamano = tamano_previo
+            except Exception as e:
+                logging.error(f"Error loading game: {e}")
+            return False
 
         if os.path.exists(self.ARCHIVO_GUARDADO):
             try:
@@ -143,7 +381,28 @@ class Logica2048:
 
     def guardar_juego_estado(self) -> None:
         """Persiste el estado actual de la partida de forma atómica."""
-        self.guardar_json_atomico(self.ARCHIVO_GUARDADO, self.to_dict())
+        if self.almacen is None:
+            self.guardar_json_atomico(self.ARCHIVO_GUARDADO, self.to_dict())
+            return
+        try:
+            # Partida y récord en una sola transacción
+            with self.almacen.transaccion():
+                self.almacen.guardar_partida(self.perfil, self.to_dict(), self.tamano)
+                if not self.sin_records:
+                    self.almacen.registrar_record(self.perfil, self.tamano, self.high_score, self.max_ficha)
+        except Exception as e:
+            logging.error(f"Error guardando partida: {e}")
+
+    def borrar_partida_guardada(self) -> None:
+        """Elimina la partida guardada (fin de partida o reinicio)."""
+        if self.almacen is not None:
+            try:
+                self.almacen.borrar_partida(self.perfil)
+            except Exception as e:
+                logging.error(f"Error borrando partida: {e}")
+        elif os.path.exists(self.ARCHIVO_GUARDADO):
+            try: os.remove(self.ARCHIVO_GUARDADO)
+            except Exception: pass
 
     def actualizar_max_ficha(self):
         """Recalcula la ficha máxima del tablero y marca eventos de récord."""
@@ -163,6 +422,8 @@ class Logica2048:
             r, c = random.choice(celdas)
             val = 4 if random.random() > 0.9 else 2
             self.tablero[r][c] = val
+            if self._indice.tablero is self.tablero:
+                self._indice.colocar(r, c, val)
             return (r, c, val)
         return None
 
@@ -239,7 +500,8 @@ class Logica2048:
                  if dist > curr_dist:
                       self.merge_info = (start, end, val)
 
-    def mover(self, direccion):
+    def mover(self, direccion, guardar=True):
+        """Aplica un movimiento. guardar=False deja el guardado al llamador (lotes)."""
         # Save state for Undo
         tablero_ant = [f[:] for f in self.tablero]
         score_ant = self.puntuacion
@@ -338,7 +600,7 @@ class Logica2048:
             })
             
             # Update High Score
-            if self.puntuacion > self.high_score:
+            if self.puntuacion > self.high_score and not self.sin_records:
                 self.high_score = self.puntuacion
                 self.new_high_score = True
                 self.new_record = False # Only fanfare for score if it's new
@@ -346,8 +608,13 @@ class Logica2048:
                 self.new_high_score = False
 
             self.tablero = nuevo_tablero
+            self.ultima_direccion = direccion
+            self._tablero_previo = tablero_ant
+            self._indice.reconstruir(nuevo_tablero) # El movimiento ya es O(n²)
             # Add new tile and narrative
             new_tile = self.agregar_ficha_random()
+            self.ultima_ficha = new_tile
+            self._registrar_cambios(tablero_ant)
             if new_tile and self.verbosidad > 0:
                 r, c, val = new_tile
                 coord = coord_nombre(r, c)
@@ -386,19 +653,33 @@ class Logica2048:
             else:
                 self.ultimo_evento = 'MOVE'
                 self.narrativa = msgs_fusiones # Usually just spawn info or empty
-            self.guardar_juego_estado()
+            if guardar:
+                self.guardar_juego_estado()
             return True
         else:
             self.ultimo_evento = ""
             return False
 
+    def desplazamientos(self) -> List[Desplazamiento]:
+        """
+        Recorrido de cada ficha en el último movimiento (para animarlo). Se
+        calcula al pedirlo, así que mover no paga nada si nadie lo usa.
+        """
+        if self._tablero_previo is None or self.ultima_direccion is None:
+            return []
+        return desplazamientos_tablero(self._tablero_previo, self.ultima_direccion)
+
     def deshacer(self):
         if not self.history:
             return False
+        self._tablero_previo = None
             
         estado_previo = self.history.pop()
         tablero: List[List[int]] = estado_previo["tablero"]
+        tablero_act = self.tablero
         self.tablero = [fila[:] for fila in tablero]
+        self._indice.reconstruir(self.tablero)
+        self._registrar_cambios(tablero_act)
         self.puntuacion = int(estado_previo["puntuacion"])
         self.max_ficha = int(estado_previo["max_ficha"])
         self.new_record = False 
@@ -414,51 +695,17 @@ class Logica2048:
         """Sugerencia avanzada basada en puntos, espacios y estrategia de esquinas."""
         direcciones = ['IZQUIERDA', 'DERECHA', 'ARRIBA', 'ABAJO']
         mejor_dir = "Ninguna"
-        mejor_valor_heuristico = -1.0
+        mejor_valor_heuristico = float('-inf')
+        pesos = self.pesos_sugerencia
         
         for d in direcciones:
-            temp_tablero: List[List[int]] = [fila[:] for fila in self.tablero]
-            cambio: bool = False
-            puntos_mov: int = 0
-            
-            # Simulación
-            if d == 'IZQUIERDA':
-                for r in range(self.tamano):
-                    linea_sim, f_list, pts, movs = self.procesar_linea(temp_tablero[r])
-                    if linea_sim != temp_tablero[r]: cambio = True
-                    temp_tablero[r] = linea_sim
-                    puntos_mov += pts
-            elif d == 'DERECHA':
-                for r in range(self.tamano):
-                    linea_sim = list(reversed(temp_tablero[r]))
-                    proc, f_list, pts, movs = self.procesar_linea(linea_sim)
-                    res_line = list(reversed(proc))
-                    if res_line != temp_tablero[r]: cambio = True
-                    temp_tablero[r] = res_line
-                    puntos_mov += pts
-            elif d == 'ARRIBA':
-                for c in range(self.tamano):
-                    col_sim = [temp_tablero[r][c] for r in range(self.tamano)]
-                    proc, f_list, pts, movs = self.procesar_linea(col_sim)
-                    for r in range(self.tamano):
-                        if temp_tablero[r][c] != proc[r]: cambio = True
-                        temp_tablero[r][c] = proc[r]
-                    puntos_mov += pts
-            elif d == 'ABAJO':
-                for c in range(self.tamano):
-                    col_sim = list(reversed([temp_tablero[r][c] for r in range(self.tamano)]))
-                    proc, f_list, pts, movs = self.procesar_linea(col_sim)
-                    proc_f = list(reversed(proc))
-                    for r in range(self.tamano):
-                        if temp_tablero[r][c] != proc_f[r]: cambio = True
-                        temp_tablero[r][c] = proc_f[r]
-                    puntos_mov += pts
+            temp_tablero, puntos_mov, cambio = desplazar_tablero(self.tablero, d)
             
             if cambio:
                 libres = sum(1 for row in temp_tablero for cell in row if cell == 0)
                 # Heurística: 
                 # 1. Valor base por puntos y espacios
-                valor = float(puntos_mov) + (float(libres) * 10.0)
+                valor = float(puntos_mov) * pesos['puntos'] + float(libres) * pesos['libres']
                 
                 # 2. Estrategia de Esquina: El valor máximo DEBE estar en una esquina
                 max_t = 0
@@ -471,7 +718,7 @@ class Logica2048:
                 
                 esquinas = [(0,0), (0, self.tamano-1), (self.tamano-1, 0), (self.tamano-1, self.tamano-1)]
                 if max_pos in esquinas:
-                    valor += max_t * 2.0 # Gran peso a mantener la mejor ficha en esquina
+                    valor += max_t * pesos['esquina'] # Gran peso a mantener la mejor ficha en esquina
                 
                 if valor > mejor_valor_heuristico:
                     mejor_valor_heuristico = valor
@@ -0,0 +1,429 @@
+"""
+Servidor local de partidas: muchas sesiones en un solo proceso.
+
+Protocolo: JSON-RPC 2.0, un objeto JSON por línea, sobre TCP local o un
+socket Unix. Métodos:
+
+    new_game {tamano?}              -> {session, state}
+    move     {session, direccion}   -> {movido, state}
+    undo     {session}              -> {deshecho, state}
+    hint     {session, profundidad?}-> {direccion, valor, profundidad}
+    state    {session}              -> {state}
+
+Cada partida es una SesionCompacta (unos cientos de bytes, sin E/S al
+crearla). Las sugerencias se calculan en un pool de procesos para no
+bloquear el bucle de eventos. Las partidas modificadas se guardan por lotes cada pocos
+segundos (y al cerrar), no en cada movimiento.
+
+Uso:
+    python game_server.py servir --puerto 8765
+    python game_server.py carga --clientes 200 --peticiones 100
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from compact_session import SesionCompacta
+from constants import TAMANO_DEFECTO, TAMANO_MAXIMO, TAMANO_MINIMO
+from evaluator import EvaluadorTablas, cargar_pesos_evaluador
+from game_logic import DIRECCIONES
+from hint_engine import buscar
+
+HOST_DEFECTO = "127.0.0.1"
+PUERTO_DEFECTO = 8765
+DIRECTORIO_SESIONES = "sessions"
+INTERVALO_GUARDADO_S = 2.0
+PROFUNDIDAD_SUGERENCIA = 2
+MAX_PROFUNDIDAD_SUGERENCIA = 4
+
+# Códigos de error de JSON-RPC 2.0
+ERROR_PARSEO = -32700
+ERROR_PETICION = -32600
+ERROR_METODO = -32601
+ERROR_PARAMETROS = -32602
+ERROR_INTERNO = -32603
+ERROR_SESION = -32001 # Propio: sesión desconocida
+
+logger = logging.getLogger("2048_Servidor")
+
+
+class ErrorRPC(Exception):
+    def __init__(self, codigo: int, mensaje: str):
+        super().__init__(mensaje)
+        self.codigo = codigo
+        self.mensaje = mensaje
+
+
+# --- Trabajo en el pool de procesos ---
+_evaluador_proceso = None
+
+def _calcular_sugerencia(tablero: List[List[int]], profundidad: int) -> Tuple[str, float, int]:
+    """Se ejecuta en un proceso del pool; la tabla del evaluador se crea una vez por proceso."""
+    global _evaluador_proceso
+    if _evaluador_proceso is None or _evaluador_proceso.tamano != len(tablero):
+        _evaluador_proceso = EvaluadorTablas(len(tablero), cargar_pesos_evaluador())
+    res = buscar(tablero, profundidad, _evaluador_proceso)
+    return res.direccion, res.valor, res.profundidad
+
+
+def estado_sesion(juego: SesionCompacta) -> Dict[str, Any]:
+    return {
+        'tablero': juego.tablero,
+        'puntuacion': juego.puntuacion,
+        'max_ficha': juego.max_ficha,
+        'terminado': juego.juego_terminado(),
+    }
+
+
+class ServidorJuego:
+    """Aloja las sesiones y atiende el protocolo. No sabe nada de sockets concretos."""
+    def __init__(self, directorio: str = DIRECTORIO_SESIONES,
+                 ejecutor: Optional[Executor] = None,
+                 intervalo_guardado: float = INTERVALO_GUARDADO_S,
+                 crear_juego: Callable[[int], SesionCompacta] = SesionCompacta):
+        self.directorio = directorio
+        self.ejecutor = ejecutor
+        self._ejecutor_propio = ejecutor is None
+        self.intervalo_guardado = intervalo_guardado
+        self.crear_juego = crear_juego
+        self.sesiones: Dict[str, SesionCompacta] = {}
+        self.sucias: Set[str] = set()
+        self.peticiones = 0
+        self.guardados = 0
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        self._tarea_guardado: Optional[asyncio.Task] = None
+        self._metodos = {
+            'new_game': self.new_game,
+            'move': self.move,
+            'undo': self.undo,
+            'hint': self.hint,
+            'state': self.state,
+        }
+
+    # --- Ciclo de vida ---
+    async def iniciar(self, host: str = HOST_DEFECTO, puerto: int = PUERTO_DEFECTO,
+                      ruta_unix: Optional[str] = None) -> None:
+        os.makedirs(self.directorio, exist_ok=True)
+        if self.ejecutor is None:
+            self.ejecutor = ProcessPoolExecutor()
+        if ruta_unix:
+            self._servidor = await asyncio.start_unix_server(self._atender, path=ruta_unix)
+        else:
+            self._servidor = await asyncio.start_server(self._atender, host, puerto)
+        self._tarea_guardado = asyncio.create_task(self._guardar_periodicamente())
+
+    @property
+    def direccion(self):
+        return self._servidor.sockets[0].getsockname() if self._servidor else None
+
+    async def detener(self) -> None:
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+        if self._tarea_guardado is not None:
+            self._tarea_guardado.cancel()
+            try:
+                await self._tarea_guardado
+            except asyncio.CancelledError:
+                pass
+            self._tarea_guardado = None
+        await self.guardar_lote()
+        if self._ejecutor_propio and self.ejecutor is not None:
+            self.ejecutor.shutdown(wait=True)
+            self.ejecutor = None
+
+    # --- Guardado por lotes ---
+    def _ruta_sesion(self, sesion: str) -> str:
+        return os.path.join(self.directorio, f"{sesion}.json")
+
+    def _escribir_lote(self, lote: List[Tuple[str, Dict[str, Any]]]) -> None:
+        for sesion, datos in lote:
+            ruta = self._ruta_sesion(sesion)
+            temp = ruta + ".tmp"
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump(datos, f, separators=(',', ':'))
+            os.replace(temp, ruta)
+
+    async def guardar_lote(self) -> int:
+        """Escribe en un hilo todas las sesiones modificadas desde el último lote."""
+        if not self.sucias:
+            return 0
+        # Instantánea en el bucle: los movimientos posteriores van al siguiente lote
+        # (to_dict de SesionCompacta ya devuelve listas nuevas)
+        lote = []
+        for sesion in self.sucias:
+            juego = self.sesiones.get(sesion)
+            if juego is not None:
+                lote.append((sesion, juego.to_dict()))
+        self.sucias = set()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._escribir_lote, lote)
+        except OSError as e:
+            logger.error(f"Error guardando sesiones: {e}")
+            self.sucias.update(s for s, _ in lote)
+            return 0
+        self.guardados += len(lote)
+        return len(lote)
+
+    async def _guardar_periodicamente(self) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo_guardado)
+            await self.guardar_lote()
+
+    def _cargar_sesion(self, sesion: str) -> Optional[SesionCompacta]:
+        ruta = self._ruta_sesion(sesion)
+        if not os.path.exists(ruta):
+            return None
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error cargando sesión {sesion}: {e}")
+            return None
+        juego = self.crear_juego(int(datos.get('tamano', TAMANO_DEFECTO)))
+        if not juego.from_dict(datos):
+            return None
+        return juego
+
+    # --- Métodos del protocolo ---
+    def _sesion(self, params: Dict[str, Any]) -> Tuple[str, SesionCompacta]:
+        sesion = params.get('session')
+        if not isinstance(sesion, str) or not sesion.isalnum():
+            raise ErrorRPC(ERROR_PARAMETROS, "Falta 'session'")
+        juego = self.sesiones.get(sesion)
+        if juego is None:
+            juego = self._cargar_sesion(sesion)
+            if juego is None:
+                raise ErrorRPC(ERROR_SESION, f"Sesión desconocida: {sesion}")
+            self.sesiones[sesion] = juego
+        return sesion, juego
+
+    async def new_game(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        tamano = params.get('tamano', TAMANO_DEFECTO)
+        if not isinstance(tamano, int) or not TAMANO_MINIMO <= tamano <= TAMANO_MAXIMO:
+            raise ErrorRPC(ERROR_PARAMETROS, f"'tamano' debe estar entre {TAMANO_MINIMO} y {TAMANO_MAXIMO}")
+        sesion = uuid.uuid4().hex
+        juego = self.crear_juego(tamano)
+        self.sesiones[sesion] = juego
+        self.sucias.add(sesion)
+        return {'session': sesion, 'state': estado_sesion(juego)}
+
+    async def move(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        sesion, juego = self._sesion(params)
+        direccion = params.get('direccion')
+        if direccion not in DIRECCIONES:
+            raise ErrorRPC(ERROR_PARAMETROS, f"'direccion' debe ser una de {', '.join(DIRECCIONES)}")
+        movido = juego.mover(direccion, guardar=False)
+        if movido:
+            self.sucias.add(sesion)
+        return {'movido': movido, 'state': estado_sesion(juego)}
+
+    async def undo(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        sesion, juego = self._sesion(params)
+        deshecho = juego.deshacer()
+        if deshecho:
+            self.sucias.add(sesion)
+        return {'deshecho': deshecho, 'state': estado_sesion(juego)}
+
+    async def hint(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        _, juego = self._sesion(params)
+        profundidad = params.get('profundidad', PROFUNDIDAD_SUGERENCIA)
+        if not isinstance(profundidad, int) or not 1 <= profundidad <= MAX_PROFUNDIDAD_SUGERENCIA:
+            raise ErrorRPC(ERROR_PARAMETROS, f"'profundidad' debe estar entre 1 y {MAX_PROFUNDIDAD_SUGERENCIA}")
+        tablero = [fila[:] for fila in juego.tablero]
+        direccion, valor, prof = await asyncio.get_running_loop().run_in_executor(
+            self.ejecutor, _calcular_sugerencia, tablero, profundidad)
+        return {'direccion': direccion, 'valor': valor, 'profundidad': prof}
+
+    async def state(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        _, juego = self._sesion(params)
+        return {'state': estado_sesion(juego)}
+
+    # --- Transporte ---
+    async def procesar(self, linea: bytes) -> Optional[Dict[str, Any]]:
+        """Atiende una petición JSON-RPC; devuelve la respuesta (None para notificaciones)."""
+        self.peticiones += 1
+        try:
+            peticion = json.loads(linea)
+        except ValueError:
+            return {'jsonrpc': '2.0', 'id': None, 'error': {'code': ERROR_PARSEO, 'message': "JSON inválido"}}
+        if not isinstance(peticion, dict) or not isinstance(peticion.get('method'), str):
+            return {'jsonrpc': '2.0', 'id': None, 'error': {'code': ERROR_PETICION, 'message': "Petición inválida"}}
+        id_peticion = peticion.get('id')
+        try:
+            metodo = self._metodos.get(peticion['method'])
+            if metodo is None:
+                raise ErrorRPC(ERROR_METODO, f"Método desconocido: {peticion['method']}")
+            params = peticion.get('params') or {}
+            if not isinstance(params, dict):
+                raise ErrorRPC(ERROR_PARAMETROS, "'params' debe ser un objeto")
+            resultado = await metodo(params)
+            respuesta: Dict[str, Any] = {'jsonrpc': '2.0', 'id': id_peticion, 'result': resultado}
+        except ErrorRPC as e:
+            respuesta = {'jsonrpc': '2.0', 'id': id_peticion, 'error': {'code': e.codigo, 'message': e.mensaje}}
+        except Exception as e:
+            logger.exception("Error atendiendo %s", peticion.get('method'))
+            respuesta = {'jsonrpc': '2.0', 'id': id_peticion, 'error': {'code': ERROR_INTERNO, 'message': str(e)}}
+        return respuesta if 'id' in peticion else None
+
+    async def _atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                if not linea.strip():
+                    continue
+                respuesta = await self.procesar(linea)
+                if respuesta is not None:
+                    escritor.write(json.dumps(respuesta, separators=(',', ':')).encode('utf-8') + b'\n')
+                    await escritor.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+
+class ClienteJuego:
+    """Cliente mínimo del protocolo (usado por el generador de carga y las pruebas)."""
+    def __init__(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        self.lector = lector
+        self.escritor = escritor
+        self._siguiente_id = 0
+
+    @classmethod
+    async def conectar(cls, host: str = HOST_DEFECTO, puerto: int = PUERTO_DEFECTO,
+                       ruta_unix: Optional[str] = None) -> "ClienteJuego":
+        if ruta_unix:
+            lector, escritor = await asyncio.open_unix_connection(ruta_unix)
+        else:
+            lector, escritor = await asyncio.open_connection(host, puerto)
+        return cls(lector, escritor)
+
+    async def llamar(self, metodo: str, **params) -> Dict[str, Any]:
+        """Envía una petición y espera su respuesta (una petición en vuelo por conexión)."""
+        self._siguiente_id += 1
+        peticion = {'jsonrpc': '2.0', 'id': self._siguiente_id, 'method': metodo, 'params': params}
+        self.escritor.write(json.dumps(peticion, separators=(',', ':')).encode('utf-8') + b'\n')
+        await self.escritor.drain()
+        respuesta = json.loads(await self.lector.readline())
+        if 'error' in respuesta:
+            raise ErrorRPC(respuesta['error']['code'], respuesta['error']['message'])
+        return respuesta['result']
+
+    async def cerrar(self) -> None:
+        self.escritor.close()
+        try:
+            await self.escritor.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100.0 * (len(ordenados) - 1))))]
+
+
+async def generar_carga(clientes: int, peticiones: int, host: str = HOST_DEFECTO,
+                        puerto: int = PUERTO_DEFECTO, ruta_unix: Optional[str] = None,
+                        prob_sugerencia: float = 0.02, semilla: int = 0) -> Dict[str, float]:
+    """
+    Abre 'clientes' conexiones, cada una con su partida, y hace 'peticiones'
+    llamadas por cliente (movimientos, alguna sugerencia y consultas de
+    estado). Devuelve peticiones por segundo y latencias p50/p99 en ms.
+    """
+    latencias: List[float] = []
+    errores = 0
+    rng = random.Random(semilla)
+
+    async def cliente(n: int) -> None:
+        nonlocal errores
+        rng_cliente = random.Random(rng.random() + n)
+        conexion = await ClienteJuego.conectar(host, puerto, ruta_unix)
+        try:
+            sesion = (await conexion.llamar('new_game'))['session']
+            for _ in range(peticiones):
+                tirada = rng_cliente.random()
+                if tirada < prob_sugerencia:
+                    metodo, params = 'hint', {'session': sesion, 'profundidad': 1}
+                elif tirada < 0.1:
+                    metodo, params = 'state', {'session': sesion}
+                else:
+                    metodo, params = 'move', {'session': sesion, 'direccion': rng_cliente.choice(DIRECCIONES)}
+                inicio = time.perf_counter()
+                try:
+                    resultado = await conexion.llamar(metodo, **params)
+                except ErrorRPC:
+                    errores += 1
+                    continue
+                latencias.append(time.perf_counter() - inicio)
+                if metodo == 'move' and resultado['state']['terminado']:
+                    sesion = (await conexion.llamar('new_game'))['session']
+        finally:
+            await conexion.cerrar()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(i) for i in range(clientes)))
+    duracion = time.perf_counter() - inicio
+    return {
+        'peticiones': len(latencias),
+        'errores': errores,
+        'segundos': duracion,
+        'rps': len(latencias) / duracion if duracion > 0 else 0.0,
+        'p50_ms': percentil(latencias, 50) * 1000.0,
+        'p99_ms': percentil(latencias, 99) * 1000.0,
+    }
+
+
+async def _servir(args) -> None:
+    servidor = ServidorJuego(args.directorio, intervalo_guardado=args.intervalo_guardado)
+    await servidor.iniciar(args.host, args.puerto, args.unix)
+    print(f"Escuchando en {args.unix or servidor.direccion}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await servidor.detener()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Servidor local de partidas de 2048")
+    parser.add_argument('--host', default=HOST_DEFECTO)
+    parser.add_argument('--puerto', type=int, default=PUERTO_DEFECTO)
+    parser.add_argument('--unix', default=None, help="Ruta de socket Unix en lugar de TCP")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    p_ser = sub.add_parser('servir', help="Arranca el servidor")
+    p_ser.add_argument('--directorio', default=DIRECTORIO_SESIONES)
+    p_ser.add_argument('--intervalo-guardado', type=float, default=INTERVALO_GUARDADO_S)
+    p_car = sub.add_parser('carga', help="Generador de carga contra un servidor en marcha")
+    p_car.add_argument('--clientes', type=int, default=100)
+    p_car.add_argument('--peticiones', type=int, default=100, help="Peticiones por cliente")
+    p_car.add_argument('--prob-sugerencia', type=float, default=0.02)
+    args = parser.parse_args(argv)
+
+    if args.comando == 'servir':
+        logging.basicConfig(level=logging.INFO)
+        try:
+            asyncio.run(_servir(args))
+        except KeyboardInterrupt:
+            pass
+    else:
+        r = asyncio.run(generar_carga(args.clientes, args.peticiones, args.host, args.puerto,
+                                      args.unix, args.prob_sugerencia))
+        print(f"{r['peticiones']:.0f} peticiones en {r['segundos']:.2f} s: {r['rps']:.0f}/s, "
+              f"p50 {r['p50_ms']:.2f} ms, p99 {r['p99_ms']:.2f} ms, {r['errores']:.0f} errores")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,30 @@ import wx
 import logging
 import sys
 import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import event_log
+from animation import AnimadorFichas, celdas_cubiertas
+from announcer import PlanificadorAnuncios
+from autoplay import Autojugador
+from evaluator import EvaluadorTablas, cargar_pesos_evaluador
+from hint_engine import PrecalculadorSugerencias
+from lifetime_stats import EstadisticasVida
+from move_analyzer import analizar, describir, jugadas_costosas, resumen
+from ntuple import cargar_red
+from opening_book import LibroAperturas
+from puzzle_generator import PaqueteDesafios
 from sound_manager import SoundManager
 from game_logic import Logica2048, coord_nombre
-from ui_components import Celda
+from replay import GrabacionPartida, Repeticion
+from storage import AlmacenJuego
+from ui_components import Celda, AtlasFichas, TableroCanvas
+from watchdog import VigilanteUI
 from constants import (
+    ARCHIVO_AJUSTES, ARCHIVO_BD, ARCHIVO_GUARDADO, PERFIL_DEFECTO,
+    ARCHIVO_LIBRO, ARCHIVO_NTUPLAS, ARCHIVO_REPETICION, ARCHIVO_DESAFIOS,
+    TAMANO_DEFECTO, TAMANO_MAXIMO, TAMANO_MINIMO,
     COLOR_FONDO_TABLERO, COLORES_FONDO, COLORES_FONDO_HC,
     COLOR_TEXTO_OSCURO, COLOR_TEXTO_CLARO, COLORES_TEXTO_HC
 )
@@ -16,36 +36,108 @@ class VentanaJuego(wx.Frame):
     Main application window for the 2048 game.
     Manages the UI, keyboard events, and accessibility feedback.
     """
-    def __init__(self, parent, title):
+    def __init__(self, parent, title, perfil=PERFIL_DEFECTO):
         """Initializes the game window and core components."""
         super(VentanaJuego, self).__init__(parent, title=title, size=(700, 800))
         
         # Sonidos
         self.sounds = SoundManager()
         
+        # Partidas, ajustes y récords por perfil, en SQLite compartido entre instancias
+        self.perfil = perfil
+        try:
+            self.almacen = AlmacenJuego(ARCHIVO_BD)
+            self.almacen.migrar_json(self.perfil, ARCHIVO_GUARDADO, ARCHIVO_AJUSTES)
+        except Exception as e:
+            logging.error(f"Error abriendo {ARCHIVO_BD}, se usan archivos JSON: {e}")
+            self.almacen = None
+        
+        # Estadísticas de por vida del perfil (contadores; se vuelcan por lotes)
+        self.estadisticas = EstadisticasVida(self._guardar_estadisticas)
+        self._cargar_estadisticas()
+        
         # Intentar cargar juego guardado
-        self.juego = Logica2048()
+        self.juego = Logica2048(almacen=self.almacen, perfil=self.perfil)
         loaded = self.juego.cargar_juego()
         
         if loaded:
             self.tamano = self.juego.tamano
         else:
-            self.tamano = self.pedir_tamano()
+            self.tamano = self.pedir_tamano() or TAMANO_DEFECTO
             self.juego.tamano = self.tamano
             self.juego.iniciar_juego()
         
         self.botones = []
         self.cache_valores = {} # Cache de optimización: (r,c) -> val
+        self.cache_nombres = {} # (r, c, val, verbosidad, libres) -> nombre accesible
         self.foco_actual = [0, 0] # r, c
+        self.foco_anterior = None # Foco en el último refresco del tablero
+        self.foco_visual = None # Celda que dibuja el anillo de foco
         self.mensaje_evento_pendiente = "" 
         
         # Accessibility States — Sync with Logic
         self.verbosidad = getattr(self.juego, 'verbosidad', 1)
         self.alto_contraste = getattr(self.juego, 'alto_contraste', False)
+        self.tablero_unico = getattr(self.juego, 'tablero_unico', False)
         
-        self.historial_anuncios = []
+        # Anuncios agrupados y limitados en frecuencia; historial acotado
+        self.planificador = PlanificadorAnuncios(self._emitir_anuncio, self._programar_anuncio)
         self.wall_hit_count = 0
         self.last_wall_hit_key = None
+        self.ultimo_par = None # ((r, c), orientación) del último salto con F
+        
+        # Sugerencias calculadas en segundo plano mientras el jugador piensa
+        # Posiciones ya resueltas en sesiones anteriores (libro de aperturas)
+        try:
+            # Se indexa en segundo plano: mientras tanto, las sugerencias se buscan
+            self.libro = LibroAperturas(ARCHIVO_LIBRO, en_segundo_plano=True)
+        except (OSError, ValueError) as e:
+            logging.error(f"Error abriendo libro de aperturas: {e}")
+            self.libro = None
+        self.precalculador = PrecalculadorSugerencias(evaluar=self._crear_evaluador(), libro=self.libro,
+                                                      en_proceso=True)
+        
+        # Análisis de la partida grabada (Ctrl + Q) en un hilo con su pool de procesos
+        self.analisis_en_curso = False
+        self.analisis_detenido = threading.Event()
+        
+        # Desafío en curso (Ctrl + G) y movimientos hechos desde que empezó
+        self.desafio = None
+        self.movimientos_desafio = 0
+        
+        # Animación de deslizamiento (F6); solo se repintan las celdas que pisan las fichas móviles
+        self.animacion = getattr(self.juego, 'animacion', True)
+        self.animador = AnimadorFichas()
+        self.timer_animacion = None
+        self.celdas_animadas = set()
+        self.paso_animacion = (0, 0)
+        
+        # Juego automático (demostraciones y pruebas de resistencia)
+        self.autojugador = None
+        self.timer_autojuego = None
+        self.timer_render_autojuego = None
+        self.indice_velocidad_autojuego = 0
+        self.movimientos_dibujados = 0
+        self.fotogramas_autojuego = 0
+        
+        # Movimientos pendientes (auto-repetición / pulsaciones rápidas)
+        self.cola_movimientos = []
+        self.drenaje_programado = False
+        
+        # Redimensionado diferido
+        self.timer_redimension = None
+        self.inicio_redimension = 0.0
+        self.ultima_redimension = 0.0
+        self.eventos_redimension = 0
+        self.metricas_redimension = {}
+        
+        # Grabación de la partida y reproducción
+        self.grabacion = None
+        self.repeticion = None
+        self.timer_repeticion = None
+        self.paso_repeticion = 0
+        self.estado_en_vivo = None
+        self._iniciar_grabacion(intentar_cargar=loaded)
         
         # Logging Setup
         self._setup_logging()
@@ -58,29 +150,258 @@ class VentanaJuego(wx.Frame):
         # Foco inicial
         self.botones[0][0].SetFocus()
         self.actualizar_tablero(narrativa_inicial=True)
+        self.precalculador.solicitar(self.juego.tablero)
         
         # Auto-guardado al cerrar
         self.Bind(wx.EVT_CLOSE, self.al_cerrar_ventana)
         self.Bind(wx.EVT_SIZE, self.al_redimensionar)
+        
+        # Bloqueos del bucle de eventos (> 50 ms) con muestras de pila en ui_stalls.log
+        self.vigilante = VigilanteUI(wx.CallAfter)
+        self.vigilante.iniciar()
+
+    RETARDO_REDIMENSION_MS = 150
 
     def al_redimensionar(self, event):
         self.Layout()
-        # Refresh all cells to trigger on_paint with new sizes
-        if hasattr(self, 'botones'):
-            for fila in self.botones:
-                for celda in fila:
-                    celda.Refresh()
+        # Coalesce the resize storm: scaled tiles while dragging,
+        # one full-quality repaint once the size settles
+        ahora = time.perf_counter()
+        if self.timer_redimension is None:
+            self.inicio_redimension = ahora
+            self.eventos_redimension = 0
+            if hasattr(self, 'atlas'):
+                self.atlas.iniciar_borrador()
+            self.timer_redimension = wx.CallLater(self.RETARDO_REDIMENSION_MS, self._fin_redimension)
+        else:
+            self.timer_redimension.Restart(self.RETARDO_REDIMENSION_MS)
+        self.eventos_redimension += 1
+        self.ultima_redimension = ahora
         event.Skip()
 
+    def _fin_redimension(self):
+        self.timer_redimension = None
+        duracion = self.ultima_redimension - self.inicio_redimension
+        fps = self.eventos_redimension / duracion if duracion > 0 else 0.0
+        
+        t0 = time.perf_counter()
+        if hasattr(self, 'atlas'):
+            self.atlas.finalizar_borrador()
+        if self.botones:
+            self.panel.Freeze()
+            try:
+                for fila in self.botones:
+                    for celda in fila:
+                        celda.Refresh()
+            finally:
+                self.panel.Thaw()
+            # Paint synchronously so the measurement covers the real re-render
+            self.panel.Update()
+        render_ms = (time.perf_counter() - t0) * 1000.0
+        
+        self.metricas_redimension = {
+            'eventos': self.eventos_redimension,
+            'duracion_s': duracion,
+            'fps': fps,
+            'render_ms': render_ms
+        }
+        self.log_event("RESIZE", "Eventos: %d, FPS: %.1f, Render: %.1f ms", self.eventos_redimension, fps, render_ms)
+
+    def _crear_evaluador(self):
+        """Red de n-tuplas entrenada si la hay para este tamaño; si no, el evaluador por tablas."""
+        red = cargar_red(ARCHIVO_NTUPLAS, self.tamano)
+        if red is not None:
+            return red
+        # La tabla se construye en el proceso de búsqueda, no al arrancar
+        return EvaluadorTablas(self.tamano, cargar_pesos_evaluador(), precalcular=False)
+
+    def _guardar_estadisticas(self, sumas, maximos, fijos):
+        if self.almacen is None:
+            return
+        try:
+            self.almacen.guardar_estadisticas(self.perfil, sumas, maximos, fijos)
+        except Exception as e:
+            logging.error(f"Error guardando estadísticas: {e}")
+
+    def _cargar_estadisticas(self, conservar_partida=False):
+        """
+        Totales del almacén, que incluyen lo que hayan sumado otras instancias
+        del perfil. Con 'conservar_partida' se mantienen los movimientos de la
+        partida en curso de esta ventana (el almacén guarda los de la última
+        que volcó).
+        """
+        if self.almacen is None:
+            return
+        movimientos_partida = self.estadisticas.movimientos_partida
+        try:
+            if self.estadisticas.from_dict(self.almacen.cargar_estadisticas(self.perfil)) and conservar_partida:
+                self.estadisticas.movimientos_partida = movimientos_partida
+        except Exception as e:
+            logging.error(f"Error cargando estadísticas: {e}")
+
     def al_cerrar_ventana(self, event):
+        self.vigilante.detener()
+        self.analisis_detenido.set()
+        self.terminar_animacion()
+        if self.timer_repeticion is not None:
+            self.detener_repeticion(anunciar_fin=False)
+        if self.autojugador is not None:
+            self.detener_autojuego()
+        self.planificador.cancelar()
+        self.precalculador.detener()
+        if self.libro is not None:
+            self.libro.cerrar()
         self.juego.guardar_ajustes()
         self.juego.guardar_juego_estado()
+        self.estadisticas.vaciar()
+        self._guardar_grabacion()
         self.log_event("SAVE", "Juego y ajustes guardados al cerrar.")
+        if self.almacen is not None:
+            self.almacen.cerrar()
+        # Vaciar la cola de eventos pendientes antes de salir
+        event_log.detener()
         # Liberar recursos de audio inmediatamente
         if hasattr(self, 'sounds'):
             self.sounds.cleanup()
         event.Skip()
 
+    def nueva_partida(self, tamano, estado=None):
+        """Partida nueva del tamaño dado (o con el estado de 'estado'), reconstruyendo el tablero."""
+        self.tamano = tamano
+        self.juego = Logica2048(almacen=self.almacen, perfil=self.perfil)
+        self.juego.tamano = self.tamano
+        self.juego.iniciar_juego()
+        if estado is not None:
+            self.juego.from_dict(estado)
+        self._iniciar_grabacion()
+        self.precalculador.cancelar()
+        self.precalculador.evaluar = self._crear_evaluador()
+        
+        # Re-init UI
+        self.DestroyChildren()
+        self.botones = []
+        self.cache_valores = {}
+        self.cache_nombres = {}
+        self.foco_anterior = None
+        self.foco_visual = None
+        self.iniciar_ui()
+        
+        # Refresh focus
+        self.foco_actual = [0, 0]
+        self.botones[0][0].SetFocus()
+        self.actualizar_tablero(narrativa_inicial=True)
+        self.precalculador.solicitar(self.juego.tablero)
+
+    def reiniciar_partida(self):
+        """Ctrl + R. Cancelar el diálogo de tamaño deja la partida, su guardado y las estadísticas como estaban."""
+        self.sounds.play('RESTART')
+        nueva_tam = self.pedir_tamano()
+        if nueva_tam is None:
+            return False
+        self.juego.borrar_partida_guardada()
+        if not self.juego.sin_records:
+            self.estadisticas.registrar_abandono()
+        self.desafio = None
+        self.nueva_partida(nueva_tam)
+        self.anunciar("Juego Reiniciado y Reconfigurado")
+        return True
+
+    def _iniciar_grabacion(self, intentar_cargar=False):
+        """Empieza a grabar desde el estado actual o retoma la grabación guardada."""
+        self.grabacion = None
+        if intentar_cargar and os.path.exists(ARCHIVO_REPETICION):
+            try:
+                grabacion = GrabacionPartida.cargar(ARCHIVO_REPETICION)
+                # Solo vale si termina exactamente en la partida cargada
+                if Repeticion(grabacion).final.tablero == self.juego.tablero:
+                    self.grabacion = grabacion
+            except Exception as e:
+                logging.error(f"Error cargando repetición: {e}")
+        if self.grabacion is None:
+            self.grabacion = GrabacionPartida(self.juego.tablero, self.juego.puntuacion, self.juego.max_ficha)
+
+    def _guardar_grabacion(self):
+        try:
+            self.grabacion.guardar(ARCHIVO_REPETICION)
+        except Exception as e:
+            logging.error(f"Error guardando repetición: {e}")
+
+    VELOCIDAD_REPETICION = 4.0 # Movimientos por segundo
+
+    def alternar_repeticion(self):
+        if self.timer_repeticion is not None:
+            self.detener_repeticion()
+            return
+        if not len(self.grabacion):
+            self.anunciar("No hay movimientos grabados")
+            return
+        self.reproducir_repeticion(Repeticion(self.grabacion))
+
+    def pedir_movimiento_repeticion(self):
+        """Pide un número de movimiento y reproduce la partida desde ahí."""
+        total = len(self.grabacion)
+        if not total:
+            self.anunciar("No hay movimientos grabados")
+            return
+        dlg = wx.TextEntryDialog(self, f"Ir al movimiento (0-{total}):", "Repetición", "0")
+        if dlg.ShowModal() == wx.ID_OK:
+            try:
+                n = int(dlg.GetValue())
+            except ValueError:
+                n = -1
+            if 0 <= n <= total:
+                if self.timer_repeticion is not None:
+                    self.detener_repeticion(anunciar_fin=False)
+                self.reproducir_repeticion(Repeticion(self.grabacion), desde=n)
+            else:
+                self.anunciar(f"Movimiento fuera de rango (0-{total})")
+        dlg.Destroy()
+
+    def reproducir_repeticion(self, repeticion, movimientos_por_segundo=None, desde=0):
+        """Muestra la repetición en el tablero paso a paso a la velocidad indicada."""
+        mps = movimientos_por_segundo or self.VELOCIDAD_REPETICION
+        self.repeticion = repeticion
+        self.estado_en_vivo = ([fila[:] for fila in self.juego.tablero], self.juego.puntuacion, self.juego.max_ficha)
+        self.paso_repeticion = desde
+        self.anunciar(f"Reproduciendo desde el movimiento {desde} de {len(repeticion)}")
+        self._mostrar_paso_repeticion()
+        self.timer_repeticion = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self._avanzar_repeticion, self.timer_repeticion)
+        self.timer_repeticion.Start(max(1, int(1000 / mps)))
+
+    def _avanzar_repeticion(self, event):
+        if self.paso_repeticion >= len(self.repeticion):
+            self.detener_repeticion()
+            return
+        self.paso_repeticion += 1
+        self._mostrar_paso_repeticion()
+
+    def _mostrar_paso_repeticion(self):
+        estado = self.repeticion.estado(self.paso_repeticion)
+        self.juego.tablero = estado.tablero
+        self.juego.puntuacion = estado.puntuacion
+        self.juego.max_ficha = estado.max_ficha
+        self.juego.marcar_todas_cambiadas()
+        self.actualizar_tablero(forzar_silencio_foco=True)
+        self.SetTitle(f"2048 - Repetición: movimiento {self.paso_repeticion} de {len(self.repeticion)} | Score: {estado.puntuacion}")
+
+    def detener_repeticion(self, anunciar_fin=True):
+        """Para la reproducción y devuelve el tablero a la partida en curso."""
+        if self.timer_repeticion is not None:
+            self.timer_repeticion.Stop()
+            self.Unbind(wx.EVT_TIMER, handler=self._avanzar_repeticion, source=self.timer_repeticion)
+            self.timer_repeticion = None
+        if self.estado_en_vivo is not None:
+            tablero, puntuacion, max_ficha = self.estado_en_vivo
+            self.juego.tablero = tablero
+            self.juego.puntuacion = puntuacion
+            self.juego.max_ficha = max_ficha
+            self.estado_en_vivo = None
+            self.juego.marcar_todas_cambiadas()
+            self.actualizar_tablero(forzar_silencio_foco=True)
+        if anunciar_fin:
+            self.anunciar("Repetición terminada")
+
     def _setup_logging(self):
         try:
             # Determinamos la ruta del ejecutable o script
@@ -97,42 +418,41 @@ class VentanaJuego(wx.Frame):
             if not os.access(base_pth, os.W_OK):
                 self.log_file = os.path.join(os.path.expanduser("~"), "Desktop", "game_events.log")
 
-            self.logger = logging.getLogger("2048_Accesible")
-            self.logger.setLevel(logging.INFO)
-            
-            if not self.logger.handlers:
-                # Usar encoding utf-8 y asegurar flush
-                handler = logging.FileHandler(self.log_file, mode='a', encoding='utf-8')
-                formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-                handler.setFormatter(formatter)
-                self.logger.addHandler(handler)
+            # Escritura en segundo plano (JSON Lines, rotación comprimida)
+            event_log.fijar_categorias_desactivadas(getattr(self.juego, 'log_desactivadas', []))
+            self.registro = event_log.iniciar(self.log_file)
             
-            self.logger.info("--- LOG START ---")
-            self.logger.info(f"Log de eventos activo en: {self.log_file}")
+            event_log.registrar("LOG_START", "--- LOG START ---")
+            event_log.registrar("LOG_START", "Log de eventos activo en: %s", self.log_file)
             
         except Exception as e:
             wx.MessageBox(f"No se pudo iniciar el log en {self.log_file if hasattr(self, 'log_file') else 'desconocido'}: {e}", 
                          "Error de Log", wx.ICON_ERROR)
 
-    def log_event(self, category, message):
-        # Limpiamos espacios al final (usados para forzar lectura) antes de loguear
-        msg_clean = str(message).rstrip()
-        msg = f"[{category}] {msg_clean}"
-        if hasattr(self, 'logger'):
-            self.logger.info(msg)
+    def log_event(self, category, message, *args):
+        # Disabled categories return before any formatting; the rest is
+        # formatted and written on the logging thread
+        if event_log.categoria_activa(category):
+            event_log.registrar(category, str(message), *args)
 
     def pedir_tamano(self):
-        dlg = wx.TextEntryDialog(None, "Introduce tamaño (4-10):", "Configuración", "4")
-        val = 4
-        if dlg.ShowModal() == wx.ID_OK:
+        """Tamaño elegido en el diálogo; None si se cancela."""
+        dlg = wx.TextEntryDialog(None, f"Introduce tamaño ({TAMANO_MINIMO}-{TAMANO_MAXIMO}):", "Configuración",
+                                 str(TAMANO_DEFECTO))
+        val = TAMANO_DEFECTO
+        if dlg.ShowModal() != wx.ID_OK:
+            val = None
+        else:
             try:
                 v = int(dlg.GetValue())
-                if 4 <= v <= 10: 
+                if TAMANO_MINIMO <= v <= TAMANO_MAXIMO:
                     val = v
                 else:
-                    wx.MessageBox(f"Tamaño {v} fuera de rango (4-10). Usando defecto 4.", "Aviso", wx.ICON_WARNING)
+                    wx.MessageBox(f"Tamaño {v} fuera de rango ({TAMANO_MINIMO}-{TAMANO_MAXIMO}). "
+                                  f"Usando defecto {TAMANO_DEFECTO}.", "Aviso", wx.ICON_WARNING)
             except ValueError:
-                wx.MessageBox("Entrada no válida. Por favor, introduce un número entre 4 y 10. Usando defecto 4.", "Aviso", wx.ICON_WARNING)
+                wx.MessageBox(f"Entrada no válida. Por favor, introduce un número entre {TAMANO_MINIMO} y "
+                              f"{TAMANO_MAXIMO}. Usando defecto {TAMANO_DEFECTO}.", "Aviso", wx.ICON_WARNING)
         dlg.Destroy()
         return val
 
@@ -142,14 +462,6 @@ class VentanaJuego(wx.Frame):
         
         main_sizer = wx.BoxSizer(wx.VERTICAL)
         
-        # Board Panel with padding
-        panel = wx.Panel(self)
-        self.panel = panel
-        panel.SetBackgroundColour(wx.Colour(*COLOR_FONDO_TABLERO))
-        
-        # Grid layout with generous, premium spacing
-        sizer = wx.GridSizer(self.tamano, self.tamano, 10, 10)
-        
         celda_config = {
             'colores_fondo': COLORES_FONDO,
             'colores_fondo_hc': COLORES_FONDO_HC,
@@ -157,34 +469,115 @@ class VentanaJuego(wx.Frame):
             'color_texto_claro': COLOR_TEXTO_CLARO,
             'high_contrast_colors': COLORES_TEXTO_HC
         }
+        # Un único atlas de fichas compartido por todas las celdas
+        if not hasattr(self, 'atlas'):
+            self.atlas = AtlasFichas(celda_config)
         
-        for r in range(self.tamano):
-            fila_botones = []
-            for c in range(self.tamano):
-                celda = Celda(panel, size=80, 
-                              r=r, c=c, 
-                              config=celda_config)
-                
-                # Small cell margin to separate shadow from grid edges
-                sizer.Add(celda, 1, wx.EXPAND | wx.ALL, 2)
-                fila_botones.append(celda)
-                
-                self.cache_valores[(r,c)] = -1
-            self.botones.append(fila_botones)
+        if self.tablero_unico:
+            # Alternative board: one canvas with virtual accessible children
+            panel = TableroCanvas(self, self.tamano, celda_config, self.atlas, COLOR_FONDO_TABLERO)
+            self.panel = panel
+            self.botones = panel.celdas
+            for r in range(self.tamano):
+                for c in range(self.tamano):
+                    self.cache_valores[(r,c)] = -1
+        else:
+            # Board Panel with padding
+            panel = wx.Panel(self)
+            self.panel = panel
+            panel.SetBackgroundColour(wx.Colour(*COLOR_FONDO_TABLERO))
+            
+            # Grid layout with generous, premium spacing
+            sizer = wx.GridSizer(self.tamano, self.tamano, 10, 10)
             
-        panel.SetSizer(sizer)
+            for r in range(self.tamano):
+                fila_botones = []
+                for c in range(self.tamano):
+                    celda = Celda(panel, size=80, 
+                                  r=r, c=c, 
+                                  config=celda_config, atlas=self.atlas)
+                    
+                    # Small cell margin to separate shadow from grid edges
+                    sizer.Add(celda, 1, wx.EXPAND | wx.ALL, 2)
+                    fila_botones.append(celda)
+                    
+                    self.cache_valores[(r,c)] = -1
+                self.botones.append(fila_botones)
+                
+            panel.SetSizer(sizer)
         main_sizer.Add(panel, 1, wx.EXPAND | wx.ALL, 15)
         self.SetSizer(main_sizer)
         
         self.Bind(wx.EVT_CHAR_HOOK, self.al_pulsar_tecla)
 
 
+    TECLAS_EXPLORACION = {
+        wx.WXK_UP, wx.WXK_DOWN, wx.WXK_LEFT, wx.WXK_RIGHT,
+        wx.WXK_NUMPAD_UP, wx.WXK_NUMPAD_DOWN, wx.WXK_NUMPAD_LEFT, wx.WXK_NUMPAD_RIGHT,
+        wx.WXK_HOME, wx.WXK_END, wx.WXK_PAGEUP, wx.WXK_PAGEDOWN,
+        ord('I'), ord('S'), ord('E'), ord('L'), ord('T'), wx.WXK_F1,
+        ord('M'), ord('N'), ord('F'), ord('J')
+    }
+
+    TECLAS_MOVIMIENTO = {
+        wx.WXK_UP: 'ARRIBA',
+        wx.WXK_NUMPAD_UP: 'ARRIBA',
+        wx.WXK_DOWN: 'ABAJO',
+        wx.WXK_NUMPAD_DOWN: 'ABAJO',
+        wx.WXK_LEFT: 'IZQUIERDA',
+        wx.WXK_NUMPAD_LEFT: 'IZQUIERDA',
+        wx.WXK_RIGHT: 'DERECHA',
+        wx.WXK_NUMPAD_RIGHT: 'DERECHA'
+    }
+    # Pulsar solo un modificador no cierra el lote de movimientos encolados
+    TECLAS_MODIFICADORAS = {wx.WXK_SHIFT, wx.WXK_CONTROL, wx.WXK_ALT}
+
     def al_pulsar_tecla(self, event):
         code = event.GetKeyCode()
         shift = event.ShiftDown()
         control = event.ControlDown()
         
-        self.log_event("INPUT", f"Tecla: {code}, Shift: {shift}, Ctrl: {control}")
+        self.log_event("INPUT", "Tecla: %d, Shift: %s, Ctrl: %s", code, shift, control)
+        # Cualquier otra tecla actúa sobre el tablero ya movido: los movimientos
+        # encolados se aplican antes, en el orden en que se pulsaron
+        es_movimiento = shift and code in self.TECLAS_MOVIMIENTO
+        if self.cola_movimientos and not es_movimiento and code not in self.TECLAS_MODIFICADORAS:
+            self._procesar_cola_movimientos()
+        # Lo que quede pendiente de pulsaciones anteriores pasa a ser obsoleto
+        self.planificador.nueva_entrada()
+        # Una tecla nueva lleva la animación en curso directamente al final
+        self.terminar_animacion()
+        
+        # Juego automático (Ctrl + A / Ctrl + Shift + A); cualquier otra tecla lo detiene
+        if control and code == ord('A'):
+            if shift:
+                self.cambiar_velocidad_autojuego()
+            else:
+                self.alternar_autojuego()
+            return
+        if self.autojugador is not None:
+            self.detener_autojuego()
+            return
+        
+        # Repetición (Ctrl + P / Ctrl + Shift + P)
+        if control and code == ord('P'):
+            if shift:
+                self.pedir_movimiento_repeticion()
+            else:
+                self.alternar_repeticion()
+            return
+        
+        # Durante la repetición solo se permite explorar el tablero
+        if self.timer_repeticion is not None and (shift or control or code not in self.TECLAS_EXPLORACION):
+            self.detener_repeticion()
+        
+        if control and code == ord('D'):
+            self.anunciar(self.vigilante.resumen())
+            return
+        
+        if control and code == ord('Q'):
+            self.analizar_partida()
+            return
         
         if control and code == ord('S'):
             self.juego.guardar_juego_estado()
@@ -195,38 +588,30 @@ class VentanaJuego(wx.Frame):
 
         # Reiniciar Juego (Ctrl + R)
         if control and code == ord('R'):
-             self.sounds.play('RESTART')
-             if os.path.exists(self.juego.ARCHIVO_GUARDADO):
-                  try: os.remove(self.juego.ARCHIVO_GUARDADO)
-                  except Exception: pass
-             
-             nueva_tam = self.pedir_tamano()
-             if nueva_tam:
-                  self.tamano = nueva_tam
-                  self.juego = Logica2048()
-                  self.juego.tamano = self.tamano
-                  self.juego.iniciar_juego()
-                  
-                  # Re-init UI
-                  self.DestroyChildren()
-                  self.botones = []
-                  self.cache_valores = {}
-                  self.iniciar_ui()
-                  
-                  # Refresh focus
-                  self.foco_actual = [0, 0]
-                  self.botones[0][0].SetFocus()
-                  self.actualizar_tablero(narrativa_inicial=True)
-                  self.anunciar("Juego Reiniciado y Reconfigurado")
+             self.reiniciar_partida()
              return
+        
+        # Desafíos (Ctrl + G / Ctrl + Shift + G)
+        if control and code == ord('G'):
+            if shift:
+                self.anunciar_desafio()
+            else:
+                self.iniciar_desafio()
+            return
 
         # Accessibility Shortcuts
         if control and code == ord('Z'):
             if self.juego.deshacer():
+                self.grabacion.deshacer()
+                if not self.juego.sin_records:
+                    self.estadisticas.registrar_deshacer()
+                if self.desafio is not None:
+                    self.movimientos_desafio = max(self.movimientos_desafio - 1, 0)
                 self.sounds.play('UNDO')
                 if self.verbosidad >= 1:
                     self.mensaje_evento_pendiente = "Deshacer"
                 self.actualizar_tablero()
+                self.precalculador.solicitar(self.juego.tablero)
             else:
                 self.sounds.play('INVALID')
                 if self.verbosidad >= 1:
@@ -241,13 +626,16 @@ class VentanaJuego(wx.Frame):
              self.toggle_contrast()
              return
              
+        if code == wx.WXK_F6:
+             self.toggle_animacion()
+             return
+             
         if code == ord('V'):
              self.toggle_verbosity()
              return
              
         if code == ord('H'):
-             sug = self.juego.obtener_sugerencia()
-             self.anunciar(f"Sugerencia: {sug}")
+             self.anunciar_sugerencia()
              return
              
         if code == ord('I'):
@@ -258,25 +646,26 @@ class VentanaJuego(wx.Frame):
         if code == ord('L'):
              self.anunciar_historial()
              return
+             
+        if code == ord('T'):
+             self.estadisticas.vaciar()
+             self._cargar_estadisticas(conservar_partida=True)
+             self.anunciar(self.estadisticas.resumen())
+             return
+             
+        # Saltos por valor (M / N / F / J; con Shift, hacia atrás)
+        if code in (ord('M'), ord('N'), ord('F'), ord('J')) and not control:
+             self.saltar_foco(chr(code), atras=shift)
+             return
 
-        # Mapping definition
-        movimiento_map = {
-            wx.WXK_UP: 'ARRIBA',
-            wx.WXK_NUMPAD_UP: 'ARRIBA',
-            wx.WXK_DOWN: 'ABAJO',
-            wx.WXK_NUMPAD_DOWN: 'ABAJO',
-            wx.WXK_LEFT: 'IZQUIERDA',
-            wx.WXK_NUMPAD_LEFT: 'IZQUIERDA',
-            wx.WXK_RIGHT: 'DERECHA',
-            wx.WXK_NUMPAD_RIGHT: 'DERECHA'
-        }
+        movimiento_map = self.TECLAS_MOVIMIENTO
 
         # Atajos de Información (S / E / Esc)
         if code == ord('S'):
             info = f"Puntaje: {self.juego.puntuacion}"
             self.SetTitle(f"2048 - {info}")
             self.log_event("INFO", info)
-            self.anunciar_en_foco(info, forzar_repeticion=True)
+            self.planificador.anunciar(info, historial=False)
             return
             
         elif code == ord('E'):
@@ -285,7 +674,7 @@ class VentanaJuego(wx.Frame):
             info = f"{libres_count} casillas libres. Máxima: {max_f}"
             self.SetTitle(f"2048 - {info}")
             self.log_event("INFO", info)
-            self.anunciar_en_foco(info, forzar_repeticion=True)
+            self.planificador.anunciar(info, historial=False)
             return
 
         elif code == wx.WXK_ESCAPE:
@@ -328,37 +717,12 @@ class VentanaJuego(wx.Frame):
         # Movimiento
         elif code in movimiento_map:
             if shift:
-                # JUEGO
-                direccion = movimiento_map[code]
-                if self.juego.mover(direccion):
-                    self.sounds.play('MOVE')
-                    
-                    # Narrative Handling: Simplified for Universal Accessibility
-                    narrativa = ". ".join(self.juego.narrativa)
-                    self.mensaje_evento_pendiente = narrativa
-                    
-                    # Info ONLY in High Verbosity (and only if something happened)
-                    if self.verbosidad == 2 and narrativa:
-                        libres = len(self.juego.celdas_libres())
-                        info = f"Puntuación: {self.juego.puntuacion}. {libres} casillas libres."
-                        self.mensaje_evento_pendiente += f". {info}"
-                    
-                    self.actualizar_tablero()
-                    
-                    if self.juego.juego_terminado():
-                        self.sounds.play('GAMEOVER')
-                        self.SetTitle("2048 - Juego Terminado")
-                        txt_fin = f"Juego Terminado. Puntaje final: {self.juego.puntuacion}"
-                        self.anunciar(txt_fin)
-                        # MessageBox is modal and blocks, announce FIRST
-                        wx.CallAfter(wx.MessageBox, f"Juego Terminado. Puntos: {self.juego.puntuacion}", "Fin")
-                        if os.path.exists(self.juego.ARCHIVO_GUARDADO):
-                             try: os.remove(self.juego.ARCHIVO_GUARDADO)
-                             except Exception: pass
-                else:
-                    self.sounds.play('INVALID')
-                    if self.verbosidad == 2:
-                        self.anunciar("Movimiento no posible")
+                # JUEGO: se encola y se procesa en lote con las pulsaciones pendientes
+                self.cola_movimientos.append(movimiento_map[code])
+                if not self.drenaje_programado:
+                    self.drenaje_programado = True
+                    # WM_TIMER has the lowest priority: queued key repeats reach the queue first
+                    wx.CallLater(1, self._procesar_cola_movimientos)
             else:
                 # NAVEGACION
                 dr, dc = 0, 0
@@ -368,24 +732,306 @@ class VentanaJuego(wx.Frame):
                 elif cmd == 'IZQUIERDA': dc = -1
                 elif cmd == 'DERECHA': dc = 1
                 
-                self.log_event("NAVIGATE", f"Dir: {dr}, {dc}")
+                self.log_event("NAVIGATE", "Dir: %d, %d", dr, dc)
                 self.mover_foco(dr, dc, key_code=code)
                 
         else:
             event.Skip()
 
+    def _procesar_cola_movimientos(self):
+        """Aplica todos los movimientos encolados y refresca/guarda/anuncia una sola vez."""
+        self.drenaje_programado = False
+        cola = self.cola_movimientos
+        self.cola_movimientos = []
+        if not cola:
+            return
+        
+        puntos_inicio = self.juego.puntuacion
+        validos = 0
+        nuevo_record = False
+        narrativa = ""
+        terminado = False
+        for direccion in cola:
+            if self.juego.mover(direccion, guardar=False):
+                validos += 1
+                self.grabacion.registrar(direccion, self.juego.ultima_ficha)
+                # Each move resets the flag; keep it if any move in the batch set it
+                nuevo_record = nuevo_record or self.juego.new_high_score
+                narrativa = ". ".join(self.juego.narrativa)
+                # El plazo del desafío cuenta movimiento a movimiento, no por lote
+                desafio_resuelto = self.comprobar_desafio()
+                if self.juego.juego_terminado():
+                    terminado = True
+                    break
+                if desafio_resuelto:
+                    break
+        
+        if not validos:
+            self.sounds.play('INVALID')
+            if self.verbosidad == 2:
+                self.anunciar("Movimiento no posible")
+            return
+        
+        self.juego.new_high_score = nuevo_record
+        self.juego.guardar_juego_estado()
+        if not self.juego.sin_records:
+            self.estadisticas.registrar_movimiento(validos)
+        self.sounds.play('MOVE')
+        self.log_event("MOVE_BATCH", "Pulsaciones: %d, Movimientos: %d", len(cola), validos)
+        
+        # Narrative Handling: Simplified for Universal Accessibility
+        if validos > 1:
+            # Resumen neto del lote; la narrativa detallada es la del último movimiento
+            resumen = f"{validos} movimientos, {self.juego.puntuacion - puntos_inicio} puntos"
+            narrativa = f"{resumen}. {narrativa}" if narrativa and self.verbosidad > 0 else resumen
+        self.mensaje_evento_pendiente = narrativa
+        
+        # Info ONLY in High Verbosity (and only if something happened)
+        if self.verbosidad == 2 and narrativa:
+            libres = len(self.juego.celdas_libres())
+            info = f"Puntuación: {self.juego.puntuacion}. {libres} casillas libres."
+            self.mensaje_evento_pendiente += f". {info}"
+        
+        self.actualizar_tablero()
+        # Empezar a pensar la siguiente sugerencia (cancela la anterior)
+        self.precalculador.solicitar(self.juego.tablero)
+        # Un lote de varias pulsaciones no se anima: se muestra el resultado
+        if validos == 1:
+            self.iniciar_animacion()
+        
+        if terminado:
+            self._fin_de_partida()
+
+    def _origen_celda(self, r, c):
+        if self.tablero_unico:
+            return self.panel.rect_celda(r, c).GetPosition()
+        return self.botones[r][c].GetPosition()
+
+    def iniciar_animacion(self):
+        """Anima el último movimiento a partir de los desplazamientos de Logica2048."""
+        if not self.animacion or self.tamano < 2:
+            return
+        ficha = self.juego.ultima_ficha
+        ocultas = [(ficha[0], ficha[1])] if ficha else []
+        if not self.animador.iniciar(self.juego.desplazamientos(), ocultas):
+            return
+        # Distancia en píxeles entre celdas contiguas (incluye la separación)
+        origen = self._origen_celda(0, 0)
+        siguiente = self._origen_celda(1, 1)
+        self.paso_animacion = (siguiente.x - origen.x, siguiente.y - origen.y)
+        self.celdas_animadas = set()
+        for r, c in self.animador.ocultas:
+            self.botones[r][c].fijar_animacion(True, [])
+        self.timer_animacion = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self._tick_animacion, self.timer_animacion)
+        self.timer_animacion.Start(max(1, int(self.animador.intervalo * 1000)))
+        self._tick_animacion(None)
+
+    def _tick_animacion(self, event):
+        inicio = time.perf_counter()
+        fichas = self.animador.fotograma()
+        if fichas is None:
+            self.terminar_animacion()
+            return
+        px, py = self.paso_animacion
+        nuevas = {}
+        for ficha in fichas:
+            for (r, c), dr, dc in celdas_cubiertas(ficha):
+                nuevas.setdefault((r, c), []).append((ficha.valor, int(dc * px), int(dr * py)))
+        ocultas = self.animador.ocultas
+        tocadas = self.celdas_animadas | set(nuevas)
+        for r, c in tocadas:
+            self.botones[r][c].fijar_animacion((r, c) in ocultas, nuevas.get((r, c), []))
+        # Pintar ya, para que el coste medido sea el del fotograma completo
+        for r, c in tocadas:
+            self.botones[r][c].Update()
+        self.celdas_animadas = set(nuevas)
+        self.animador.registrar_coste(time.perf_counter() - inicio)
+
+    def terminar_animacion(self):
+        """Salta al estado final (tecla nueva, fin natural o F6) y registra el informe."""
+        if self.timer_animacion is None:
+            return
+        self.timer_animacion.Stop()
+        self.Unbind(wx.EVT_TIMER, handler=self._tick_animacion, source=self.timer_animacion)
+        self.timer_animacion = None
+        informe = self.animador.terminar()
+        for r, c in self.celdas_animadas | self.animador.ocultas:
+            self.botones[r][c].fijar_animacion(False, [])
+        self.celdas_animadas = set()
+        self.log_event("ANIMATION", "Fichas: %d, fotogramas: %d, perdidos: %d, coste medio: %.2f ms, máximo: %.2f ms",
+                       informe['fichas'], informe['fotogramas'], informe['perdidos'],
+                       informe['coste_medio_ms'], informe['coste_max_ms'])
+
+    def toggle_animacion(self):
+        self.animacion = not self.animacion
+        self.juego.animacion = self.animacion
+        if not self.animacion:
+            self.terminar_animacion()
+        self.sounds.play('TOGGLE_ON' if self.animacion else 'TOGGLE_OFF')
+        self.anunciar(f"Animación {'Activada' if self.animacion else 'Desactivada'}")
+        self.juego.guardar_ajustes()
+
+    def _fin_de_partida(self):
+        self.sounds.play('GAMEOVER')
+        self.SetTitle("2048 - Juego Terminado")
+        txt_fin = f"Juego Terminado. Puntaje final: {self.juego.puntuacion}"
+        self.anunciar(txt_fin, inmediato=True)
+        self._guardar_grabacion()
+        if not self.juego.sin_records:
+            self.estadisticas.registrar_fin(self.juego.puntuacion, self.juego.max_ficha)
+        # MessageBox is modal and blocks, announce FIRST
+        wx.CallAfter(wx.MessageBox, f"Juego Terminado. Puntos: {self.juego.puntuacion}", "Fin")
+        self.juego.borrar_partida_guardada()
+
+    VELOCIDADES_AUTOJUEGO = [2, 5, 10, 30, 0] # Movimientos por segundo (0 = lo más rápido posible)
+    FPS_AUTOJUEGO = 30
+    PRESUPUESTO_TICK_AUTOJUEGO_S = 0.008 # A máxima velocidad, tiempo de juego por tick
+
+    def _texto_velocidad_autojuego(self):
+        mps = self.VELOCIDADES_AUTOJUEGO[self.indice_velocidad_autojuego]
+        return "Velocidad máxima" if mps == 0 else f"{mps} movimientos por segundo"
+
+    def _intervalo_autojuego(self):
+        mps = self.VELOCIDADES_AUTOJUEGO[self.indice_velocidad_autojuego]
+        return 1 if mps == 0 else int(1000 / mps)
+
+    def alternar_autojuego(self):
+        if self.autojugador is not None:
+            self.detener_autojuego()
+            return
+        if self.juego.juego_terminado():
+            self.anunciar("La partida ha terminado")
+            return
+        self.anunciar(f"Juego automático activado. {self._texto_velocidad_autojuego()}", inmediato=True)
+        self.log_event("AUTOPLAY", "Inicio: %s", self._texto_velocidad_autojuego())
+        # Sin log por evento mientras dure: solo el resumen final
+        event_log.silenciar(True)
+        self.precalculador.cancelar()
+        
+        self.autojugador = Autojugador(self.juego, al_mover=self._registrar_autojugada)
+        self.movimientos_dibujados = 0
+        self.fotogramas_autojuego = 0
+        # Moves and drawing run on separate timers: only the latest state is drawn
+        self.timer_autojuego = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self._tick_autojuego, self.timer_autojuego)
+        self.timer_autojuego.Start(self._intervalo_autojuego())
+        self.timer_render_autojuego = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self._dibujar_autojuego, self.timer_render_autojuego)
+        self.timer_render_autojuego.Start(1000 // self.FPS_AUTOJUEGO)
+
+    def cambiar_velocidad_autojuego(self):
+        self.indice_velocidad_autojuego = (self.indice_velocidad_autojuego + 1) % len(self.VELOCIDADES_AUTOJUEGO)
+        if self.timer_autojuego is not None:
+            self.timer_autojuego.Start(self._intervalo_autojuego())
+        self.anunciar(self._texto_velocidad_autojuego())
+
+    def _registrar_autojugada(self, direccion):
+        self.grabacion.registrar(direccion, self.juego.ultima_ficha)
+        self.comprobar_desafio()
+
+    def _tick_autojuego(self, event):
+        if self.autojugador is None:
+            return
+        if self.VELOCIDADES_AUTOJUEGO[self.indice_velocidad_autojuego] == 0:
+            self.autojugador.ejecutar(10 ** 9, self.PRESUPUESTO_TICK_AUTOJUEGO_S)
+        else:
+            self.autojugador.paso()
+        if self.autojugador.terminado:
+            self.detener_autojuego()
+
+    def _dibujar_autojuego(self, event):
+        if self.autojugador is None or self.autojugador.movimientos == self.movimientos_dibujados:
+            return
+        self.movimientos_dibujados = self.autojugador.movimientos
+        self.fotogramas_autojuego += 1
+        self.actualizar_tablero(forzar_silencio_foco=True)
+
+    def detener_autojuego(self):
+        for timer, handler in ((self.timer_autojuego, self._tick_autojuego),
+                               (self.timer_render_autojuego, self._dibujar_autojuego)):
+            if timer is not None:
+                timer.Stop()
+                self.Unbind(wx.EVT_TIMER, handler=handler, source=timer)
+        self.timer_autojuego = None
+        self.timer_render_autojuego = None
+        autojugador = self.autojugador
+        self.autojugador = None
+        event_log.silenciar(False)
+        if autojugador is None:
+            return
+        
+        mps = autojugador.movimientos_por_segundo
+        self.log_event("AUTOPLAY", "Fin: %d movimientos, %.1f mov/s, %d fotogramas",
+                       autojugador.movimientos, mps, self.fotogramas_autojuego)
+        # Un único guardado y un único refresco para toda la sesión automática
+        self.juego.guardar_juego_estado()
+        if not self.juego.sin_records:
+            self.estadisticas.registrar_movimiento(autojugador.movimientos)
+        self.actualizar_tablero(forzar_silencio_foco=True)
+        if self.juego.juego_terminado():
+            self._fin_de_partida()
+        else:
+            self.anunciar(f"Juego automático detenido. {autojugador.movimientos} movimientos, {mps:.0f} por segundo")
+            self.precalculador.solicitar(self.juego.tablero)
+
     def fijar_foco(self, r, c):
         if 0 <= r < self.tamano and 0 <= c < self.tamano:
             if [r, c] == self.foco_actual:
-                self.anunciar_en_foco()
+                self.planificador.anunciar("", historial=False)
             else:
-                self.log_event("FOCUS_CHANGE", f"Target: {r},{c}")
+                self.log_event("FOCUS_CHANGE", "Target: %d,%d", r, c)
                 self.botones[r][c].SetFocus()
                 self.foco_actual = [r, c]
                 # Note: No call to anunciar_en_foco here to avoid double-reading 
                 # (native focus event already reads the cell)
             self._actualizar_foco_visual()
 
+    def saltar_foco(self, tecla, atras=False):
+        """
+        M: ficha mayor, N: siguiente ficha del mismo valor que la enfocada,
+        F: siguiente par fusionable, J: siguiente casilla libre. Usa el índice
+        de Logica2048 (búsqueda binaria), sin recorrer el tablero.
+        """
+        indice = self.juego.indice
+        desde = tuple(self.foco_actual)
+        mensaje = None
+        if tecla == 'M':
+            maximo = indice.maximo()
+            destino = indice.siguiente(maximo, desde, atras)
+            cantidad = indice.cantidad(maximo)
+            if cantidad > 1:
+                mensaje = f"{cantidad} fichas de {maximo}"
+        elif tecla == 'N':
+            valor = self.juego.tablero[desde[0]][desde[1]]
+            destino = indice.siguiente(valor, desde, atras)
+            if destino == desde:
+                mensaje = "No hay otra casilla libre" if valor == 0 else f"No hay otra ficha de {valor}"
+        elif tecla == 'J':
+            destino = indice.siguiente(0, desde, atras)
+            if destino is None:
+                mensaje = "No hay casillas libres"
+        else:
+            # Si seguimos en la celda del último par, no repetirlo (puede haber otro vertical)
+            orientacion = self.ultimo_par[1] if self.ultimo_par and self.ultimo_par[0] == desde else None
+            par = indice.siguiente_par(desde, atras, orientacion)
+            self.ultimo_par = None
+            if par is None:
+                destino = None
+                mensaje = "No hay fichas para fusionar"
+            else:
+                destino, otra = par
+                self.ultimo_par = (destino, 0 if otra[0] == destino[0] else 1)
+                valor = self.juego.tablero[destino[0]][destino[1]]
+                mensaje = f"{valor} en {coord_nombre(*destino)} y {coord_nombre(*otra)}"
+        self.log_event("NAVIGATE", "Salto %s: %s", tecla, destino)
+        if destino is None or list(destino) == self.foco_actual:
+            self.anunciar_en_foco(mensaje, forzar_repeticion=True)
+        else:
+            self.fijar_foco(*destino)
+            if mensaje:
+                self.planificador.anunciar(mensaje, historial=False)
+
     def mover_foco(self, dr, dc, key_code=None):
         r, c = self.foco_actual
         nr, nc = r + dr, c + dc
@@ -410,18 +1056,19 @@ class VentanaJuego(wx.Frame):
                 pass
 
     def _actualizar_foco_visual(self):
-         # Iterate all and set focus flag
-         # Optimization: only update old and new?
-         # But old is lost if we didn't track it.
-         # Actually wx handles focus visual? 
-         # No, we draw custom ring.
-         for r in range(self.tamano):
-             for c in range(self.tamano):
-                 btn = self.botones[r][c]
-                 should_focus = (r == self.foco_actual[0] and c == self.foco_actual[1])
-                 if btn.is_focused != should_focus:
-                     btn.is_focused = should_focus
-                     btn.Refresh()
+         # Only the previous and the new focus cell need their custom ring repainted
+         nuevo = tuple(self.foco_actual)
+         if self.foco_visual == nuevo:
+             return
+         if self.foco_visual is not None:
+             r, c = self.foco_visual
+             btn = self.botones[r][c]
+             btn.is_focused = False
+             btn.Refresh()
+         btn = self.botones[nuevo[0]][nuevo[1]]
+         btn.is_focused = True
+         btn.Refresh()
+         self.foco_visual = nuevo
 
     def anunciar_en_foco(self, mensaje=None, forzar_repeticion=False):
         """Fuerza la lectura actualizando el nombre del objeto y lanzando evento nativo."""
@@ -472,31 +1119,41 @@ class VentanaJuego(wx.Frame):
                 else:
                     msg_v += f"Has superado el hito de {h}. ¡Eres una leyenda!"
                 
-                self.anunciar(msg_v)
+                self.anunciar(msg_v, inmediato=True)
                 wx.CallAfter(wx.MessageBox, msg_v, "Hito alcanzado", wx.OK | wx.ICON_INFORMATION)
                 
         if max_f >= 2048:
              self.juego.ganado = True
 
-        for r in range(self.tamano):
-            for c in range(self.tamano):
+        # Solo refrescamos las celdas que el motor marcó como cambiadas,
+        # más el foco actual y el anterior (su nombre accesible puede variar)
+        cambiadas = self.juego.consumir_celdas_cambiadas()
+        foco = tuple(self.foco_actual)
+        if narrativa_inicial:
+            sucias = {(r, c) for r in range(self.tamano) for c in range(self.tamano)}
+        else:
+            sucias = cambiadas
+            sucias.add(foco)
+            if self.foco_anterior is not None:
+                sucias.add(self.foco_anterior)
+        self.foco_anterior = foco
+        
+        # Si el mensaje ya incluye "casillas libres", evitamos redundancia
+        incluir_libres = "casillas libres" not in (self.mensaje_evento_pendiente or "").lower()
+        libres = None
+        if self.verbosidad == 2 and incluir_libres:
+            libres = len(self.juego.celdas_libres())
+        
+        notificar_foco = False
+        self.panel.Freeze()
+        try:
+            for r, c in sorted(sucias):
                 val = self.juego.tablero[r][c]
-                
-                # Check cache
-                # Force update if focused cell OR (cache valid AND not focused)
-                es_foco = (r==self.foco_actual[0] and c==self.foco_actual[1])
-                
-                if self.cache_valores.get((r,c)) == val and not es_foco:
-                     if not narrativa_inicial: continue
-                
-                # Update logic
-                val_old = self.cache_valores.get((r,c))
+                es_foco = (r, c) == foco
                 self.cache_valores[(r,c)] = val
                 celda = self.botones[r][c]
                 
-                # Si el mensaje ya incluye "casillas libres", evitamos redundancia
-                incluir_libres = "casillas libres" not in (self.mensaje_evento_pendiente or "").lower()
-                nombre_accesible = self._get_nombre_accesible(r, c, val, incluir_libres=incluir_libres)
+                nombre_accesible = self._get_nombre_accesible(r, c, val, incluir_libres=incluir_libres, libres=libres)
                 
                 if es_foco and self.mensaje_evento_pendiente:
                     # Aplicamos la misma lógica de limpieza:
@@ -507,11 +1164,18 @@ class VentanaJuego(wx.Frame):
                         nombre_accesible = f"{self.mensaje_evento_pendiente}. {nombre_accesible}"
                 
                 if es_foco:
-                    self.log_event("CELL_UPDATE_FOCUS", f"Cell {r},{c} with name: {nombre_accesible}")
+                    self.log_event("CELL_UPDATE_FOCUS", "Cell %d,%d with name: %s", r, c, nombre_accesible)
                 
-                # Si forzamos silencio, notify es False incluso para el foco
-                notify_celda = es_foco and not forzar_silencio_foco
-                celda.actualizar(val, nombre_accesible, notify=notify_celda, hc_mode=self.alto_contraste)
+                # Si forzamos silencio, no se notifica ni siquiera el foco.
+                # La notificación pasa por el planificador (agrupada y limitada).
+                if es_foco and not forzar_silencio_foco and nombre_accesible != celda.acc_name:
+                    notificar_foco = True
+                celda.actualizar(val, nombre_accesible, notify=False, hc_mode=self.alto_contraste)
+        finally:
+            self.panel.Thaw()
+        
+        if notificar_foco:
+            self.planificador.anunciar(self.mensaje_evento_pendiente, historial=False)
         
         # Consume pending message
         if self.mensaje_evento_pendiente:
@@ -538,8 +1202,14 @@ class VentanaJuego(wx.Frame):
         self.anunciar(f"Alto Contraste {state}")
         self.juego.guardar_ajustes()
         
-        self.cache_valores = {}
-        self.Refresh() 
+        # The palette changes for every tile, but names stay valid: only repaint
+        self.panel.Freeze()
+        try:
+            for fila in self.botones:
+                for celda in fila:
+                    celda.fijar_contraste(self.alto_contraste)
+        finally:
+            self.panel.Thaw()
         # Evitamos que actualizar_tablero vuelva a leer la celda tras el anuncio
         self.mensaje_evento_pendiente = "" 
         self.actualizar_tablero(forzar_silencio_foco=True)
@@ -551,15 +1221,138 @@ class VentanaJuego(wx.Frame):
         mode = modes[self.verbosidad]
         self.anunciar(f"Verbosidad: {mode}")
         self.juego.guardar_ajustes()
+        # Todos los nombres accesibles dependen de la verbosidad (sin repintar)
+        self.juego.marcar_todas_cambiadas()
         # Evitamos que la celda se vuelva a leer justo después del anuncio de verbosidad
         self.mensaje_evento_pendiente = ""
         self.actualizar_tablero(forzar_silencio_foco=True)
 
+    def anunciar_sugerencia(self):
+        """Responde al instante: caché del precálculo, resultado parcial o 1 jugada."""
+        res = self.precalculador.consultar(self.juego.tablero)
+        if res is None:
+            sug = self.juego.obtener_sugerencia()
+            self.anunciar(f"Sugerencia: {sug}")
+        elif res.completa:
+            self.anunciar(f"Sugerencia: {res.direccion}")
+        else:
+            self.anunciar(f"Sugerencia parcial (profundidad {res.profundidad}): {res.direccion}")
+
+    def iniciar_desafio(self):
+        """Empieza en una posición al azar del paquete de desafíos (solo lee ese registro)."""
+        try:
+            paquete = PaqueteDesafios(ARCHIVO_DESAFIOS)
+        except (OSError, ValueError) as e:
+            logging.error(f"Error abriendo desafíos: {e}")
+            self.anunciar("No hay desafíos. Genéralos con puzzle_generator.py")
+            return
+        try:
+            desafio = paquete.aleatorio()
+        except (OSError, ValueError) as e:
+            logging.error(f"Error leyendo desafíos: {e}")
+            desafio = None
+        finally:
+            paquete.cerrar()
+        if desafio is None:
+            self.anunciar("El paquete de desafíos está vacío")
+            return
+        
+        self.sounds.play('RESTART')
+        self.juego.borrar_partida_guardada()
+        if not self.juego.sin_records:
+            self.estadisticas.registrar_abandono()
+        self.desafio = desafio
+        self.movimientos_desafio = 0
+        if len(desafio.tablero) != self.tamano:
+            self.nueva_partida(len(desafio.tablero), desafio.partida())
+        else:
+            self.juego.iniciar_juego()
+            self.juego.from_dict(desafio.partida())
+            self._iniciar_grabacion()
+            self.actualizar_tablero(narrativa_inicial=True)
+            self.precalculador.solicitar(self.juego.tablero)
+        self.log_event("CHALLENGE", "Inicio: %s (%s, dificultad %.2f)",
+                       desafio.texto(), desafio.nivel, desafio.dificultad)
+        self.anunciar(f"Desafío {desafio.nivel}: {desafio.texto()}")
+
+    def anunciar_desafio(self):
+        if self.desafio is None:
+            self.anunciar("No hay ningún desafío en curso")
+            return
+        quedan = self.desafio.movimientos - self.movimientos_desafio
+        self.anunciar(f"Desafío {self.desafio.nivel}: {self.desafio.texto()}. Quedan {quedan} movimientos")
+
+    def comprobar_desafio(self):
+        """Tras cada movimiento válido. Devuelve True si el desafío acaba de resolverse."""
+        if self.desafio is None:
+            return False
+        self.movimientos_desafio += 1
+        superado = self.desafio.resultado(self.movimientos_desafio, self.juego.max_ficha,
+                                          self.juego.juego_terminado())
+        if superado is None:
+            return False
+        texto = "Desafío superado" if superado else "Desafío no superado"
+        self.log_event("CHALLENGE", "%s en %d movimientos", texto, self.movimientos_desafio)
+        self.desafio = None
+        if superado:
+            self.sounds.play('HIGHSCORE')
+        self.anunciar(f"{texto} en {self.movimientos_desafio} movimientos")
+        return True
+
+    MAX_JUGADAS_HISTORIAL = 10
+
+    def analizar_partida(self):
+        if self.analisis_en_curso:
+            self.anunciar("El análisis de la partida ya está en marcha")
+            return
+        if self.grabacion is None or not len(self.grabacion):
+            self.anunciar("No hay movimientos que analizar")
+            return
+        # Copia: la partida puede seguir mientras se analiza
+        grabacion = GrabacionPartida.from_dict(self.grabacion.to_dict())
+        self.analisis_en_curso = True
+        self.log_event("ANALYSIS", "Analizando %d movimientos", len(grabacion))
+        self.anunciar(f"Analizando {len(grabacion)} movimientos")
+        threading.Thread(target=self._analizar_en_segundo_plano, args=(grabacion,),
+                         name="AnalisisPartida", daemon=True).start()
+
+    def _analizar_en_segundo_plano(self, grabacion):
+        resultados = []
+        ejecutor = ProcessPoolExecutor()
+        analisis_partida = analizar(grabacion, ejecutor=ejecutor, libro=self.libro)
+        try:
+            for analisis in analisis_partida:
+                if self.analisis_detenido.is_set():
+                    return
+                resultados.append(analisis)
+        except Exception as e:
+            logging.error(f"Error analizando la partida: {e}")
+            resultados = None
+        finally:
+            # Cerrar el generador cancela los lotes que aún no han empezado
+            analisis_partida.close()
+            ejecutor.shutdown(wait=False)
+        wx.CallAfter(self._fin_analisis, resultados)
+
+    def _fin_analisis(self, resultados):
+        if not self: # La ventana se cerró mientras tanto
+            return
+        self.analisis_en_curso = False
+        if resultados is None:
+            self.anunciar("No se pudo analizar la partida")
+            return
+        texto = resumen(resultados)
+        self.log_event("ANALYSIS", texto)
+        # Las jugadas costosas quedan en el historial de anuncios para recorrerlas con L
+        for analisis in jugadas_costosas(resultados, self.MAX_JUGADAS_HISTORIAL):
+            self.planificador.historial.append(describir(analisis))
+        self.anunciar(texto)
+
     def anunciar_historial(self):
-        if not self.historial_anuncios:
+        if not self.planificador.historial:
              self.anunciar("Historial vacío")
              return
-        ultimos = self.historial_anuncios[-20:]
+        ultimos = list(self.planificador.historial)
         txt = "Historial: " + ". ".join(ultimos)
         self.anunciar(txt)
 
@@ -573,27 +1366,56 @@ RePág / AvPág: Inicio / Final de columna
 Ctrl + Inicio/Fin/RePág/AvPág: Saltar a las 4 esquinas
 Ctrl + Z: Deshacer movimiento
 F5: Alto Contraste
+F6: Animación de las fichas
 F1: Ayuda
 V: Cambiar Verbosidad
 I: Resumen de estado
 H: Sugerencia de movimiento (Hint)
 L: Historial de anuncios
+T: Estadísticas de todas tus partidas
 S / E: Info rápida (Puntos / Libres)
+M: Saltar a la ficha mayor
+N: Siguiente ficha del mismo valor
+F: Siguiente pareja que se puede fusionar
+J: Siguiente casilla libre
+Shift + M / N / F / J: Saltar hacia atrás
 Ctrl + S: Guardar
-Ctrl + R: Reiniciar / Nuevo Juego"""
+Ctrl + D: Bloqueos de la interfaz en esta sesión
+Ctrl + Q: Analizar las jugadas de la partida (resultado en el historial, L)
+Ctrl + R: Reiniciar / Nuevo Juego
+Ctrl + G: Empezar un desafío al azar
+Ctrl + Shift + G: Desafío en curso y movimientos que quedan
+Ctrl + A: Activar / detener el juego automático
+Ctrl + Shift + A: Cambiar la velocidad del juego automático
+Ctrl + P: Reproducir / detener la repetición de la partida
+Ctrl + Shift + P: Reproducir desde un movimiento concreto"""
         wx.MessageBox(msg, "Ayuda 2048", wx.OK | wx.ICON_INFORMATION)
 
-    def anunciar(self, mensaje):
+    def anunciar(self, mensaje, inmediato=False):
         if not mensaje: return
         self.log_event("ANNOUNCE", mensaje)
-        if not self.historial_anuncios or self.historial_anuncios[-1] != mensaje:
-            self.historial_anuncios.append(mensaje)
-            if len(self.historial_anuncios) > 20:
-                self.historial_anuncios.pop(0)
+        # inmediato: se emite ya (p. ej. justo antes de un diálogo modal)
+        self.planificador.anunciar(mensaje, inmediato=inmediato)
+
+    def _programar_anuncio(self, retardo_ms, funcion):
+        wx.CallLater(retardo_ms, funcion)
+
+    def _emitir_anuncio(self, mensaje):
+        self.anunciar_en_foco(mensaje or None, forzar_repeticion=True)
 
-        self.anunciar_en_foco(mensaje, forzar_repeticion=True)
+    def _get_nombre_accesible(self, r, c, val, incluir_libres=True, libres=None):
+        # Solo las celdas vacías en verbosidad alta dependen del conteo de libres
+        usa_libres = self.verbosidad == 2 and val == 0 and incluir_libres
+        if usa_libres and libres is None:
+            libres = len(self.juego.celdas_libres())
+        clave = (r, c, val, self.verbosidad, libres if usa_libres else None)
+        nombre = self.cache_nombres.get(clave)
+        if nombre is None:
+            nombre = self._construir_nombre_accesible(r, c, val, libres if usa_libres else None)
+            self.cache_nombres[clave] = nombre
+        return nombre
 
-    def _get_nombre_accesible(self, r, c, val, incluir_libres=True):
+    def _construir_nombre_accesible(self, r, c, val, libres=None):
         coord = coord_nombre(r, c)
         txt_val = str(val) if val != 0 else "Libre"
         
@@ -605,9 +1427,8 @@ Ctrl + R: Reiniciar / Nuevo Juego"""
             col = coord[1:]
             base = f"Fila {fila} Columna {col}: {txt_val}"
             # En modo alto, damos el conteo de libres si la celda está vacía y se solicita
-            if val == 0 and incluir_libres:
-                count = len(self.juego.celdas_libres())
-                base += f". {count} casillas libres"
+            if libres is not None:
+                base += f". {libres} casillas libres"
             return base
             
         else: # Normal (1)
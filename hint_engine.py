@@ -0,0 +1,356 @@
+"""
+Motor de sugerencias con búsqueda expectimax y precálculo en segundo plano.
+
+La búsqueda usa profundización iterativa: cada profundidad completada deja
+un resultado utilizable, de modo que la UI puede anunciar una sugerencia
+parcial mientras la búsqueda sigue en marcha. El precálculo de la UI busca en
+un proceso aparte: la búsqueda es Python puro y en un hilo competiría por el
+GIL con el bucle de eventos.
+"""
+import logging
+import multiprocessing
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from game_logic import DIRECCIONES, desplazar_tablero
+
+Tablero = List[List[int]]
+ClaveTablero = Tuple[Tuple[int, ...], ...]
+
+# Máximo de celdas libres que se exploran en cada nodo de azar
+MAX_CELDAS_AZAR = 6
+PROB_DOS = 0.9
+# Se resta al valor de un tablero sin movimientos: perder queda por debajo de
+# cualquier posición viva, también con evaluadores de valores negativos
+PENALIZACION_FIN = 1e9
+
+
+class Cancelado(Exception):
+    """La búsqueda se abandonó porque el tablero ya no es el actual."""
+
+
+class ResultadoSugerencia(NamedTuple):
+    direccion: str
+    valor: float
+    profundidad: int
+    completa: bool
+
+
+def clave_tablero(tablero: Tablero) -> ClaveTablero:
+    return tuple(tuple(fila) for fila in tablero)
+
+
+def evaluar_basico(tablero: Tablero) -> float:
+    """Heurística de obtener_sugerencia sin los puntos: espacios libres y ficha máxima en esquina."""
+    n = len(tablero)
+    libres = 0
+    max_t = 0
+    max_pos = (0, 0)
+    for r in range(n):
+        fila = tablero[r]
+        for c in range(n):
+            v = fila[c]
+            if v == 0:
+                libres += 1
+            elif v > max_t:
+                max_t = v
+                max_pos = (r, c)
+    valor = libres * 10.0
+    if max_pos in ((0, 0), (0, n - 1), (n - 1, 0), (n - 1, n - 1)):
+        valor += max_t * 2.0
+    return valor
+
+
+def firma_evaluador(evaluar: Callable[[Tablero], float]) -> int:
+    """
+    Identificador de 32 bits de una función de valor: el atributo 'firma' de
+    su objeto si lo tiene (depende de los pesos) o, si no, su nombre.
+    """
+    firma = getattr(getattr(evaluar, '__self__', evaluar), 'firma', None)
+    if firma is not None:
+        return firma
+    nombre = f"{getattr(evaluar, '__module__', '')}.{getattr(evaluar, '__qualname__', type(evaluar).__qualname__)}"
+    return zlib.crc32(nombre.encode('utf-8'))
+
+
+def _celdas_azar(tablero: Tablero) -> List[Tuple[int, int]]:
+    n = len(tablero)
+    libres = [(r, c) for r in range(n) for c in range(n) if tablero[r][c] == 0]
+    if len(libres) <= MAX_CELDAS_AZAR:
+        return libres
+    # Muestra repartida uniformemente (determinista) en tableros grandes
+    paso = len(libres) / MAX_CELDAS_AZAR
+    return [libres[int(i * paso)] for i in range(MAX_CELDAS_AZAR)]
+
+
+class _Busqueda:
+    def __init__(self, evaluar: Callable[[Tablero], float], cancelado: Callable[[], bool]):
+        self.evaluar = evaluar
+        self.cancelado = cancelado
+        self.cache: Dict[Tuple[ClaveTablero, int], float] = {}
+
+    def nodo_max(self, tablero: Tablero, profundidad: int) -> float:
+        if self.cancelado():
+            raise Cancelado()
+        mejor = None
+        for d in DIRECCIONES:
+            nuevo, pts, cambio = desplazar_tablero(tablero, d)
+            if not cambio:
+                continue
+            valor = pts + self.nodo_azar(nuevo, profundidad)
+            if mejor is None or valor > mejor:
+                mejor = valor
+        if mejor is None:
+            return self.evaluar(tablero) - PENALIZACION_FIN # Sin movimientos: fin de partida
+        return mejor
+
+    def nodo_azar(self, tablero: Tablero, profundidad: int) -> float:
+        if profundidad <= 1:
+            return self.evaluar(tablero)
+        clave = (clave_tablero(tablero), profundidad)
+        en_cache = self.cache.get(clave)
+        if en_cache is not None:
+            return en_cache
+        celdas = _celdas_azar(tablero)
+        if not celdas:
+            return self.evaluar(tablero)
+        total = 0.0
+        for r, c in celdas:
+            tablero[r][c] = 2
+            total += PROB_DOS * self.nodo_max(tablero, profundidad - 1)
+            tablero[r][c] = 4
+            total += (1.0 - PROB_DOS) * self.nodo_max(tablero, profundidad - 1)
+            tablero[r][c] = 0
+        valor = total / len(celdas)
+        self.cache[clave] = valor
+        return valor
+
+    def raiz(self, tablero: Tablero, profundidad: int) -> Optional[Tuple[str, float]]:
+        mejor: Optional[Tuple[str, float]] = None
+        for d in DIRECCIONES:
+            nuevo, pts, cambio = desplazar_tablero(tablero, d)
+            if not cambio:
+                continue
+            valor = pts + self.nodo_azar(nuevo, profundidad)
+            if mejor is None or valor > mejor[1]:
+                mejor = (d, valor)
+        return mejor
+
+
+def buscar(tablero: Tablero, profundidad_max: int,
+           evaluar: Callable[[Tablero], float] = evaluar_basico,
+           cancelado: Callable[[], bool] = lambda: False,
+           al_progresar: Optional[Callable[[ResultadoSugerencia], None]] = None) -> ResultadoSugerencia:
+    """
+    Expectimax con profundización iterativa (profundidad = movimientos del jugador).
+    Lanza Cancelado si 'cancelado()' pasa a ser cierto.
+    """
+    resultado = ResultadoSugerencia("Ninguna", 0.0, 0, True)
+    busqueda = _Busqueda(evaluar, cancelado)
+    for profundidad in range(1, profundidad_max + 1):
+        mejor = busqueda.raiz([fila[:] for fila in tablero], profundidad)
+        if mejor is None:
+            return ResultadoSugerencia("Ninguna", 0.0, profundidad_max, True)
+        resultado = ResultadoSugerencia(mejor[0], mejor[1], profundidad, profundidad == profundidad_max)
+        if al_progresar is not None:
+            al_progresar(resultado)
+    return resultado
+
+
+def valorar_movimientos(tablero: Tablero, profundidad: int,
+                        evaluar: Callable[[Tablero], float] = evaluar_basico) -> Dict[str, float]:
+    """
+    Valor expectimax de cada dirección posible (no solo de la mejor), a la
+    profundidad dada. Las direcciones que no mueven nada no aparecen.
+    """
+    busqueda = _Busqueda(evaluar, lambda: False)
+    valores: Dict[str, float] = {}
+    for d in DIRECCIONES:
+        nuevo, pts, cambio = desplazar_tablero(tablero, d)
+        if cambio:
+            valores[d] = pts + busqueda.nodo_azar(nuevo, profundidad)
+    return valores
+
+
+# --- Proceso de precálculo ---
+_generacion_proceso: Any = None # multiprocessing.Value compartido con el proceso principal
+_evaluar_proceso: Optional[Tuple[int, Callable[[Tablero], float]]] = None # (firma, evaluar)
+
+def _iniciar_proceso_precalculo(generacion: Any) -> None:
+    global _generacion_proceso
+    _generacion_proceso = generacion
+
+
+def _buscar_profundidad(tablero: Tablero, profundidad: int, generacion: int, firma: int,
+                        evaluar: Optional[Callable[[Tablero], float]]) -> Optional[Tuple[str, float]]:
+    """
+    Se ejecuta en el proceso de precálculo: una profundidad de la búsqueda.
+    'evaluar' solo viaja cuando cambia; si no, se usa el que ya tiene el proceso.
+    """
+    global _evaluar_proceso
+    if evaluar is not None:
+        _evaluar_proceso = (firma, evaluar)
+    cancelado = lambda: _generacion_proceso.value != generacion
+    if cancelado():
+        raise Cancelado()
+    if _evaluar_proceso is None or _evaluar_proceso[0] != firma:
+        raise RuntimeError("El proceso de precálculo no tiene el evaluador pedido")
+    return _Busqueda(_evaluar_proceso[1], cancelado).raiz(tablero, profundidad)
+
+
+class PrecalculadorSugerencias:
+    """
+    Calcula en segundo plano la sugerencia de la posición actual en cuanto
+    termina un movimiento. Cada nueva solicitud cancela la anterior. Los
+    resultados (parciales o completos) se guardan por tablero; consultar()
+    nunca espera.
+
+    Por defecto busca en un hilo. Con en_proceso=True busca en un único
+    proceso auxiliar, una tarea por profundidad, y cancela con un contador de
+    generación compartido; 'evaluar' tiene que poder enviarse a ese proceso.
+
+    Con un 'libro' (ver opening_book.LibroAperturas) las posiciones ya
+    resueltas a suficiente profundidad no se buscan, y cada búsqueda completa
+    se añade al libro.
+    """
+    def __init__(self, profundidad_max: int = 3,
+                 evaluar: Callable[[Tablero], float] = evaluar_basico,
+                 max_cache: int = 256, libro=None, en_proceso: bool = False):
+        self.profundidad_max = profundidad_max
+        self.evaluar = evaluar
+        self.max_cache = max_cache
+        self.libro = libro
+        self.en_proceso = en_proceso
+        self._cache: "OrderedDict[ClaveTablero, ResultadoSugerencia]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._cancelar_actual: Optional[threading.Event] = None
+        self._hilo: Optional[threading.Thread] = None
+        # Modo proceso: el lock ordena cancelaciones y envíos entre la UI y los callbacks
+        self._lock_envio = threading.Lock()
+        self._generacion = multiprocessing.Value('q', 0) if en_proceso else None
+        self._ejecutor: Optional[ProcessPoolExecutor] = None
+        self._firma_enviada: Optional[int] = None
+        self._terminado: Optional[threading.Event] = None
+
+    def solicitar(self, tablero: Tablero) -> None:
+        """Cancela la búsqueda en curso y empieza la del tablero dado (si no está en caché)."""
+        self.cancelar()
+        clave = clave_tablero(tablero)
+        with self._lock:
+            previo = self._cache.get(clave)
+        if previo is not None and previo.completa:
+            return
+        if self.libro is not None:
+            jugada = self.libro.consultar(tablero, firma_evaluador(self.evaluar))
+            if jugada is not None and jugada.profundidad >= self.profundidad_max:
+                self._guardar(clave, ResultadoSugerencia(jugada.direccion, jugada.valor,
+                                                         jugada.profundidad, True))
+                return
+        copia = [fila[:] for fila in tablero]
+        if self.en_proceso:
+            terminado = threading.Event()
+            self._terminado = terminado
+            with self._lock_envio:
+                self._enviar(copia, clave, self._generacion.value, 1, terminado)
+            return
+        evento = threading.Event()
+        self._cancelar_actual = evento
+        self._hilo = threading.Thread(target=self._trabajar, args=(copia, clave, evento),
+                                      name="PrecalculoSugerencia", daemon=True)
+        self._hilo.start()
+
+    def consultar(self, tablero: Tablero) -> Optional[ResultadoSugerencia]:
+        with self._lock:
+            return self._cache.get(clave_tablero(tablero))
+
+    def cancelar(self) -> None:
+        if self._cancelar_actual is not None:
+            self._cancelar_actual.set()
+            self._cancelar_actual = None
+        if self._generacion is not None:
+            with self._lock_envio:
+                self._generacion.value += 1
+
+    def esperar(self, timeout: Optional[float] = None) -> None:
+        """Solo para herramientas y pruebas: la UI nunca debe llamarlo."""
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+        if self._terminado is not None:
+            self._terminado.wait(timeout)
+
+    def detener(self) -> None:
+        self.cancelar()
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown(wait=False)
+            self._ejecutor = None
+
+    def _guardar(self, clave: ClaveTablero, resultado: ResultadoSugerencia) -> None:
+        with self._lock:
+            self._cache[clave] = resultado
+            self._cache.move_to_end(clave)
+            while len(self._cache) > self.max_cache:
+                self._cache.popitem(last=False)
+
+    def _enviar(self, tablero: Tablero, clave: ClaveTablero, generacion: int, profundidad: int,
+                terminado: threading.Event) -> None:
+        """Encarga una profundidad al proceso de precálculo (con _lock_envio tomado)."""
+        firma = firma_evaluador(self.evaluar)
+        evaluar = None if firma == self._firma_enviada else self.evaluar
+        try:
+            if self._ejecutor is None:
+                self._ejecutor = ProcessPoolExecutor(max_workers=1, initializer=_iniciar_proceso_precalculo,
+                                                     initargs=(self._generacion,))
+            futuro = self._ejecutor.submit(_buscar_profundidad, tablero, profundidad, generacion, firma, evaluar)
+        except RuntimeError as e: # Incluye BrokenProcessPool: se crea otro en la siguiente solicitud
+            logging.error(f"Error en el proceso de sugerencias: {e}")
+            self._ejecutor = None
+            self._firma_enviada = None
+            terminado.set()
+            return
+        self._firma_enviada = firma
+        futuro.add_done_callback(
+            lambda f: self._al_terminar_profundidad(f, tablero, clave, generacion, profundidad, terminado))
+
+    def _al_terminar_profundidad(self, futuro: Future, tablero: Tablero, clave: ClaveTablero,
+                                 generacion: int, profundidad: int, terminado: threading.Event) -> None:
+        try:
+            mejor = futuro.result()
+        except Cancelado:
+            terminado.set()
+            return
+        except Exception as e:
+            logging.error(f"Error en el proceso de sugerencias: {e}")
+            with self._lock_envio:
+                self._firma_enviada = None # Puede que el proceso no tenga el evaluador
+            terminado.set()
+            return
+        if mejor is None:
+            resultado = ResultadoSugerencia("Ninguna", 0.0, self.profundidad_max, True)
+        else:
+            resultado = ResultadoSugerencia(mejor[0], mejor[1], profundidad, profundidad == self.profundidad_max)
+        self._guardar(clave, resultado)
+        if resultado.completa:
+            if self.libro is not None and resultado.direccion != "Ninguna":
+                self.libro.registrar(tablero, resultado.direccion, resultado.valor, resultado.profundidad,
+                                     firma_evaluador(self.evaluar))
+            terminado.set()
+            return
+        with self._lock_envio:
+            if generacion != self._generacion.value:
+                terminado.set()
+                return
+            self._enviar(tablero, clave, generacion, profundidad + 1, terminado)
+
+    def _trabajar(self, tablero: Tablero, clave: ClaveTablero, evento: threading.Event) -> None:
+        try:
+            resultado = buscar(tablero, self.profundidad_max, self.evaluar,
+                               cancelado=evento.is_set,
+                               al_progresar=lambda res: self._guardar(clave, res))
+        except Cancelado:
+            return
+        if self.libro is not None and resultado.direccion != "Ninguna":
+            self.libro.registrar(tablero, resultado.direccion, resultado.valor, resultado.profundidad,
+                                 firma_evaluador(self.evaluar))
@@ -0,0 +1,178 @@
+"""
+Estadísticas acumuladas de todas las partidas de un perfil.
+
+Se alimentan de eventos (movimiento, deshacer, fin de partida) y cada evento
+solo suma a unos contadores y a un par de histogramas pequeños: nada se
+recalcula recorriendo partidas anteriores, así que resumen() responde al
+instante por muchas partidas que se hayan jugado. Se vuelca por lotes (cada
+LOTE_EVENTOS eventos y siempre al terminar una partida o al cerrar) y lo que
+se vuelca son los cambios desde el volcado anterior, no el total: así dos
+instancias con el mismo perfil suman sus eventos en vez de pisarse.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Contadores = Dict[str, int]
+
+LOTE_EVENTOS = 25
+# Límites superiores de los tramos del histograma de movimientos por partida
+TRAMOS_MOVIMIENTOS = (50, 100, 200, 400, 800, 1600)
+# Contadores que no se suman al volcar: se guarda el máximo o el último valor
+MAXIMOS = ('mejor_puntuacion',)
+FIJOS = ('movimientos_partida',) # De la partida guardada, que también es la última escrita
+_ENTEROS = ('partidas', 'abandonadas', 'movimientos', 'deshacer', 'suma_puntos',
+            'suma_movimientos', 'mejor_puntuacion', 'movimientos_partida')
+
+
+def _tramo_movimientos(movimientos: int) -> int:
+    for i, limite in enumerate(TRAMOS_MOVIMIENTOS):
+        if movimientos < limite:
+            return i
+    return len(TRAMOS_MOVIMIENTOS)
+
+
+class EstadisticasVida:
+    """
+    Contadores de por vida. 'guardar' recibe en cada volcado (sumas, máximos,
+    fijos) de cambios() (None: solo en memoria).
+    """
+    def __init__(self, guardar: Optional[Callable[[Contadores, Contadores, Contadores], None]] = None,
+                 lote: int = LOTE_EVENTOS):
+        self.guardar = guardar
+        self.lote = lote
+        self.pendientes = 0 # Eventos sin volcar
+        self.partidas = 0
+        self.abandonadas = 0 # Reiniciadas sin terminar (no cuentan en las medias)
+        self.movimientos = 0 # Todos, también los de partidas en curso o abandonadas
+        self.deshacer = 0
+        self.suma_puntos = 0 # De partidas terminadas
+        self.suma_movimientos = 0 # De partidas terminadas
+        self.mejor_puntuacion = 0
+        self.fichas_max: Dict[int, int] = {} # Ficha máxima de la partida -> partidas
+        self.tramos_movimientos: List[int] = [0] * (len(TRAMOS_MOVIMIENTOS) + 1)
+        self.movimientos_partida = 0 # De la partida en curso
+        self.volcado: Contadores = {} # to_dict() del último volcado o carga
+
+    # --- Eventos ---
+    def _evento(self) -> None:
+        self.pendientes += 1
+        if self.pendientes >= self.lote:
+            self.vaciar()
+
+    def registrar_movimiento(self, cantidad: int = 1) -> None:
+        """'cantidad' permite contar de una vez un lote de movimientos."""
+        self.movimientos += cantidad
+        self.movimientos_partida += cantidad
+        self._evento()
+
+    def registrar_deshacer(self) -> None:
+        self.deshacer += 1
+        self._evento()
+
+    def registrar_fin(self, puntuacion: int, max_ficha: int) -> None:
+        """Fin de partida (game over). Vuelca enseguida: es el dato más valioso."""
+        self.partidas += 1
+        self.suma_puntos += puntuacion
+        self.suma_movimientos += self.movimientos_partida
+        self.mejor_puntuacion = max(self.mejor_puntuacion, puntuacion)
+        self.fichas_max[max_ficha] = self.fichas_max.get(max_ficha, 0) + 1
+        self.tramos_movimientos[_tramo_movimientos(self.movimientos_partida)] += 1
+        self.movimientos_partida = 0
+        self.pendientes += 1
+        self.vaciar()
+
+    def registrar_abandono(self) -> None:
+        """La partida en curso se descarta sin terminar (Ctrl+R)."""
+        if self.movimientos_partida:
+            self.abandonadas += 1
+        self.movimientos_partida = 0
+        self._evento()
+
+    def vaciar(self) -> None:
+        if self.pendientes and self.guardar is not None:
+            self.guardar(*self.cambios())
+            self.volcado = self.to_dict()
+        self.pendientes = 0
+
+    def cambios(self) -> Tuple[Contadores, Contadores, Contadores]:
+        """
+        (sumas, máximos, fijos) desde el último volcado: las sumas son
+        diferencias que el almacén añade a lo que ya tenga; los máximos y
+        fijos, valores actuales. Solo las claves que han cambiado.
+        """
+        sumas: Contadores = {}
+        maximos: Contadores = {}
+        fijos: Contadores = {}
+        for clave, valor in self.to_dict().items():
+            anterior = self.volcado.get(clave, 0)
+            if valor == anterior:
+                continue
+            if clave in MAXIMOS:
+                maximos[clave] = valor
+            elif clave in FIJOS:
+                fijos[clave] = valor
+            else:
+                sumas[clave] = valor - anterior
+        return sumas, maximos, fijos
+
+    # --- Consultas (solo leen contadores) ---
+    @property
+    def media_puntos(self) -> float:
+        return self.suma_puntos / self.partidas if self.partidas else 0.0
+
+    @property
+    def media_movimientos(self) -> float:
+        return self.suma_movimientos / self.partidas if self.partidas else 0.0
+
+    def partidas_con_ficha(self, valor: int) -> int:
+        """Partidas terminadas en las que se llegó al menos a 'valor'."""
+        return sum(n for ficha, n in self.fichas_max.items() if ficha >= valor)
+
+    def resumen(self) -> str:
+        if not self.partidas:
+            texto = "Aún no has terminado ninguna partida"
+        else:
+            texto = (f"{self.partidas} partidas. Media {self.media_puntos:.0f} puntos "
+                     f"y {self.media_movimientos:.0f} movimientos. "
+                     f"Mejor puntuación {self.mejor_puntuacion}")
+            # Las dos fichas más altas alcanzadas, con el porcentaje de partidas
+            for ficha in sorted(self.fichas_max, reverse=True)[:2]:
+                porcentaje = 100 * self.partidas_con_ficha(ficha) / self.partidas
+                texto += f". {ficha} en el {porcentaje:.0f}%"
+        return f"{texto}. {self.movimientos} movimientos y {self.deshacer} deshacer en total"
+
+    # --- Persistencia ---
+    def to_dict(self) -> Contadores:
+        """
+        Contadores planos: los histogramas van como 'fichas_max:<ficha>' y
+        'tramos_movimientos:<tramo>' (solo las fichas que han aparecido).
+        """
+        datos = {clave: getattr(self, clave) for clave in _ENTEROS}
+        for ficha, n in self.fichas_max.items():
+            datos[f'fichas_max:{ficha}'] = n
+        for i, n in enumerate(self.tramos_movimientos):
+            if n:
+                datos[f'tramos_movimientos:{i}'] = n
+        return datos
+
+    def from_dict(self, data: Any) -> bool:
+        if not isinstance(data, dict):
+            return False
+        try:
+            enteros = {clave: int(data.get(clave, 0)) for clave in _ENTEROS}
+            fichas: Dict[int, int] = {}
+            tramos = [0] * (len(TRAMOS_MOVIMIENTOS) + 1)
+            for clave, valor in data.items():
+                nombre, _, indice = str(clave).partition(':')
+                if nombre == 'fichas_max':
+                    fichas[int(indice)] = int(valor)
+                elif nombre == 'tramos_movimientos':
+                    tramos[int(indice)] += int(valor)
+        except (TypeError, ValueError, IndexError):
+            return False
+        for clave, valor in enteros.items():
+            setattr(self, clave, valor)
+        self.fichas_max = fichas
+        self.tramos_movimientos = tramos
+        self.volcado = self.to_dict()
+        self.pendientes = 0
+        return True
@@ -0,0 +1,364 @@
+"""
+Analizador offline de game_events.log.
+
+Recorre el log mediante mmap en fragmentos paralelos (uno por proceso),
+construye un índice lateral (<log>.idx.json) con el inicio de cada sesión
+("--- LOG START ---") y, por categoría, la lista de tramos de bytes donde
+aparece (un hueco de más de BYTES_BLOQUE sin ella abre un tramo nuevo, así
+que extraer una categoría poco frecuente no recorre el resto), y emite
+agregados por sesión en CSV o JSON. Entiende tanto el formato de texto
+antiguo ("fecha - INFO - [CAT] mensaje") como las líneas JSON actuales.
+
+Solo se analiza el archivo vivo: las copias rotadas (game_events.log.1.gz,
+...) no se leen; para analizarlas hay que descomprimirlas y pasarlas aparte.
+
+Uso:
+    python log_analyzer.py game_events.log sesiones --formato csv
+    python log_analyzer.py game_events.log teclas
+    python log_analyzer.py game_events.log extraer --categoria ANNOUNCE
+"""
+import argparse
+import csv
+import hashlib
+import json
+import mmap
+import os
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+VERSION_INDICE = 3
+MARCA_INICIO = "--- LOG START ---"
+# Bytes del principio del log que identifican el archivo en el índice
+BYTES_HUELLA = 4096
+# Hueco sin líneas de una categoría a partir del cual su rango se parte en dos
+BYTES_BLOQUE = 64 * 1024
+# Por debajo de este tamaño no compensa lanzar procesos
+MIN_BYTES_PARALELO = 4 * 1024 * 1024
+
+_RE_TECLA = re.compile(r"Tecla: (\d+), Shift: (\w+), Ctrl: (\w+)")
+
+# Códigos wx de las teclas usadas por el juego
+NOMBRES_TECLAS = {
+    27: "ESC", 312: "FIN", 313: "INICIO", 314: "IZQUIERDA", 315: "ARRIBA",
+    316: "DERECHA", 317: "ABAJO", 340: "F1", 344: "F5", 366: "REPAG", 367: "AVPAG",
+    376: "IZQUIERDA", 377: "ARRIBA", 378: "DERECHA", 379: "ABAJO",
+}
+
+
+def nombre_tecla(codigo: int, shift: bool, ctrl: bool) -> str:
+    nombre = NOMBRES_TECLAS.get(codigo)
+    if nombre is None:
+        nombre = chr(codigo) if 32 < codigo < 127 else str(codigo)
+    if shift:
+        nombre = "Shift+" + nombre
+    if ctrl:
+        nombre = "Ctrl+" + nombre
+    return nombre
+
+
+def parsear_linea(linea: bytes) -> Optional[Tuple[float, str, str]]:
+    """Devuelve (timestamp, categoría, mensaje) o None si la línea no es reconocible."""
+    if linea.startswith(b'{'):
+        try:
+            d = json.loads(linea)
+        except ValueError:
+            return None
+        return float(d.get('ts', 0.0)), str(d.get('cat', '')), str(d.get('msg', ''))
+
+    # Formato antiguo: "2025-01-01 10:00:00,123 - INFO - [CAT] mensaje"
+    texto = linea.decode('utf-8', errors='replace').rstrip('\r')
+    partes = texto.split(" - ", 2)
+    if len(partes) < 3:
+        return None
+    try:
+        ts = datetime.strptime(partes[0], "%Y-%m-%d %H:%M:%S,%f").timestamp()
+    except ValueError:
+        return None
+    resto = partes[2]
+    if resto.startswith("[") and "]" in resto:
+        cierre = resto.index("]")
+        return ts, resto[1:cierre], resto[cierre + 1:].strip()
+    if resto.startswith(MARCA_INICIO) or resto.startswith("Log de eventos activo"):
+        return ts, "LOG_START", resto
+    return ts, "GENERAL", resto
+
+
+def _nueva_sesion(inicio: Optional[int]) -> Dict[str, Any]:
+    return {
+        'inicio': inicio, 'fin': inicio,
+        'ts_inicio': None, 'ts_fin': None,
+        'lineas': 0, 'categorias': {}, 'rangos': {}, 'teclas': {},
+    }
+
+
+def _anadir_rango(rangos: List[List[int]], inicio: int, fin: int) -> None:
+    """Extiende el último tramo si [inicio, fin) queda a menos de BYTES_BLOQUE; si no, abre otro."""
+    if rangos and inicio - rangos[-1][1] < BYTES_BLOQUE:
+        rangos[-1][1] = fin
+    else:
+        rangos.append([inicio, fin])
+
+
+def _fusionar(a: Dict[str, Any], b: Dict[str, Any]) -> None:
+    """Añade a la sesión 'a' el tramo contiguo 'b' que la continúa."""
+    a['fin'] = b['fin']
+    if a['ts_inicio'] is None:
+        a['ts_inicio'] = b['ts_inicio']
+    if b['ts_fin'] is not None:
+        a['ts_fin'] = b['ts_fin']
+    a['lineas'] += b['lineas']
+    for cat, n in b['categorias'].items():
+        a['categorias'][cat] = a['categorias'].get(cat, 0) + n
+    for cat, rangos in b['rangos'].items():
+        destino = a['rangos'].setdefault(cat, [])
+        for ini, fin in rangos:
+            _anadir_rango(destino, ini, fin)
+    for tecla, n in b['teclas'].items():
+        a['teclas'][tecla] = a['teclas'].get(tecla, 0) + n
+
+
+def _iterar_lineas(mm: mmap.mmap, inicio: int, fin: int) -> Iterator[Tuple[int, int, bytes]]:
+    pos = inicio
+    while pos < fin:
+        nl = mm.find(b'\n', pos, fin)
+        fin_linea = fin if nl == -1 else nl
+        yield pos, fin_linea + 1, mm[pos:fin_linea]
+        pos = fin_linea + 1
+
+
+def analizar_fragmento(ruta: str, inicio: int, fin: int) -> List[Dict[str, Any]]:
+    """
+    Analiza [inicio, fin) y devuelve los tramos de sesión encontrados. El
+    primero tiene 'inicio' None si continúa una sesión del fragmento anterior.
+    """
+    tramos: List[Dict[str, Any]] = []
+    actual = _nueva_sesion(None)
+    actual['fin'] = inicio
+    with open(ruta, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for pos, siguiente, linea in _iterar_lineas(mm, inicio, fin):
+            reg = parsear_linea(linea)
+            if reg is None:
+                actual['fin'] = siguiente
+                continue
+            ts, cat, msg = reg
+            if cat == "LOG_START" and msg == MARCA_INICIO:
+                if actual['inicio'] is not None or actual['lineas']:
+                    tramos.append(actual)
+                actual = _nueva_sesion(pos)
+            if actual['ts_inicio'] is None:
+                actual['ts_inicio'] = ts
+            actual['ts_fin'] = ts
+            actual['fin'] = siguiente
+            actual['lineas'] += 1
+            actual['categorias'][cat] = actual['categorias'].get(cat, 0) + 1
+            _anadir_rango(actual['rangos'].setdefault(cat, []), pos, siguiente)
+            if cat == "INPUT":
+                m = _RE_TECLA.search(msg)
+                if m:
+                    tecla = nombre_tecla(int(m.group(1)), m.group(2) == "True", m.group(3) == "True")
+                    actual['teclas'][tecla] = actual['teclas'].get(tecla, 0) + 1
+    if actual['inicio'] is not None or actual['lineas']:
+        tramos.append(actual)
+    return tramos
+
+
+def _limites_fragmentos(ruta: str, inicio: int, fin: int, partes: int) -> List[Tuple[int, int]]:
+    """Divide [inicio, fin) en fragmentos alineados a fin de línea."""
+    if partes <= 1 or fin - inicio < MIN_BYTES_PARALELO:
+        return [(inicio, fin)]
+    paso = (fin - inicio) // partes
+    limites = [inicio]
+    with open(ruta, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for i in range(1, partes):
+            nl = mm.find(b'\n', inicio + i * paso, fin)
+            if nl == -1:
+                break
+            if nl + 1 > limites[-1]:
+                limites.append(nl + 1)
+    limites.append(fin)
+    return [(a, b) for a, b in zip(limites, limites[1:]) if b > a]
+
+
+def analizar_rango(ruta: str, inicio: int, fin: int, procesos: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Analiza un rango del log en paralelo y une los tramos en sesiones."""
+    procesos = procesos or os.cpu_count() or 1
+    fragmentos = _limites_fragmentos(ruta, inicio, fin, procesos)
+    if len(fragmentos) == 1:
+        resultados = [analizar_fragmento(ruta, *fragmentos[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            resultados = list(pool.map(analizar_fragmento,
+                                       [ruta] * len(fragmentos),
+                                       [a for a, _ in fragmentos],
+                                       [b for _, b in fragmentos]))
+    sesiones: List[Dict[str, Any]] = []
+    for tramos in resultados:
+        for tramo in tramos:
+            if tramo['inicio'] is None and sesiones:
+                _fusionar(sesiones[-1], tramo)
+            else:
+                if tramo['inicio'] is None:
+                    tramo['inicio'] = inicio
+                sesiones.append(tramo)
+    return sesiones
+
+
+def ruta_indice(ruta: str) -> str:
+    return ruta + ".idx.json"
+
+
+def cargar_indice(ruta: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(ruta_indice(ruta), 'r', encoding='utf-8') as f:
+            indice = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if indice.get('version') != VERSION_INDICE:
+        return None
+    return indice
+
+
+def huella(ruta: str, longitud: int) -> Dict[str, Any]:
+    """
+    Identifica el archivo: inodo y hash de sus primeros 'longitud' bytes. Al
+    rotar, el log es otro archivo aunque vuelva a crecer hasta el tamaño indexado.
+    """
+    with open(ruta, 'rb') as f:
+        cabecera = f.read(longitud)
+        inodo = os.fstat(f.fileno()).st_ino
+    return {'inodo': inodo, 'bytes': len(cabecera), 'sha1': hashlib.sha1(cabecera).hexdigest()}
+
+
+def _indice_vigente(ruta: str, indice: Optional[Dict[str, Any]], tamano: int) -> bool:
+    """El índice es de este mismo archivo y el archivo solo ha podido crecer."""
+    if indice is None or indice['tamano'] > tamano:
+        return False
+    previa = indice.get('huella')
+    return previa is not None and huella(ruta, previa['bytes']) == previa
+
+
+def construir_indice(ruta: str, procesos: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Devuelve el índice de sesiones, reutilizando el existente. Si el log solo
+    ha crecido, se vuelve a analizar únicamente desde la última sesión; si se
+    rotó (la huella no coincide), se indexa de nuevo entero.
+    """
+    tamano = os.path.getsize(ruta)
+    indice = cargar_indice(ruta)
+    if not _indice_vigente(ruta, indice, tamano):
+        indice = None
+    if indice is not None and indice['tamano'] == tamano:
+        return indice
+
+    sesiones: List[Dict[str, Any]] = []
+    desde = 0
+    if indice is not None and indice['sesiones']:
+        # Log append-only: la última sesión pudo continuar, se reanaliza
+        sesiones = indice['sesiones'][:-1]
+        desde = indice['sesiones'][-1]['inicio']
+
+    if desde < tamano:
+        sesiones.extend(analizar_rango(ruta, desde, tamano, procesos))
+    indice = {'version': VERSION_INDICE, 'tamano': tamano,
+              'huella': huella(ruta, min(BYTES_HUELLA, tamano)), 'sesiones': sesiones}
+    temp = ruta_indice(ruta) + ".tmp"
+    with open(temp, 'w', encoding='utf-8') as f:
+        json.dump(indice, f, separators=(',', ':'))
+    os.replace(temp, ruta_indice(ruta))
+    return indice
+
+
+def resumen_sesion(numero: int, sesion: Dict[str, Any]) -> Dict[str, Any]:
+    """Agregados legibles de una sesión del índice."""
+    ts_ini, ts_fin = sesion['ts_inicio'], sesion['ts_fin']
+    teclas = Counter(sesion['teclas'])
+    movimientos = sum(n for t, n in teclas.items() if t.startswith("Shift+"))
+    top = teclas.most_common(1)
+    return {
+        'sesion': numero,
+        'inicio': datetime.fromtimestamp(ts_ini).isoformat(timespec='seconds') if ts_ini else "",
+        'fin': datetime.fromtimestamp(ts_fin).isoformat(timespec='seconds') if ts_fin else "",
+        'duracion_s': round(ts_fin - ts_ini, 3) if ts_ini and ts_fin else 0.0,
+        'lineas': sesion['lineas'],
+        'pulsaciones': sum(teclas.values()),
+        'movimientos': movimientos,
+        'anuncios': sesion['categorias'].get('ANNOUNCE', 0),
+        'tecla_mas_usada': top[0][0] if top else "",
+        'categorias': sesion['categorias'],
+        'teclas': dict(teclas),
+    }
+
+
+def extraer_categoria(ruta: str, indice: Dict[str, Any], categoria: str,
+                      sesion: Optional[int] = None) -> Iterator[Tuple[int, float, str]]:
+    """Itera (sesión, ts, mensaje) de una categoría leyendo solo sus tramos indexados."""
+    with open(ruta, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for numero, ses in enumerate(indice['sesiones']):
+            if sesion is not None and numero != sesion:
+                continue
+            for inicio, fin in ses['rangos'].get(categoria, []):
+                for _, _, linea in _iterar_lineas(mm, inicio, fin):
+                    reg = parsear_linea(linea)
+                    if reg is not None and reg[1] == categoria:
+                        yield numero, reg[0], reg[2]
+
+
+_COLUMNAS_CSV = ['sesion', 'inicio', 'fin', 'duracion_s', 'lineas', 'pulsaciones',
+                 'movimientos', 'anuncios', 'tecla_mas_usada']
+
+
+def escribir_sesiones(resumenes: List[Dict[str, Any]], formato: str, salida) -> None:
+    if formato == 'json':
+        json.dump(resumenes, salida, ensure_ascii=False, indent=2)
+        salida.write("\n")
+    else:
+        writer = csv.DictWriter(salida, fieldnames=_COLUMNAS_CSV, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(resumenes)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analizador de game_events.log")
+    parser.add_argument('log', help="Ruta a game_events.log")
+    parser.add_argument('--procesos', type=int, default=None, help="Procesos de análisis (por defecto, uno por CPU)")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    sub.add_parser('indexar', help="Construye o actualiza el índice lateral")
+    p_ses = sub.add_parser('sesiones', help="Agregados por sesión")
+    p_ses.add_argument('--formato', choices=['csv', 'json'], default='csv')
+    p_ses.add_argument('--salida', default=None)
+    p_tec = sub.add_parser('teclas', help="Teclas más pulsadas en todas las sesiones")
+    p_tec.add_argument('--top', type=int, default=20)
+    p_ext = sub.add_parser('extraer', help="Mensajes de una categoría")
+    p_ext.add_argument('--categoria', required=True)
+    p_ext.add_argument('--sesion', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    indice = construir_indice(args.log, args.procesos)
+
+    if args.comando == 'indexar':
+        print(f"{len(indice['sesiones'])} sesiones indexadas en {ruta_indice(args.log)}")
+    elif args.comando == 'sesiones':
+        resumenes = [resumen_sesion(i, s) for i, s in enumerate(indice['sesiones'])]
+        if args.salida:
+            with open(args.salida, 'w', encoding='utf-8', newline='') as f:
+                escribir_sesiones(resumenes, args.formato, f)
+        else:
+            escribir_sesiones(resumenes, args.formato, sys.stdout)
+    elif args.comando == 'teclas':
+        total: Counter = Counter()
+        for s in indice['sesiones']:
+            total.update(s['teclas'])
+        for tecla, n in total.most_common(args.top):
+            print(f"{tecla}\t{n}")
+    elif args.comando == 'extraer':
+        for numero, ts, msg in extraer_categoria(args.log, indice, args.categoria, args.sesion):
+            print(f"{numero}\t{datetime.fromtimestamp(ts).isoformat(timespec='milliseconds')}\t{msg}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
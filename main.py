@@ -1,8 +1,16 @@
 """Punto de entrada para 2048 Accesible."""
+import argparse
+import multiprocessing
 import wx
+from constants import PERFIL_DEFECTO
 from game_ui import VentanaJuego
 
 if __name__ == "__main__":
+    # Los pools de procesos (análisis de partidas) también en el ejecutable congelado
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="2048 Accesible")
+    parser.add_argument('--perfil', default=PERFIL_DEFECTO, help="Perfil de jugador (partida, ajustes y récords propios)")
+    args = parser.parse_args()
     app = wx.App()
-    VentanaJuego(None, "2048 Accesible")
+    VentanaJuego(None, "2048 Accesible", perfil=args.perfil)
     app.MainLoop()
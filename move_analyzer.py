@@ -0,0 +1,211 @@
+"""
+Análisis de la calidad de las jugadas de una partida grabada.
+
+Cada posición de la grabación se valora con la búsqueda de sugerencias
+(todas las direcciones, no solo la mejor) y se compara la jugada hecha con
+la mejor: la pérdida es la diferencia de valor, y una jugada es costosa si
+pierde más de FRACCION_COSTOSA del valor de la mejor. Las posiciones se
+reducen a su forma canónica antes de repartirlas, así que las simétricas
+se buscan una sola vez, y el libro de aperturas hace de caché compartida:
+si ya sabe que la jugada hecha es la mejor a esa profundidad, no se busca,
+y lo que se calcula se le añade. Las búsquedas van a un pool de procesos en
+lotes y los resultados salen en orden en cuanto están listos; si se deja de
+leer antes del final, los lotes pendientes se cancelan.
+
+Uso:
+    python move_analyzer.py replay.json --salida analisis.csv
+"""
+import argparse
+import csv
+import json
+import sys
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from constants import ARCHIVO_LIBRO, ARCHIVO_REPETICION
+from evaluator import EvaluadorTablas, cargar_pesos_evaluador
+from game_logic import direccion_original, direccion_simetrica, simetria_canonica
+from hint_engine import firma_evaluador, valorar_movimientos
+from opening_book import LibroAperturas
+from replay import EstadoRepeticion, GrabacionPartida, aplicar_movimiento
+
+Tablero = List[List[int]]
+
+PROFUNDIDAD_DEFECTO = 2
+FRACCION_COSTOSA = 0.1
+LOTE_PROCESO = 16 # Posiciones por envío al pool
+
+
+class AnalisisJugada(NamedTuple):
+    movimiento: int # 1 = primer movimiento de la grabación
+    jugada: str
+    mejor: str
+    valor_jugada: float
+    valor_mejor: float
+    perdida: float
+    costosa: bool
+
+
+# --- Trabajo en el pool de procesos ---
+_evaluador_proceso = None
+
+def _valorar(args: Tuple[Tablero, int]) -> Dict[str, float]:
+    """Se ejecuta en un proceso del pool; la tabla del evaluador se crea una vez por proceso."""
+    global _evaluador_proceso
+    tablero, profundidad = args
+    if _evaluador_proceso is None or _evaluador_proceso.tamano != len(tablero):
+        _evaluador_proceso = EvaluadorTablas(len(tablero), cargar_pesos_evaluador())
+    return valorar_movimientos(tablero, profundidad, _evaluador_proceso)
+
+
+def _valorar_lote(args: Tuple[List[Tablero], int]) -> List[Dict[str, float]]:
+    tableros, profundidad = args
+    return [_valorar((tablero, profundidad)) for tablero in tableros]
+
+
+def posiciones(grabacion: GrabacionPartida) -> Iterator[Tuple[int, Tablero, str]]:
+    """(número de movimiento, tablero antes de jugar, dirección jugada)."""
+    estado = EstadoRepeticion([fila[:] for fila in grabacion.tablero_inicial],
+                              grabacion.puntuacion_inicial, grabacion.max_ficha_inicial)
+    for i, movimiento in enumerate(grabacion.movimientos, 1):
+        yield i, estado.tablero, movimiento[0]
+        estado = aplicar_movimiento(estado, movimiento)
+
+
+def _juzgar(i: int, jugada: str, mejor: str, valor_jugada: float, valor_mejor: float) -> AnalisisJugada:
+    perdida = max(valor_mejor - valor_jugada, 0.0)
+    costosa = perdida > FRACCION_COSTOSA * max(abs(valor_mejor), 1.0)
+    return AnalisisJugada(i, jugada, mejor, valor_jugada, valor_mejor, perdida, costosa)
+
+
+def analizar(grabacion: GrabacionPartida, profundidad: int = PROFUNDIDAD_DEFECTO,
+             ejecutor: Optional[Executor] = None,
+             libro: Optional[LibroAperturas] = None) -> Iterator[AnalisisJugada]:
+    """Analiza cada jugada de la grabación; los resultados salen en orden de movimiento."""
+    # (movimiento, tablero, jugada, clave canónica o None si lo resolvió el libro, simetría)
+    plan: List[Tuple[int, Tablero, str, Optional[tuple], int]] = []
+    directas: Dict[int, AnalisisJugada] = {}
+    orden: List[tuple] = [] # Posiciones canónicas únicas, en orden de aparición
+    vistas = set()
+    # Solo sirven las entradas del libro calculadas con el evaluador de los procesos
+    firma = firma_evaluador(EvaluadorTablas(grabacion.tamano, cargar_pesos_evaluador(), precalcular=False))
+    for i, tablero, jugada in posiciones(grabacion):
+        if libro is not None:
+            entrada = libro.consultar(tablero, firma)
+            if entrada is not None and entrada.profundidad >= profundidad and entrada.direccion == jugada:
+                directas[i] = _juzgar(i, jugada, jugada, entrada.valor, entrada.valor)
+                plan.append((i, tablero, jugada, None, 0))
+                continue
+        canonico, k = simetria_canonica(tablero)
+        if canonico not in vistas:
+            vistas.add(canonico)
+            orden.append(canonico)
+        plan.append((i, tablero, jugada, canonico, k))
+
+    tableros = [[list(fila) for fila in canonico] for canonico in orden]
+    futuros: List[Future] = []
+    if ejecutor is not None:
+        # Lotes enviados a mano (no map) para poder cancelar los pendientes
+        futuros = [ejecutor.submit(_valorar_lote, (tableros[i:i + LOTE_PROCESO], profundidad))
+                   for i in range(0, len(tableros), LOTE_PROCESO)]
+        resultados = (valor for futuro in futuros for valor in futuro.result())
+    else:
+        resultados = (_valorar((tablero, profundidad)) for tablero in tableros)
+    pendientes = iter(orden)
+    valores: Dict[tuple, Dict[str, float]] = {}
+
+    try:
+        for i, tablero, jugada, canonico, k in plan:
+            if canonico is None:
+                yield directas[i]
+                continue
+            # Los lotes salen en orden: se consume hasta tener esta posición
+            while canonico not in valores:
+                valores[next(pendientes)] = next(resultados)
+            por_direccion = valores[canonico]
+            mejor_c = max(por_direccion, key=por_direccion.get)
+            mejor = direccion_original(mejor_c, k)
+            valor_mejor = por_direccion[mejor_c]
+            valor_jugada = por_direccion.get(direccion_simetrica(jugada, k), valor_mejor)
+            if libro is not None:
+                libro.registrar(tablero, mejor, valor_mejor, profundidad, firma)
+            yield _juzgar(i, jugada, mejor, valor_jugada, valor_mejor)
+    finally:
+        # Si se deja de leer a medias (cierre o cancelación), no se calcula lo que falta
+        for futuro in futuros:
+            futuro.cancel()
+
+
+def jugadas_costosas(analisis: Iterable[AnalisisJugada], maximo: Optional[int] = None) -> List[AnalisisJugada]:
+    """Las jugadas costosas (las 'maximo' que más pierden), en orden de movimiento."""
+    costosas = [a for a in analisis if a.costosa]
+    if maximo is not None:
+        costosas = sorted(costosas, key=lambda a: a.perdida, reverse=True)[:maximo]
+    return sorted(costosas, key=lambda a: a.movimiento)
+
+
+def describir(a: AnalisisJugada) -> str:
+    porcentaje = 100 * a.perdida / max(abs(a.valor_mejor), 1.0)
+    return (f"Movimiento {a.movimiento}: {a.jugada.lower()} en vez de {a.mejor.lower()}, "
+            f"pierde un {porcentaje:.0f}%")
+
+
+def resumen(analisis: List[AnalisisJugada]) -> str:
+    if not analisis:
+        return "No hay movimientos que analizar"
+    costosas = [a for a in analisis if a.costosa]
+    aciertos = 100 * sum(1 for a in analisis if a.jugada == a.mejor) / len(analisis)
+    if costosas:
+        peor = max(costosas, key=lambda a: a.perdida)
+        texto = (f"{len(costosas)} jugadas costosas, la peor en el movimiento {peor.movimiento}"
+                 if len(costosas) > 1 else f"1 jugada costosa, en el movimiento {peor.movimiento}")
+    else:
+        texto = "Ninguna jugada costosa"
+    return f"{texto}. Coincides con la sugerencia en el {aciertos:.0f}% de {len(analisis)} movimientos"
+
+
+def escribir(analisis: Iterable[AnalisisJugada], ruta: str) -> List[AnalisisJugada]:
+    """
+    Escribe cada resultado según llega: CSV si la ruta acaba en .csv, JSON
+    Lines si no. Devuelve la lista completa.
+    """
+    todos: List[AnalisisJugada] = []
+    with open(ruta, 'w', encoding='utf-8', newline='') as f:
+        escritor = csv.writer(f) if ruta.lower().endswith('.csv') else None
+        if escritor is not None:
+            escritor.writerow(AnalisisJugada._fields)
+        for a in analisis:
+            if escritor is not None:
+                escritor.writerow(a)
+            else:
+                f.write(json.dumps(a._asdict(), ensure_ascii=False, separators=(',', ':')) + "\n")
+            todos.append(a)
+    return todos
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pérdida de cada jugada frente a la sugerencia")
+    parser.add_argument('repeticion', nargs='?', default=ARCHIVO_REPETICION)
+    parser.add_argument('--salida', default="analisis.jsonl", help="Resultados (.csv o JSON Lines)")
+    parser.add_argument('--profundidad', type=int, default=PROFUNDIDAD_DEFECTO)
+    parser.add_argument('--procesos', type=int, default=None, help="Por defecto, uno por CPU")
+    parser.add_argument('--libro', default=ARCHIVO_LIBRO)
+    parser.add_argument('--sin-libro', action='store_true', help="No consultar ni ampliar el libro de aperturas")
+    args = parser.parse_args(argv)
+
+    grabacion = GrabacionPartida.cargar(args.repeticion)
+    libro = None if args.sin_libro else LibroAperturas(args.libro)
+    try:
+        with ProcessPoolExecutor(max_workers=args.procesos) as ejecutor:
+            todos = escribir(analizar(grabacion, args.profundidad, ejecutor, libro), args.salida)
+    finally:
+        if libro is not None:
+            libro.cerrar()
+    for a in jugadas_costosas(todos):
+        print(describir(a))
+    print(resumen(todos))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
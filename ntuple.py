@@ -0,0 +1,324 @@
+"""
+Red de n-tuplas como función de valor para las sugerencias.
+
+El valor de un tablero es la suma de los pesos indexados por los exponentes
+de las celdas de cada tupla, aplicada a las 8 simetrías del tablero. La red
+se entrena fuera de línea con TD(0) sobre estados posteriores (el tablero
+tras deslizar y antes de la ficha nueva), que es justo lo que evalúa la
+búsqueda expectimax en sus hojas.
+
+Los pesos se guardan como tablas float32 planas en un archivo binario que
+el juego abre con mmap de solo lectura: varios procesos comparten las
+mismas páginas y el arranque no copia nada.
+
+Uso:
+    python ntuple.py entrenar --partidas 2000
+    python ntuple.py probar --partidas 50
+"""
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+from constants import ARCHIVO_NTUPLAS
+from game_logic import DIRECCIONES, desplazar_tablero, simetrias
+
+Tablero = List[List[int]]
+Tupla = Tuple[int, ...] # Celdas como índices r * tamano + c
+
+# Dos filas (borde y segunda) y dos cuadrados 2x2 (esquina y centro del borde)
+TUPLAS_DEFECTO: List[Tupla] = [(0, 1, 2, 3), (4, 5, 6, 7), (0, 1, 4, 5), (1, 2, 5, 6)]
+
+BITS = 4
+MAX_EXP = (1 << BITS) - 1
+# Las fichas por encima de 2^15 comparten el último exponente
+_EXPONENTES = {0: 0}
+for _e in range(1, 32):
+    _EXPONENTES[1 << _e] = min(_e, MAX_EXP)
+
+MAGIA = b'NTP1'
+_CABECERA = struct.Struct('<4sHHH') # magia, versión, tamaño del tablero, número de tuplas
+VERSION = 1
+
+
+class RedNTuplas:
+    """
+    Función de valor de n-tuplas. 'pesos' es cualquier secuencia de float32
+    indexable: un array('f') en memoria para entrenar o un memoryview sobre
+    el mmap del archivo para jugar.
+    """
+    def __init__(self, tamano: int = 4, tuplas: Optional[Sequence[Tupla]] = None, pesos=None):
+        self.tamano = tamano
+        self.tuplas: List[Tupla] = [tuple(t) for t in (tuplas or TUPLAS_DEFECTO)]
+        celdas = tamano * tamano
+        if any(not t or max(t) >= celdas for t in self.tuplas):
+            raise ValueError("Tupla fuera del tablero")
+
+        self.desplazamientos: List[int] = []
+        total = 0
+        for t in self.tuplas:
+            self.desplazamientos.append(total)
+            total += 1 << (BITS * len(t))
+        self.num_pesos = total
+        if pesos is None:
+            pesos = array('f', bytes(4 * total))
+        elif len(pesos) != total:
+            raise ValueError("El número de pesos no coincide con las tuplas")
+        self.pesos = pesos
+        self._mmap: Optional[mmap.mmap] = None
+        self._ruta: Optional[str] = None # Archivo proyectado, si lo hay
+        self._firma: Optional[int] = None
+
+        # Cada tupla se aplica a las 8 simetrías: se precalculan las celdas originales
+        indices = [[r * tamano + c for c in range(tamano)] for r in range(tamano)]
+        self.instancias: List[Tuple[int, Tupla]] = []
+        for sim in simetrias(indices):
+            plano = [v for fila in sim for v in fila]
+            for desp, t in zip(self.desplazamientos, self.tuplas):
+                self.instancias.append((desp, tuple(plano[p] for p in t)))
+        self._todas_de_4 = all(len(t) == 4 for t in self.tuplas)
+
+    # --- Evaluación ---
+    def _indices(self, tablero: Tablero) -> List[int]:
+        e = [_EXPONENTES[v] for fila in tablero for v in fila]
+        if self._todas_de_4:
+            return [desp + (e[a] | e[b] << 4 | e[c] << 8 | e[d] << 12)
+                    for desp, (a, b, c, d) in self.instancias]
+        resultado = []
+        for desp, celdas in self.instancias:
+            idx = 0
+            for k, p in enumerate(celdas):
+                idx |= e[p] << (BITS * k)
+            resultado.append(desp + idx)
+        return resultado
+
+    def evaluar(self, tablero: Tablero) -> float:
+        w = self.pesos
+        if self._todas_de_4:
+            e = [_EXPONENTES[v] for fila in tablero for v in fila]
+            total = 0.0
+            for desp, (a, b, c, d) in self.instancias:
+                total += w[desp + (e[a] | e[b] << 4 | e[c] << 8 | e[d] << 12)]
+            return total
+        return sum(w[i] for i in self._indices(tablero))
+
+    __call__ = evaluar
+
+    @property
+    def firma(self) -> int:
+        """
+        Identifica los valores de la red (libro de aperturas): CRC de tuplas y
+        pesos. Se calcula una vez; una red que se sigue entrenando no lo usa.
+        """
+        if self._firma is None:
+            self._firma = zlib.crc32(memoryview(self.pesos).cast('B'), zlib.crc32(self._cabecera()))
+        return self._firma
+
+    def actualizar(self, tablero: Tablero, delta: float) -> None:
+        """Reparte 'delta' entre los pesos que intervienen en el valor del tablero."""
+        paso = delta / len(self.instancias)
+        w = self.pesos
+        for i in self._indices(tablero):
+            w[i] += paso
+
+    def mejor_movimiento(self, tablero: Tablero) -> Optional[Tuple[str, Tablero, int]]:
+        """Movimiento que maximiza puntos + valor del estado posterior: (dirección, estado, puntos)."""
+        mejor = None
+        mejor_valor = float('-inf')
+        for d in DIRECCIONES:
+            nuevo, pts, cambio = desplazar_tablero(tablero, d)
+            if not cambio:
+                continue
+            valor = pts + self.evaluar(nuevo)
+            if valor > mejor_valor:
+                mejor_valor = valor
+                mejor = (d, nuevo, pts)
+        return mejor
+
+    # --- Persistencia ---
+    def _cabecera(self) -> bytes:
+        partes = [_CABECERA.pack(MAGIA, VERSION, self.tamano, len(self.tuplas))]
+        for t in self.tuplas:
+            partes.append(struct.pack(f'<H{len(t)}H', len(t), *t))
+        cabecera = b''.join(partes)
+        return cabecera + bytes(-len(cabecera) % 4) # Pesos alineados a 4 bytes
+
+    def guardar(self, ruta: str) -> None:
+        datos = array('f', self.pesos)
+        if sys.byteorder != 'little':
+            datos.byteswap()
+        temp = ruta + ".tmp"
+        with open(temp, 'wb') as f:
+            f.write(self._cabecera())
+            datos.tofile(f)
+        os.replace(temp, ruta)
+
+    @classmethod
+    def cargar(cls, ruta: str, escritura: bool = False) -> "RedNTuplas":
+        """
+        Abre una red guardada. Por defecto proyecta los pesos con mmap de solo
+        lectura; con escritura=True los copia a memoria para seguir entrenando.
+        """
+        with open(ruta, 'rb') as f:
+            magia, version, tamano, num = _CABECERA.unpack(f.read(_CABECERA.size))
+            if magia != MAGIA or version != VERSION:
+                raise ValueError(f"{ruta} no es un archivo de red de n-tuplas válido")
+            tuplas = []
+            for _ in range(num):
+                (largo,) = struct.unpack('<H', f.read(2))
+                tuplas.append(struct.unpack(f'<{largo}H', f.read(2 * largo)))
+            inicio = f.tell()
+            inicio += -inicio % 4
+
+            if escritura or sys.byteorder != 'little':
+                f.seek(inicio)
+                pesos = array('f')
+                pesos.frombytes(f.read())
+                if sys.byteorder != 'little':
+                    pesos.byteswap()
+                return cls(tamano, tuplas, pesos)
+
+            proyeccion = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        red = cls(tamano, tuplas, memoryview(proyeccion)[inicio:].cast('f'))
+        red._mmap = proyeccion
+        red._ruta = ruta
+        return red
+
+    def __reduce__(self):
+        """
+        Para enviarla a otro proceso: si está proyectada, el otro proceso abre
+        el mismo archivo (comparte las páginas, no se copian los pesos).
+        """
+        if self._mmap is not None:
+            return (RedNTuplas.cargar, (self._ruta,))
+        return (RedNTuplas, (self.tamano, self.tuplas, self.pesos))
+
+    def cerrar(self) -> None:
+        if self._mmap is not None:
+            self.pesos.release()
+            self.pesos = None
+            self._mmap.close()
+            self._mmap = None
+
+
+def cargar_red(ruta: str = ARCHIVO_NTUPLAS, tamano: int = 4) -> Optional[RedNTuplas]:
+    """Red de solo lectura para el tamaño dado, o None si no hay una utilizable."""
+    if not os.path.exists(ruta):
+        return None
+    try:
+        red = RedNTuplas.cargar(ruta)
+    except (OSError, ValueError, struct.error):
+        return None
+    if red.tamano != tamano:
+        red.cerrar()
+        return None
+    return red
+
+
+def _agregar_ficha(tablero: Tablero, rng: random.Random) -> None:
+    n = len(tablero)
+    libres = [(r, c) for r in range(n) for c in range(n) if tablero[r][c] == 0]
+    if libres:
+        r, c = rng.choice(libres)
+        tablero[r][c] = 4 if rng.random() > 0.9 else 2
+
+
+def _tablero_inicial(tamano: int, rng: random.Random) -> Tablero:
+    tablero = [[0] * tamano for _ in range(tamano)]
+    _agregar_ficha(tablero, rng)
+    _agregar_ficha(tablero, rng)
+    return tablero
+
+
+def jugar(red: RedNTuplas, rng: random.Random, alfa: float = 0.0) -> Tuple[int, int]:
+    """
+    Juega una partida eligiendo con la red. Con alfa > 0 aprende por TD(0):
+    V(s') += alfa * (r'' + V(s''') - V(s')), con s' y s''' estados posteriores
+    consecutivos. Devuelve (puntuación, ficha máxima).
+    """
+    tablero = _tablero_inicial(red.tamano, rng)
+    puntos = 0
+    anterior: Optional[Tablero] = None
+    while True:
+        eleccion = red.mejor_movimiento(tablero)
+        if eleccion is None:
+            if anterior is not None and alfa:
+                red.actualizar(anterior, alfa * -red.evaluar(anterior))
+            break
+        _, posterior, pts = eleccion
+        if anterior is not None and alfa:
+            red.actualizar(anterior, alfa * (pts + red.evaluar(posterior) - red.evaluar(anterior)))
+        puntos += pts
+        anterior = posterior
+        tablero = [fila[:] for fila in posterior]
+        _agregar_ficha(tablero, rng)
+    return puntos, max(max(fila) for fila in tablero)
+
+
+def entrenar(red: RedNTuplas, partidas: int, alfa: float = 0.1, semilla: int = 0,
+             al_terminar=None) -> List[int]:
+    """Entrena durante 'partidas' partidas; al_terminar(i, puntos, max_ficha) tras cada una."""
+    rng = random.Random(semilla)
+    puntuaciones = []
+    for i in range(partidas):
+        puntos, max_ficha = jugar(red, rng, alfa)
+        puntuaciones.append(puntos)
+        if al_terminar is not None:
+            al_terminar(i, puntos, max_ficha)
+    return puntuaciones
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Red de n-tuplas para las sugerencias")
+    parser.add_argument('--archivo', default=ARCHIVO_NTUPLAS)
+    sub = parser.add_subparsers(dest='comando', required=True)
+    p_ent = sub.add_parser('entrenar', help="Entrena por TD(0) (continúa si el archivo existe)")
+    p_ent.add_argument('--partidas', type=int, default=1000)
+    p_ent.add_argument('--alfa', type=float, default=0.1)
+    p_ent.add_argument('--semilla', type=int, default=0)
+    p_ent.add_argument('--guardar-cada', type=int, default=500)
+    p_pro = sub.add_parser('probar', help="Juega sin aprender e informa de la puntuación media")
+    p_pro.add_argument('--partidas', type=int, default=50)
+    p_pro.add_argument('--semilla', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.comando == 'entrenar':
+        red = RedNTuplas.cargar(args.archivo, escritura=True) if os.path.exists(args.archivo) else RedNTuplas()
+        bloque: List[Tuple[int, int]] = []
+        inicio = time.perf_counter()
+
+        def al_terminar(i: int, puntos: int, max_ficha: int) -> None:
+            bloque.append((puntos, max_ficha))
+            if (i + 1) % args.guardar_cada == 0 or i + 1 == args.partidas:
+                red.guardar(args.archivo)
+                media = sum(p for p, _ in bloque) / len(bloque)
+                tasa = sum(1 for _, m in bloque if m >= 2048) / len(bloque)
+                print(f"{i + 1} partidas: media {media:.0f}, 2048 {tasa:.1%}, "
+                      f"{time.perf_counter() - inicio:.0f} s")
+                bloque.clear()
+
+        entrenar(red, args.partidas, args.alfa, args.semilla, al_terminar)
+    else:
+        red = RedNTuplas.cargar(args.archivo)
+        rng = random.Random(args.semilla)
+        resultados = [jugar(red, rng) for _ in range(args.partidas)]
+        inicio = time.perf_counter()
+        n = 20000
+        tablero = _tablero_inicial(red.tamano, rng)
+        for _ in range(n):
+            red.evaluar(tablero)
+        por_segundo = n / (time.perf_counter() - inicio)
+        print(f"Media {sum(p for p, _ in resultados) / len(resultados):.0f}, "
+              f"máxima {max(m for _, m in resultados)}, {por_segundo:.0f} evaluaciones/s")
+        red.cerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
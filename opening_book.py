@@ -0,0 +1,386 @@
+"""
+Libro de aperturas: caché persistente de sugerencias por posición.
+
+Cada posición se guarda en su forma canónica (la menor de sus 8 simetrías),
+con la dirección expresada en ese mismo marco, así que una entrada sirve
+para todas las posiciones equivalentes. La clave incluye además la firma
+del evaluador que calculó el valor (hint_engine.firma_evaluador): el
+evaluador por tablas, la red de n-tuplas o unos pesos distintos no
+comparten entradas.
+
+El archivo es de solo añadido: registros binarios (clave seguida de
+dirección, profundidad y valor) tras una cabecera. El índice en memoria es
+compacto: el contenido del archivo en un único bytearray y una tabla hash
+de direccionamiento abierto (array de enteros) con el desplazamiento de
+cada registro vigente, sin un objeto por entrada. Consultar es O(1) y no
+toca el disco. El índice puede construirse en segundo plano: hasta que esté
+listo, las consultas fallan (y se busca como siempre). Cuando el archivo
+supera el límite se reescribe sin las entradas duplicadas y sin las de
+menos utilidad.
+
+Uso:
+    python opening_book.py llenar --partidas 50 --profundidad 4
+    python opening_book.py info
+"""
+import argparse
+import logging
+import os
+import random
+import struct
+import sys
+import threading
+from array import array
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from constants import ARCHIVO_LIBRO, ARCHIVO_NTUPLAS
+from evaluator import EvaluadorTablas, cargar_pesos_evaluador
+from game_logic import (DIRECCIONES, desplazar_tablero, direccion_original,
+                        direccion_simetrica, simetria_canonica)
+from hint_engine import buscar, evaluar_basico, firma_evaluador
+from ntuple import cargar_red
+
+Tablero = List[List[int]]
+
+MAGIA = b'OBK2'
+# Libros anteriores a la firma del evaluador: sus valores no se sabe de qué
+# evaluador son, así que se descartan y el archivo se empieza de nuevo
+MAGIAS_ANTIGUAS = (b'OBK1',)
+# Clave: tamaño del tablero y firma del evaluador; siguen tamaño² exponentes
+_CABEZA_CLAVE = struct.Struct('<BI')
+# Tras la clave: índice de dirección, profundidad, valor
+_DATOS = struct.Struct('<BBf')
+MAX_BYTES_DEFECTO = 8 * 1024 * 1024
+# Tras expulsar, el archivo queda en esta fracción del máximo para no reescribir a menudo
+FRACCION_TRAS_EXPULSAR = 0.75
+HUECOS_INICIALES = 1024 # Potencia de 2; la tabla se duplica al pasar de media ocupación
+FIRMA_BASICA = firma_evaluador(evaluar_basico)
+
+_EXPONENTES = {0: 0}
+for _e in range(1, 32):
+    _EXPONENTES[1 << _e] = _e
+
+
+class JugadaLibro(NamedTuple):
+    direccion: str # Ya traducida al tablero consultado
+    valor: float
+    profundidad: int
+
+
+def clave_canonica(tablero: Tablero, firma: int = FIRMA_BASICA) -> Tuple[bytes, int]:
+    """Clave compacta de la forma canónica y el índice de la simetría usada."""
+    canonico, k = simetria_canonica(tablero)
+    return (_CABEZA_CLAVE.pack(len(tablero), firma)
+            + bytes(_EXPONENTES[v] for fila in canonico for v in fila)), k
+
+
+def _largo_clave(n: int) -> int:
+    return _CABEZA_CLAVE.size + n * n
+
+
+class _IndiceCompacto:
+    """
+    Tabla hash de direccionamiento abierto sobre los registros de 'datos':
+    cada hueco guarda el desplazamiento de un registro (-1 si está libre) y
+    la clave se compara directamente contra los bytes del registro.
+    """
+    def __init__(self, datos: bytearray, huecos: int = HUECOS_INICIALES):
+        self.datos = datos
+        self.huecos = array('q', [-1]) * huecos
+        self.usados = 0
+
+    def __len__(self) -> int:
+        return self.usados
+
+    def _hueco(self, clave: bytes) -> int:
+        huecos = self.huecos
+        datos = self.datos
+        largo = len(clave)
+        mascara = len(huecos) - 1
+        i = hash(clave) & mascara
+        while True:
+            pos = huecos[i]
+            if pos < 0 or datos[pos:pos + largo] == clave:
+                return i
+            i = (i + 1) & mascara
+
+    def obtener(self, clave: bytes) -> int:
+        """Desplazamiento del registro de la clave, o -1."""
+        return self.huecos[self._hueco(clave)]
+
+    def fijar(self, clave: bytes, pos: int) -> None:
+        i = self._hueco(clave)
+        if self.huecos[i] < 0:
+            self.usados += 1
+        self.huecos[i] = pos
+        if 2 * self.usados > len(self.huecos):
+            self._crecer()
+
+    def clave(self, pos: int) -> bytes:
+        return bytes(self.datos[pos:pos + _largo_clave(self.datos[pos])])
+
+    def posiciones(self) -> Iterator[int]:
+        return (pos for pos in self.huecos if pos >= 0)
+
+    def reconstruir(self, posiciones: List[int]) -> None:
+        huecos = HUECOS_INICIALES
+        while 2 * len(posiciones) > huecos:
+            huecos *= 2
+        self.huecos = array('q', [-1]) * huecos
+        self.usados = 0
+        for pos in posiciones:
+            self.fijar(self.clave(pos), pos)
+
+    def _crecer(self) -> None:
+        posiciones = list(self.posiciones())
+        self.huecos = array('q', [-1]) * (2 * len(self.huecos))
+        self.usados = 0
+        for pos in posiciones:
+            self.fijar(self.clave(pos), pos)
+
+
+class LibroAperturas:
+    """
+    Índice en memoria sobre un archivo de solo añadido. Seguro entre hilos:
+    la UI consulta mientras el hilo de sugerencias registra resultados. Con
+    en_segundo_plano, el archivo se lee e indexa en otro hilo.
+    """
+    def __init__(self, ruta: str = ARCHIVO_LIBRO, max_bytes: int = MAX_BYTES_DEFECTO,
+                 en_segundo_plano: bool = False):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self.datos = bytearray()
+        self.indice = _IndiceCompacto(self.datos)
+        self.aciertos: Dict[bytes, int] = {}
+        self.consultas = 0
+        self.encontradas = 0
+        self._lock = threading.Lock()
+        self._listo = threading.Event()
+        self._archivo = None
+        if os.path.exists(ruta):
+            # Solo la cabecera en el constructor: un archivo ajeno se rechaza ya
+            with open(ruta, 'rb') as f:
+                magia = f.read(len(MAGIA))
+            if magia and magia != MAGIA and magia not in MAGIAS_ANTIGUAS:
+                raise ValueError(f"{ruta} no es un libro de aperturas válido")
+        if en_segundo_plano:
+            threading.Thread(target=self._cargar, name="CargaLibro", daemon=True).start()
+        else:
+            self._cargar()
+
+    # --- Archivo ---
+    def _cargar(self) -> None:
+        try:
+            datos = bytearray()
+            if os.path.exists(self.ruta):
+                with open(self.ruta, 'rb') as f:
+                    datos = bytearray(f.read())
+            if datos[:len(MAGIA)] != MAGIA:
+                datos = bytearray() # Vacío o de una versión anterior: se reescribe
+            indice = _IndiceCompacto(datos)
+            pos = len(MAGIA)
+            while pos < len(datos):
+                fin_clave = pos + _largo_clave(datos[pos])
+                fin = fin_clave + _DATOS.size
+                if fin > len(datos):
+                    break # Registro truncado (cierre inesperado): se descarta
+                # Solo se añade lo que mejora la entrada previa: gana el último
+                indice.fijar(bytes(datos[pos:fin_clave]), pos)
+                pos = fin
+            del datos[pos:] # Sin la cola truncada (vacío: no hace nada)
+            with self._lock:
+                self.datos = datos
+                self.indice = indice
+        except (OSError, MemoryError) as e:
+            logging.error(f"Error cargando el libro de aperturas: {e}")
+        finally:
+            self._listo.set()
+
+    def esperar_carga(self, timeout: Optional[float] = None) -> bool:
+        return self._listo.wait(timeout)
+
+    def _abrir_para_anadir(self):
+        if self._archivo is None:
+            nuevo = not self.datos
+            self._archivo = open(self.ruta, 'r+b' if not nuevo else 'wb')
+            if nuevo:
+                self._archivo.write(MAGIA)
+                self.datos += MAGIA
+            else:
+                self._archivo.seek(len(self.datos)) # Descarta una cola truncada
+                self._archivo.truncate()
+        return self._archivo
+
+    def vaciar(self) -> None:
+        """Lleva al disco los registros añadidos."""
+        with self._lock:
+            if self._archivo is not None:
+                self._archivo.flush()
+
+    def cerrar(self) -> None:
+        self._listo.wait()
+        with self._lock:
+            if self._archivo is not None:
+                self._archivo.close()
+                self._archivo = None
+
+    # --- Consulta y registro ---
+    def consultar(self, tablero: Tablero, firma: int = FIRMA_BASICA) -> Optional[JugadaLibro]:
+        """Jugada guardada para el tablero con el evaluador de esa firma (None mientras carga)."""
+        clave, k = clave_canonica(tablero, firma)
+        with self._lock:
+            self.consultas += 1
+            if not self._listo.is_set():
+                return None
+            pos = self.indice.obtener(clave)
+            if pos < 0:
+                return None
+            self.encontradas += 1
+            self.aciertos[clave] = self.aciertos.get(clave, 0) + 1
+            d, profundidad, valor = _DATOS.unpack_from(self.datos, pos + len(clave))
+        return JugadaLibro(direccion_original(DIRECCIONES[d], k), valor, profundidad)
+
+    def registrar(self, tablero: Tablero, direccion: str, valor: float, profundidad: int,
+                  firma: int = FIRMA_BASICA) -> bool:
+        """Añade la jugada si la posición es nueva o la búsqueda es más profunda. Devuelve si se añadió."""
+        if direccion not in DIRECCIONES:
+            return False
+        clave, k = clave_canonica(tablero, firma)
+        profundidad = min(int(profundidad), 255)
+        registro = clave + _DATOS.pack(DIRECCIONES.index(direccion_simetrica(direccion, k)),
+                                       profundidad, float(valor))
+        self._listo.wait()
+        with self._lock:
+            previa = self.indice.obtener(clave)
+            if previa >= 0 and self.datos[previa + len(clave) + 1] >= profundidad:
+                return False
+            archivo = self._abrir_para_anadir()
+            pos = len(self.datos)
+            archivo.write(registro)
+            self.datos += registro
+            self.indice.fijar(clave, pos)
+            if len(self.datos) > self.max_bytes:
+                self._compactar()
+        return True
+
+    def compactar(self) -> None:
+        self._listo.wait()
+        with self._lock:
+            self._compactar()
+
+    def _utilidad(self, pos: int) -> Tuple[int, int, int]:
+        # Primero lo consultado en esta sesión, luego lo más profundo y lo más temprano
+        clave = self.indice.clave(pos)
+        suma = sum(1 << e for e in clave[_CABEZA_CLAVE.size:] if e)
+        return (self.aciertos.get(clave, 0), self.datos[pos + len(clave) + 1], -suma)
+
+    def _compactar(self) -> None:
+        """Reescribe el archivo con una entrada por posición, expulsando las de menos utilidad."""
+        posiciones = list(self.indice.posiciones())
+        limite = int(self.max_bytes * FRACCION_TRAS_EXPULSAR) - len(MAGIA)
+        largo = lambda pos: _largo_clave(self.datos[pos]) + _DATOS.size
+        tamano = sum(largo(pos) for pos in posiciones)
+        if tamano > limite:
+            posiciones.sort(key=self._utilidad)
+            i = 0
+            while tamano > limite and i < len(posiciones):
+                tamano -= largo(posiciones[i])
+                self.aciertos.pop(self.indice.clave(posiciones[i]), None)
+                i += 1
+            posiciones = posiciones[i:]
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+        datos = bytearray(MAGIA)
+        nuevas = []
+        for pos in posiciones:
+            nuevas.append(len(datos))
+            datos += self.datos[pos:pos + largo(pos)]
+        temp = self.ruta + ".tmp"
+        with open(temp, 'wb') as f:
+            f.write(datos)
+        os.replace(temp, self.ruta)
+        self.datos = datos
+        self.indice = _IndiceCompacto(datos)
+        self.indice.reconstruir(nuevas)
+
+    def __len__(self) -> int:
+        self._listo.wait()
+        return len(self.indice)
+
+
+def llenar(libro: LibroAperturas, partidas: int, profundidad: int, jugadas: int = 30,
+           tamano: int = 4, semilla: int = 0, evaluar=None) -> int:
+    """
+    Autojuego con búsqueda profunda: registra las primeras 'jugadas' posiciones
+    de cada partida. Devuelve el número de entradas nuevas.
+    """
+    evaluar = evaluar or evaluar_basico
+    firma = firma_evaluador(evaluar)
+    rng = random.Random(semilla)
+    nuevas = 0
+
+    def agregar_ficha(tablero: Tablero) -> None:
+        libres = [(r, c) for r in range(tamano) for c in range(tamano) if tablero[r][c] == 0]
+        if libres:
+            r, c = rng.choice(libres)
+            tablero[r][c] = 4 if rng.random() > 0.9 else 2
+
+    for _ in range(partidas):
+        tablero = [[0] * tamano for _ in range(tamano)]
+        agregar_ficha(tablero)
+        agregar_ficha(tablero)
+        for _ in range(jugadas):
+            previa = libro.consultar(tablero, firma)
+            if previa is not None and previa.profundidad >= profundidad:
+                direccion = previa.direccion
+            else:
+                resultado = buscar(tablero, profundidad, evaluar)
+                direccion = resultado.direccion
+                if direccion == "Ninguna":
+                    break
+                if libro.registrar(tablero, direccion, resultado.valor, resultado.profundidad, firma):
+                    nuevas += 1
+            tablero, _, cambio = desplazar_tablero(tablero, direccion)
+            if not cambio:
+                break
+            agregar_ficha(tablero)
+    libro.vaciar()
+    return nuevas
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Libro de aperturas de sugerencias")
+    parser.add_argument('--archivo', default=ARCHIVO_LIBRO)
+    parser.add_argument('--max-bytes', type=int, default=MAX_BYTES_DEFECTO)
+    sub = parser.add_subparsers(dest='comando', required=True)
+    p_lle = sub.add_parser('llenar', help="Añade posiciones con búsquedas profundas por autojuego")
+    p_lle.add_argument('--partidas', type=int, default=20)
+    p_lle.add_argument('--profundidad', type=int, default=4)
+    p_lle.add_argument('--jugadas', type=int, default=30, help="Posiciones por partida")
+    p_lle.add_argument('--tamano', type=int, default=4)
+    p_lle.add_argument('--semilla', type=int, default=0)
+    sub.add_parser('info', help="Entradas y tamaño del archivo")
+    sub.add_parser('compactar', help="Reescribe el archivo sin entradas duplicadas")
+    args = parser.parse_args(argv)
+
+    libro = LibroAperturas(args.archivo, args.max_bytes)
+    try:
+        if args.comando == 'llenar':
+            # El mismo evaluador que usará el juego: las entradas solo valen para él
+            evaluar = cargar_red(ARCHIVO_NTUPLAS, args.tamano) or EvaluadorTablas(args.tamano, cargar_pesos_evaluador())
+            nuevas = llenar(libro, args.partidas, args.profundidad, args.jugadas,
+                            args.tamano, args.semilla, evaluar)
+            print(f"{nuevas} posiciones nuevas, {len(libro)} en total")
+        elif args.comando == 'compactar':
+            libro.compactar()
+            print(f"{len(libro)} posiciones")
+        else:
+            tamano = os.path.getsize(args.archivo) if os.path.exists(args.archivo) else 0
+            print(f"{len(libro)} posiciones, {tamano} bytes")
+    finally:
+        libro.cerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
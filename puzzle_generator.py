@@ -0,0 +1,313 @@
+"""
+Desafíos: posiciones de partida con un objetivo y su dificultad.
+
+Hay dos tipos: ALCANZAR ("consigue 1024 en 50 movimientos", el doble de la
+ficha mayor del tablero) y SOBREVIVIR ("sobrevive 20 movimientos"). Se
+generan por lotes en un pool de procesos:
+  1. Cada semilla juega una partida con la sugerencia de profundidad 1 (y
+     algún error al azar) y toma una posición cada INTERVALO_MUESTRA movimientos.
+  2. Las posiciones se agrupan por forma canónica: las simétricas son el
+     mismo desafío y solo se gradúa una.
+  3. Cada posición se juega INTENTOS veces con esa misma política; la
+     dificultad es la fracción de intentos fallidos. Se descartan los
+     desafíos que no supera ningún intento.
+
+El paquete es un archivo binario con registros de tamaño fijo, ordenados
+por nivel, tras una cabecera que dice cuántos hay de cada nivel. La
+posición de cualquier desafío se calcula a partir del nivel y del índice,
+así que elegir uno al empezar una partida cuesta un seek y un read, sin
+leer ni indexar el resto del archivo.
+
+Uso:
+    python puzzle_generator.py generar --partidas 40
+    python puzzle_generator.py info
+"""
+import argparse
+import os
+import random
+import struct
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from compact_session import SesionCompacta
+from constants import ARCHIVO_DESAFIOS, VALOR_VICTORIA
+from evaluator import EvaluadorTablas
+from game_logic import DIRECCIONES, tablero_canonico
+from hint_engine import buscar
+
+Tablero = List[List[int]]
+
+ALCANZAR = 'alcanzar'
+SOBREVIVIR = 'sobrevivir'
+TIPOS = (ALCANZAR, SOBREVIVIR)
+NIVELES = ('fácil', 'medio', 'difícil')
+# Dificultad máxima (fracción de intentos fallidos) de los niveles fácil y medio
+LIMITES_NIVEL = (0.25, 0.65)
+
+MOVIMIENTOS_ALCANZAR = 50
+MOVIMIENTOS_SOBREVIVIR = 20
+FICHA_MIN_ALCANZAR = 64 # Por debajo, doblar la ficha mayor no es un reto
+INTENTOS = 8
+PROB_ERROR = 0.1 # Jugadas al azar en las partidas que generan posiciones
+MIN_MOVIMIENTOS = 30
+INTERVALO_MUESTRA = 25
+MAX_MOVIMIENTOS_PARTIDA = 2000
+LOTE_PROCESO = 8 # Posiciones por envío al pool al graduar
+
+MAGIA = b'PZL1'
+# tamaño del tablero y número de desafíos de cada nivel
+_CABECERA = struct.Struct('<B' + 'I' * len(NIVELES))
+# tipo, exponente del objetivo, movimientos, dificultad, puntuación, exponente
+# de la ficha mayor; siguen tamaño² exponentes
+_REGISTRO = struct.Struct('<BBHfIB')
+
+
+def _exponente(valor: int) -> int:
+    return valor.bit_length() - 1 if valor else 0
+
+
+def nivel_de(dificultad: float) -> str:
+    for nivel, limite in zip(NIVELES, LIMITES_NIVEL):
+        if dificultad <= limite:
+            return nivel
+    return NIVELES[-1]
+
+
+class Desafio(NamedTuple):
+    tipo: str
+    objetivo: int # Ficha que hay que conseguir (ALCANZAR) o 0
+    movimientos: int # Plazo (ALCANZAR) o movimientos que hay que aguantar (SOBREVIVIR)
+    dificultad: float # Fracción de intentos fallidos de la sugerencia, de 0 a 1
+    tablero: Tablero
+    puntuacion: int
+    max_ficha: int
+
+    @property
+    def nivel(self) -> str:
+        return nivel_de(self.dificultad)
+
+    def texto(self) -> str:
+        if self.tipo == ALCANZAR:
+            return f"Consigue la ficha {self.objetivo} en {self.movimientos} movimientos"
+        return f"Sobrevive {self.movimientos} movimientos"
+
+    def partida(self) -> Dict[str, Any]:
+        """Estado para Logica2048.from_dict (o SesionCompacta.from_dict)."""
+        return {
+            'tablero': [fila[:] for fila in self.tablero],
+            'puntuacion': self.puntuacion,
+            'max_ficha': self.max_ficha,
+            'history': [],
+            'ganado': self.max_ficha >= VALOR_VICTORIA,
+            'victoria_anunciada': self.max_ficha >= VALOR_VICTORIA,
+            # Los hitos ya superados en la posición de partida no se vuelven a celebrar
+            'hitos_alcanzados': [VALOR_VICTORIA << k for k in range(16)
+                                 if VALOR_VICTORIA << k <= self.max_ficha],
+            # La puntuación de partida la hizo el generador: ni récords ni estadísticas
+            'sin_records': True,
+        }
+
+    def resultado(self, movimientos: int, max_ficha: int, terminado: bool) -> Optional[bool]:
+        """True si está superado, False si ya no se puede superar, None si sigue en juego."""
+        if self.tipo == ALCANZAR and max_ficha >= self.objetivo:
+            return True
+        if self.tipo == SOBREVIVIR and movimientos >= self.movimientos:
+            return True
+        if terminado or movimientos >= self.movimientos:
+            return False
+        return None
+
+
+# --- Trabajo en el pool de procesos ---
+_evaluador_proceso = None
+
+def _evaluador(tamano: int) -> EvaluadorTablas:
+    """La tabla del evaluador se crea una vez por proceso."""
+    global _evaluador_proceso
+    if _evaluador_proceso is None or _evaluador_proceso.tamano != tamano:
+        _evaluador_proceso = EvaluadorTablas(tamano)
+    return _evaluador_proceso
+
+
+def _sugerencia(sesion: SesionCompacta, evaluar: Callable[[Tablero], float]) -> str:
+    return buscar(sesion.tablero, 1, evaluar).direccion
+
+
+def _jugar_candidatos(args: Tuple[int, int]) -> List[Tuple[Tablero, int, int]]:
+    """Juega una partida y devuelve (tablero, puntuación, ficha mayor) de las posiciones muestreadas."""
+    semilla, tamano = args
+    evaluar = _evaluador(tamano)
+    random.seed(semilla)
+    sesion = SesionCompacta(tamano)
+    candidatos = []
+    hechos = 0
+    while hechos < MAX_MOVIMIENTOS_PARTIDA and not sesion.juego_terminado():
+        if random.random() < PROB_ERROR:
+            direccion = random.choice(DIRECCIONES)
+        else:
+            direccion = _sugerencia(sesion, evaluar)
+        if not sesion.mover(direccion):
+            continue
+        hechos += 1
+        if hechos >= MIN_MOVIMIENTOS and hechos % INTERVALO_MUESTRA == 0:
+            candidatos.append((sesion.tablero, sesion.puntuacion, sesion.max_ficha))
+    return candidatos
+
+
+def _intentar(desafio: Desafio, evaluar: Callable[[Tablero], float]) -> bool:
+    """Juega el desafío con la sugerencia de profundidad 1."""
+    sesion = SesionCompacta(len(desafio.tablero), iniciar=False)
+    sesion.from_dict(desafio.partida())
+    hechos = 0
+    while True:
+        resultado = desafio.resultado(hechos, sesion.max_ficha, sesion.juego_terminado())
+        if resultado is not None:
+            return resultado
+        if not sesion.mover(_sugerencia(sesion, evaluar)):
+            return False
+        hechos += 1
+
+
+def objetivos(max_ficha: int) -> List[Tuple[str, int, int]]:
+    """(tipo, objetivo, movimientos) de los desafíos que se prueban en una posición."""
+    resultado = [(SOBREVIVIR, 0, MOVIMIENTOS_SOBREVIVIR)]
+    if max_ficha >= FICHA_MIN_ALCANZAR:
+        resultado.append((ALCANZAR, 2 * max_ficha, MOVIMIENTOS_ALCANZAR))
+    return resultado
+
+
+def _graduar(args: Tuple[Tablero, int, int, int, str]) -> List[Desafio]:
+    tablero, puntuacion, max_ficha, intentos, semilla = args
+    evaluar = _evaluador(len(tablero))
+    desafios = []
+    for tipo, objetivo, movimientos in objetivos(max_ficha):
+        desafio = Desafio(tipo, objetivo, movimientos, 0.0, tablero, puntuacion, max_ficha)
+        exitos = 0
+        for i in range(intentos):
+            random.seed(f"{semilla}-{tipo}-{i}")
+            exitos += _intentar(desafio, evaluar)
+        if exitos:
+            desafios.append(desafio._replace(dificultad=1.0 - exitos / intentos))
+    return desafios
+
+
+def _repartir(funcion, tareas, ejecutor: Optional[Executor], lote: int = 1):
+    if ejecutor is None:
+        return map(funcion, tareas)
+    return ejecutor.map(funcion, tareas, chunksize=lote)
+
+
+def generar(semillas: Sequence[int], tamano: int = 4, intentos: int = INTENTOS,
+            ejecutor: Optional[Executor] = None) -> List[Desafio]:
+    """Desafíos de las partidas de cada semilla, sin posiciones simétricas repetidas."""
+    unicas: Dict[tuple, Tuple[Tablero, int, int]] = {}
+    for candidatos in _repartir(_jugar_candidatos, [(s, tamano) for s in semillas], ejecutor):
+        for candidato in candidatos:
+            unicas.setdefault(tablero_canonico(candidato[0]), candidato)
+    tareas = [(tablero, puntos, max_ficha, intentos, f"{tamano}-{i}")
+              for i, (tablero, puntos, max_ficha) in enumerate(unicas.values())]
+    return [d for lote in _repartir(_graduar, tareas, ejecutor, LOTE_PROCESO) for d in lote]
+
+
+# --- Paquete de desafíos ---
+def escribir_paquete(ruta: str, desafios: Iterable[Desafio], tamano: int = 4) -> List[int]:
+    """
+    Escribe (de forma atómica) los desafíos del tamaño dado ordenados por
+    nivel y dificultad. Devuelve cuántos hay de cada nivel.
+    """
+    orden = sorted((d for d in desafios if len(d.tablero) == tamano),
+                   key=lambda d: (NIVELES.index(d.nivel), d.dificultad))
+    cuentas = [sum(1 for d in orden if d.nivel == nivel) for nivel in NIVELES]
+    temporal = ruta + ".tmp"
+    with open(temporal, 'wb') as f:
+        f.write(MAGIA)
+        f.write(_CABECERA.pack(tamano, *cuentas))
+        for d in orden:
+            f.write(_REGISTRO.pack(TIPOS.index(d.tipo), _exponente(d.objetivo), d.movimientos,
+                                   d.dificultad, d.puntuacion, _exponente(d.max_ficha)))
+            f.write(bytes(_exponente(v) for fila in d.tablero for v in fila))
+    os.replace(temporal, ruta)
+    return cuentas
+
+
+class PaqueteDesafios:
+    """Lectura por índice de un paquete; al abrirlo solo se lee la cabecera."""
+    def __init__(self, ruta: str = ARCHIVO_DESAFIOS):
+        self._archivo = open(ruta, 'rb')
+        cabecera = self._archivo.read(len(MAGIA) + _CABECERA.size)
+        if len(cabecera) < len(MAGIA) + _CABECERA.size or not cabecera.startswith(MAGIA):
+            self._archivo.close()
+            raise ValueError(f"{ruta} no es un paquete de desafíos")
+        self.tamano, *cuentas = _CABECERA.unpack_from(cabecera, len(MAGIA))
+        self.cantidades: Dict[str, int] = dict(zip(NIVELES, cuentas))
+        self._primero: Dict[str, int] = {}
+        total = 0
+        for nivel in NIVELES:
+            self._primero[nivel] = total
+            total += self.cantidades[nivel]
+        self._total = total
+        self._tamano_registro = _REGISTRO.size + self.tamano * self.tamano
+
+    def __len__(self) -> int:
+        return self._total
+
+    def cerrar(self) -> None:
+        self._archivo.close()
+
+    def leer(self, i: int, nivel: Optional[str] = None) -> Desafio:
+        """Desafío i del paquete (o del nivel dado)."""
+        cantidad = self._total if nivel is None else self.cantidades[nivel]
+        if not 0 <= i < cantidad:
+            raise IndexError(i)
+        if nivel is not None:
+            i += self._primero[nivel]
+        self._archivo.seek(len(MAGIA) + _CABECERA.size + i * self._tamano_registro)
+        datos = self._archivo.read(self._tamano_registro)
+        if len(datos) < self._tamano_registro:
+            raise ValueError("Paquete de desafíos truncado")
+        tipo, objetivo, movimientos, dificultad, puntuacion, max_ficha = _REGISTRO.unpack_from(datos)
+        n = self.tamano
+        celdas = datos[_REGISTRO.size:]
+        tablero = [[1 << e if e else 0 for e in celdas[r * n:(r + 1) * n]] for r in range(n)]
+        return Desafio(TIPOS[tipo], 1 << objetivo if objetivo else 0, movimientos, dificultad,
+                       tablero, puntuacion, 1 << max_ficha if max_ficha else 0)
+
+    def aleatorio(self, nivel: Optional[str] = None, rng: random.Random = random) -> Optional[Desafio]:
+        cantidad = self._total if nivel is None else self.cantidades[nivel]
+        if not cantidad:
+            return None
+        return self.leer(rng.randrange(cantidad), nivel)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Paquete de desafíos")
+    parser.add_argument('--archivo', default=ARCHIVO_DESAFIOS)
+    sub = parser.add_subparsers(dest='comando', required=True)
+    p_gen = sub.add_parser('generar', help="Genera posiciones, las gradúa y escribe el paquete")
+    p_gen.add_argument('--partidas', type=int, default=40)
+    p_gen.add_argument('--intentos', type=int, default=INTENTOS, help="Intentos por desafío al graduarlo")
+    p_gen.add_argument('--tamano', type=int, default=4)
+    p_gen.add_argument('--semilla', type=int, default=0)
+    p_gen.add_argument('--procesos', type=int, default=None, help="Por defecto, uno por CPU")
+    sub.add_parser('info', help="Desafíos de cada nivel")
+    args = parser.parse_args(argv)
+
+    if args.comando == 'generar':
+        semillas = range(args.semilla, args.semilla + args.partidas)
+        with ProcessPoolExecutor(max_workers=args.procesos) as ejecutor:
+            desafios = generar(semillas, args.tamano, args.intentos, ejecutor)
+        cuentas = escribir_paquete(args.archivo, desafios, args.tamano)
+        print(f"{len(desafios)} desafíos: " + ", ".join(f"{c} {n}" for n, c in zip(NIVELES, cuentas)))
+    else:
+        paquete = PaqueteDesafios(args.archivo)
+        try:
+            print(f"Tablero {paquete.tamano}x{paquete.tamano}, {len(paquete)} desafíos: "
+                  + ", ".join(f"{c} {n}" for n, c in paquete.cantidades.items()))
+        finally:
+            paquete.cerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
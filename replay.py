@@ -0,0 +1,124 @@
+"""Grabación y reproducción con acceso aleatorio de partidas de 2048."""
+import json
+import os
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from game_logic import DIRECCIONES, desplazar_tablero
+
+# Un movimiento grabado: (dirección, fila, columna, valor) de la ficha añadida.
+# Si no apareció ficha (tablero lleno), fila = -1.
+Movimiento = Tuple[str, int, int, int]
+
+
+class EstadoRepeticion(NamedTuple):
+    tablero: List[List[int]]
+    puntuacion: int
+    max_ficha: int
+
+
+class GrabacionPartida:
+    """
+    Secuencia de movimientos y fichas aparecidas desde un tablero inicial.
+    Es suficiente para reconstruir la partida sin depender del azar.
+    """
+    def __init__(self, tablero_inicial: List[List[int]], puntuacion_inicial: int = 0, max_ficha_inicial: int = 0):
+        self.tamano = len(tablero_inicial)
+        self.tablero_inicial = [fila[:] for fila in tablero_inicial]
+        self.puntuacion_inicial = puntuacion_inicial
+        self.max_ficha_inicial = max_ficha_inicial
+        self.movimientos: List[Movimiento] = []
+
+    def __len__(self) -> int:
+        return len(self.movimientos)
+
+    def registrar(self, direccion: str, ficha: Optional[Tuple[int, int, int]]) -> None:
+        if ficha is None:
+            self.movimientos.append((direccion, -1, -1, 0))
+        else:
+            r, c, val = ficha
+            self.movimientos.append((direccion, r, c, val))
+
+    def deshacer(self) -> None:
+        if self.movimientos:
+            self.movimientos.pop()
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Formato compacto: índice de dirección, fila, columna y valor de la ficha
+        return {
+            'version': 1,
+            'tablero_inicial': self.tablero_inicial,
+            'puntuacion_inicial': self.puntuacion_inicial,
+            'max_ficha_inicial': self.max_ficha_inicial,
+            'movimientos': [[DIRECCIONES.index(d), r, c, v] for d, r, c, v in self.movimientos],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GrabacionPartida":
+        grabacion = cls(data['tablero_inicial'],
+                        int(data.get('puntuacion_inicial', 0)),
+                        int(data.get('max_ficha_inicial', 0)))
+        grabacion.movimientos = [(DIRECCIONES[d], int(r), int(c), int(v)) for d, r, c, v in data['movimientos']]
+        return grabacion
+
+    def guardar(self, ruta: str) -> None:
+        temp = ruta + ".tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+        os.replace(temp, ruta)
+
+    @classmethod
+    def cargar(cls, ruta: str) -> "GrabacionPartida":
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def aplicar_movimiento(estado: EstadoRepeticion, movimiento: Movimiento) -> EstadoRepeticion:
+    """Reaplica un movimiento grabado (deslizamiento + ficha registrada)."""
+    direccion, r, c, val = movimiento
+    tablero, pts, _ = desplazar_tablero(estado.tablero, direccion)
+    max_ficha = estado.max_ficha
+    if r >= 0:
+        tablero[r][c] = val
+    m = max(max(fila) for fila in tablero)
+    if m > max_ficha:
+        max_ficha = m
+    return EstadoRepeticion(tablero, estado.puntuacion + pts, max_ficha)
+
+
+class Repeticion:
+    """
+    Reproducción con acceso aleatorio. Guarda un fotograma clave (tablero,
+    puntuación, ficha máxima) cada 'intervalo' movimientos, así que saltar a
+    cualquier movimiento reaplica como mucho 'intervalo' - 1 movimientos,
+    sea cual sea la longitud de la partida.
+    """
+    def __init__(self, grabacion: GrabacionPartida, intervalo: int = 64):
+        if intervalo < 1:
+            raise ValueError("El intervalo entre fotogramas clave debe ser >= 1")
+        self.grabacion = grabacion
+        self.intervalo = intervalo
+        self.claves: List[EstadoRepeticion] = []
+        estado = EstadoRepeticion([fila[:] for fila in grabacion.tablero_inicial],
+                                  grabacion.puntuacion_inicial,
+                                  grabacion.max_ficha_inicial)
+        for i, mov in enumerate(grabacion.movimientos):
+            if i % intervalo == 0:
+                self.claves.append(estado)
+            estado = aplicar_movimiento(estado, mov)
+        if len(grabacion.movimientos) % intervalo == 0:
+            self.claves.append(estado)
+        self.final = estado
+
+    def __len__(self) -> int:
+        return len(self.grabacion.movimientos)
+
+    def estado(self, n: int) -> EstadoRepeticion:
+        """Estado de la partida tras 'n' movimientos (0 = tablero inicial)."""
+        if not 0 <= n <= len(self):
+            raise IndexError(f"Movimiento {n} fuera de rango (0-{len(self)})")
+        base = n // self.intervalo
+        clave = self.claves[base]
+        estado = EstadoRepeticion([fila[:] for fila in clave.tablero], clave.puntuacion, clave.max_ficha)
+        for mov in self.grabacion.movimientos[base * self.intervalo:n]:
+            estado = aplicar_movimiento(estado, mov)
+        return estado
@@ -0,0 +1,284 @@
+"""
+Almacén SQLite (modo WAL) de perfiles, partidas guardadas, ajustes, récords
+y estadísticas acumuladas.
+
+Con WAL los lectores ven siempre la última transacción confirmada aunque
+otra instancia del juego esté escribiendo, así que varias ventanas pueden
+compartir la misma base de datos. Las sentencias son constantes con
+parámetros: sqlite3 las compila una vez y reutiliza la sentencia preparada
+en cada movimiento. Las escrituras relacionadas (partida + récord) van en
+una sola transacción con transaccion(). Las estadísticas son una fila por
+contador y se actualizan sumando (valor = valor + ?), así que varias
+instancias con el mismo perfil acumulan sin pisarse.
+"""
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from constants import ARCHIVO_BD
+
+RANURA_AUTOMATICA = "auto"
+VERSION_ESQUEMA = 2
+# Tiempo máximo esperando a que otra instancia suelte el bloqueo de escritura
+ESPERA_BLOQUEO_S = 5.0
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS perfiles (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL UNIQUE,
+    creado REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS partidas (
+    perfil INTEGER NOT NULL REFERENCES perfiles(id) ON DELETE CASCADE,
+    ranura TEXT NOT NULL,
+    tamano INTEGER NOT NULL,
+    datos TEXT NOT NULL,
+    actualizado REAL NOT NULL,
+    PRIMARY KEY (perfil, ranura)
+);
+CREATE TABLE IF NOT EXISTS ajustes (
+    perfil INTEGER NOT NULL REFERENCES perfiles(id) ON DELETE CASCADE,
+    clave TEXT NOT NULL,
+    valor TEXT NOT NULL,
+    PRIMARY KEY (perfil, clave)
+);
+CREATE TABLE IF NOT EXISTS records (
+    perfil INTEGER NOT NULL REFERENCES perfiles(id) ON DELETE CASCADE,
+    tamano INTEGER NOT NULL,
+    puntuacion INTEGER NOT NULL,
+    max_ficha INTEGER NOT NULL,
+    fecha REAL NOT NULL,
+    PRIMARY KEY (perfil, tamano)
+);
+CREATE TABLE IF NOT EXISTS contadores (
+    perfil INTEGER NOT NULL REFERENCES perfiles(id) ON DELETE CASCADE,
+    clave TEXT NOT NULL,
+    valor INTEGER NOT NULL,
+    PRIMARY KEY (perfil, clave)
+);
+"""
+
+# Sentencias preparadas (el texto constante permite reutilizar la compilada)
+_SQL_PERFIL = "SELECT id FROM perfiles WHERE nombre = ?"
+_SQL_CREAR_PERFIL = "INSERT OR IGNORE INTO perfiles (nombre, creado) VALUES (?, ?)"
+_SQL_PERFILES = "SELECT nombre FROM perfiles ORDER BY nombre"
+_SQL_GUARDAR_PARTIDA = """
+    INSERT INTO partidas (perfil, ranura, tamano, datos, actualizado) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (perfil, ranura) DO UPDATE SET
+        tamano = excluded.tamano, datos = excluded.datos, actualizado = excluded.actualizado
+"""
+_SQL_CARGAR_PARTIDA = "SELECT datos FROM partidas WHERE perfil = ? AND ranura = ?"
+_SQL_BORRAR_PARTIDA = "DELETE FROM partidas WHERE perfil = ? AND ranura = ?"
+_SQL_RANURAS = "SELECT ranura, tamano, actualizado FROM partidas WHERE perfil = ? ORDER BY actualizado DESC"
+_SQL_GUARDAR_AJUSTE = """
+    INSERT INTO ajustes (perfil, clave, valor) VALUES (?, ?, ?)
+    ON CONFLICT (perfil, clave) DO UPDATE SET valor = excluded.valor
+"""
+_SQL_AJUSTES = "SELECT clave, valor FROM ajustes WHERE perfil = ?"
+_SQL_REGISTRAR_RECORD = """
+    INSERT INTO records (perfil, tamano, puntuacion, max_ficha, fecha) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (perfil, tamano) DO UPDATE SET
+        puntuacion = max(puntuacion, excluded.puntuacion),
+        max_ficha = max(max_ficha, excluded.max_ficha),
+        fecha = CASE WHEN excluded.puntuacion > puntuacion OR excluded.max_ficha > max_ficha
+                     THEN excluded.fecha ELSE fecha END
+"""
+_SQL_RECORD = "SELECT puntuacion, max_ficha FROM records WHERE perfil = ? AND tamano = ?"
+_SQL_SUMAR_CONTADOR = """
+    INSERT INTO contadores (perfil, clave, valor) VALUES (?, ?, ?)
+    ON CONFLICT (perfil, clave) DO UPDATE SET valor = valor + excluded.valor
+"""
+_SQL_MAXIMO_CONTADOR = """
+    INSERT INTO contadores (perfil, clave, valor) VALUES (?, ?, ?)
+    ON CONFLICT (perfil, clave) DO UPDATE SET valor = max(valor, excluded.valor)
+"""
+_SQL_FIJAR_CONTADOR = """
+    INSERT INTO contadores (perfil, clave, valor) VALUES (?, ?, ?)
+    ON CONFLICT (perfil, clave) DO UPDATE SET valor = excluded.valor
+"""
+_SQL_CONTADORES = "SELECT clave, valor FROM contadores WHERE perfil = ?"
+
+
+class AlmacenJuego:
+    """Conexión al almacén. Se usa desde un solo hilo (el de la UI)."""
+    def __init__(self, ruta: str = ARCHIVO_BD, espera_bloqueo: float = ESPERA_BLOQUEO_S):
+        self.ruta = ruta
+        # isolation_level=None: sin transacciones implícitas, las abre transaccion()
+        self.con = sqlite3.connect(ruta, timeout=espera_bloqueo, isolation_level=None,
+                                   cached_statements=64)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("PRAGMA synchronous=NORMAL") # Seguro con WAL; solo se pierde lo último ante un corte de luz
+        self.con.execute("PRAGMA foreign_keys=ON")
+        self._profundidad = 0
+        self._ids_perfil: Dict[str, int] = {}
+        version = self.con.execute("PRAGMA user_version").fetchone()[0]
+        if version < VERSION_ESQUEMA:
+            with self.transaccion():
+                # Sentencia a sentencia: executescript confirmaría por su cuenta
+                for sentencia in _ESQUEMA.split(';'):
+                    if sentencia.strip():
+                        self.con.execute(sentencia)
+                self.con.execute(f"PRAGMA user_version = {VERSION_ESQUEMA}")
+
+    def cerrar(self) -> None:
+        self.con.close()
+
+    @contextmanager
+    def transaccion(self) -> Iterator[None]:
+        """
+        Agrupa escrituras en una transacción (anidable: solo la externa confirma).
+        BEGIN IMMEDIATE toma el bloqueo de escritura al empezar, así que dos
+        instancias no se pisan a mitad de transacción.
+        """
+        if self._profundidad:
+            self._profundidad += 1
+            try:
+                yield
+            finally:
+                self._profundidad -= 1
+            return
+        self.con.execute("BEGIN IMMEDIATE")
+        self._profundidad = 1
+        try:
+            yield
+        except BaseException:
+            self._profundidad = 0
+            self.con.execute("ROLLBACK")
+            raise
+        self._profundidad = 0
+        self.con.execute("COMMIT")
+
+    # --- Perfiles ---
+    def perfil(self, nombre: str) -> int:
+        """Id del perfil, creándolo si no existe."""
+        pid = self._ids_perfil.get(nombre)
+        if pid is None:
+            fila = self.con.execute(_SQL_PERFIL, (nombre,)).fetchone()
+            if fila is None:
+                with self.transaccion():
+                    self.con.execute(_SQL_CREAR_PERFIL, (nombre, time.time()))
+                fila = self.con.execute(_SQL_PERFIL, (nombre,)).fetchone()
+            pid = fila[0]
+            self._ids_perfil[nombre] = pid
+        return pid
+
+    def perfiles(self) -> List[str]:
+        return [fila[0] for fila in self.con.execute(_SQL_PERFILES)]
+
+    # --- Partidas ---
+    def guardar_partida(self, perfil: str, datos: Dict[str, Any], tamano: int,
+                        ranura: str = RANURA_AUTOMATICA) -> None:
+        pid = self.perfil(perfil)
+        texto = json.dumps(datos, separators=(',', ':'))
+        with self.transaccion():
+            self.con.execute(_SQL_GUARDAR_PARTIDA, (pid, ranura, tamano, texto, time.time()))
+
+    def cargar_partida(self, perfil: str, ranura: str = RANURA_AUTOMATICA) -> Optional[Dict[str, Any]]:
+        fila = self.con.execute(_SQL_CARGAR_PARTIDA, (self.perfil(perfil), ranura)).fetchone()
+        if fila is None:
+            return None
+        try:
+            return json.loads(fila[0])
+        except ValueError as e:
+            logging.error(f"Partida guardada ilegible ({perfil}/{ranura}): {e}")
+            return None
+
+    def borrar_partida(self, perfil: str, ranura: str = RANURA_AUTOMATICA) -> None:
+        pid = self.perfil(perfil)
+        with self.transaccion():
+            self.con.execute(_SQL_BORRAR_PARTIDA, (pid, ranura))
+
+    def ranuras(self, perfil: str) -> List[Tuple[str, int, float]]:
+        """(ranura, tamaño, fecha de actualización) de las partidas del perfil, la más reciente primero."""
+        return [tuple(fila) for fila in self.con.execute(_SQL_RANURAS, (self.perfil(perfil),))]
+
+    # --- Ajustes ---
+    def guardar_ajustes(self, perfil: str, ajustes: Dict[str, Any]) -> None:
+        pid = self.perfil(perfil)
+        with self.transaccion():
+            self.con.executemany(_SQL_GUARDAR_AJUSTE,
+                                 [(pid, clave, json.dumps(valor)) for clave, valor in ajustes.items()])
+
+    def cargar_ajustes(self, perfil: str) -> Dict[str, Any]:
+        ajustes: Dict[str, Any] = {}
+        for clave, valor in self.con.execute(_SQL_AJUSTES, (self.perfil(perfil),)):
+            try:
+                ajustes[clave] = json.loads(valor)
+            except ValueError:
+                pass
+        return ajustes
+
+    # --- Récords ---
+    def registrar_record(self, perfil: str, tamano: int, puntuacion: int, max_ficha: int) -> None:
+        """Guarda el máximo entre el récord actual y el dado (por perfil y tamaño de tablero)."""
+        pid = self.perfil(perfil)
+        with self.transaccion():
+            self.con.execute(_SQL_REGISTRAR_RECORD, (pid, tamano, puntuacion, max_ficha, time.time()))
+
+    def record(self, perfil: str, tamano: int) -> Tuple[int, int]:
+        """(puntuación, ficha máxima) récord; (0, 0) si no hay."""
+        fila = self.con.execute(_SQL_RECORD, (self.perfil(perfil), tamano)).fetchone()
+        return (fila[0], fila[1]) if fila else (0, 0)
+
+    # --- Estadísticas ---
+    def guardar_estadisticas(self, perfil: str, sumas: Dict[str, int],
+                             maximos: Optional[Dict[str, int]] = None,
+                             fijos: Optional[Dict[str, int]] = None) -> None:
+        """
+        Añade 'sumas' a los contadores del perfil, se queda con el mayor en
+        'maximos' y sustituye los 'fijos', todo en una transacción.
+        """
+        pid = self.perfil(perfil)
+        with self.transaccion():
+            for sql, valores in ((_SQL_SUMAR_CONTADOR, sumas), (_SQL_MAXIMO_CONTADOR, maximos),
+                                 (_SQL_FIJAR_CONTADOR, fijos)):
+                if valores:
+                    self.con.executemany(sql, [(pid, clave, int(valor)) for clave, valor in valores.items()])
+
+    def cargar_estadisticas(self, perfil: str) -> Optional[Dict[str, int]]:
+        """Contadores del perfil; None si aún no tiene ninguno."""
+        contadores = dict(self.con.execute(_SQL_CONTADORES, (self.perfil(perfil),)).fetchall())
+        return contadores or None
+
+    # --- Migración ---
+    def migrar_json(self, perfil: str, ruta_guardado: str, ruta_ajustes: str) -> bool:
+        """
+        Importa savegame.json y settings.json al perfil, en una transacción, y
+        los renombra a *.migrado para no importarlos dos veces. La partida solo
+        se importa si el perfil no tiene ya una.
+        """
+        importados: List[str] = []
+        with self.transaccion():
+            if os.path.exists(ruta_ajustes):
+                try:
+                    with open(ruta_ajustes, 'r', encoding='utf-8') as f:
+                        ajustes = json.load(f)
+                    # Un settings.json editado a mano se aplica sobre los ajustes del perfil
+                    if isinstance(ajustes, dict):
+                        self.guardar_ajustes(perfil, ajustes)
+                    importados.append(ruta_ajustes)
+                except (OSError, ValueError) as e:
+                    logging.error(f"Error migrando {ruta_ajustes}: {e}")
+            if os.path.exists(ruta_guardado):
+                try:
+                    with open(ruta_guardado, 'r', encoding='utf-8') as f:
+                        datos = json.load(f)
+                    tablero = datos.get('tablero') if isinstance(datos, dict) else None
+                    if isinstance(tablero, list) and tablero:
+                        if self.cargar_partida(perfil) is None:
+                            self.guardar_partida(perfil, datos, len(tablero))
+                        self.registrar_record(perfil, len(tablero), int(datos.get('high_score', 0)),
+                                              int(datos.get('max_ficha', 0)))
+                    importados.append(ruta_guardado)
+                except (OSError, ValueError, TypeError) as e:
+                    logging.error(f"Error migrando {ruta_guardado}: {e}")
+        for ruta in importados:
+            try:
+                os.replace(ruta, ruta + ".migrado")
+            except OSError as e:
+                logging.error(f"No se pudo renombrar {ruta}: {e}")
+        return bool(importados)
@@ -0,0 +1,98 @@
+import random
+import unittest
+
+from animation import AnimadorFichas, FichaAnimada, celdas_cubiertas
+from game_logic import Desplazamiento, Logica2048, desplazar_tablero, desplazamientos_tablero
+
+
+class Reloj:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class TestDesplazamientos(unittest.TestCase):
+    def test_fusion_y_deslizamiento(self):
+        tablero = [[2, 2, 4, 0], [0, 0, 0, 0], [0, 0, 0, 8], [0, 0, 0, 0]]
+        d = desplazamientos_tablero(tablero, 'IZQUIERDA')
+        self.assertEqual(d, [
+            Desplazamiento(2, (0, 0), (0, 0), True),
+            Desplazamiento(2, (0, 1), (0, 0), True),
+            Desplazamiento(4, (0, 2), (0, 1), False),
+            Desplazamiento(8, (2, 3), (2, 0), False),
+        ])
+
+    def test_coincide_con_el_movimiento(self):
+        rng = random.Random(5)
+        for _ in range(50):
+            tablero = [[rng.choice([0, 0, 2, 4, 8]) for _ in range(4)] for _ in range(4)]
+            for direccion in ('IZQUIERDA', 'DERECHA', 'ARRIBA', 'ABAJO'):
+                esperado, _, _ = desplazar_tablero(tablero, direccion)
+                final = [[0] * 4 for _ in range(4)]
+                for d in desplazamientos_tablero(tablero, direccion):
+                    final[d.destino[0]][d.destino[1]] += d.valor
+                self.assertEqual(final, esperado)
+
+    def test_logica_expone_el_ultimo_movimiento(self):
+        juego = Logica2048(4)
+        juego.tablero = [[0, 0, 0, 2], [0] * 4, [0] * 4, [0] * 4]
+        juego.history = []
+        self.assertTrue(juego.mover('IZQUIERDA', guardar=False))
+        self.assertIn(Desplazamiento(2, (0, 3), (0, 0), False), juego.desplazamientos())
+        juego.deshacer()
+        self.assertEqual(juego.desplazamientos(), [])
+
+
+class TestAnimadorFichas(unittest.TestCase):
+    def setUp(self):
+        self.reloj = Reloj()
+        self.animador = AnimadorFichas(duracion=0.1, intervalo=0.01, reloj=self.reloj)
+        self.desplazamientos = [
+            Desplazamiento(2, (0, 3), (0, 0), False),
+            Desplazamiento(4, (1, 1), (1, 1), False), # Quieta: no se anima
+        ]
+
+    def test_solo_fichas_moviles(self):
+        self.assertTrue(self.animador.iniciar(self.desplazamientos, ocultas=[(3, 3)]))
+        self.assertEqual(self.animador.ocultas, {(0, 0), (3, 3)})
+        fichas = self.animador.fotograma()
+        self.assertEqual(fichas, [FichaAnimada(2, 0.0, 3.0)])
+        self.reloj.t = 0.05
+        (ficha,) = self.animador.fotograma()
+        self.assertTrue(0 < ficha.columna < 1.5) # Frena al final: ya pasó de la mitad
+        self.reloj.t = 0.1
+        self.assertIsNone(self.animador.fotograma())
+        self.assertFalse(self.animador.activa)
+        self.assertFalse(self.animador.iniciar(self.desplazamientos[1:]))
+
+    def test_fotogramas_perdidos_y_coste(self):
+        self.animador.iniciar(self.desplazamientos)
+        self.animador.fotograma()
+        self.animador.registrar_coste(0.002)
+        self.reloj.t = 0.04 # Debían ir 3 fotogramas en medio
+        self.animador.fotograma()
+        self.animador.registrar_coste(0.004)
+        informe = self.animador.terminar()
+        self.assertEqual(informe['fotogramas'], 2)
+        self.assertEqual(informe['perdidos'], 3)
+        self.assertAlmostEqual(informe['coste_medio_ms'], 3.0)
+        self.assertAlmostEqual(informe['coste_max_ms'], 4.0)
+        self.assertIsNone(self.animador.fotograma())
+
+    def test_sobre_presupuesto_salta_al_final(self):
+        self.animador.iniciar(self.desplazamientos)
+        for _ in range(2):
+            self.assertIsNotNone(self.animador.fotograma())
+            self.animador.registrar_coste(0.02)
+        self.assertIsNone(self.animador.fotograma())
+
+    def test_celdas_cubiertas(self):
+        cubiertas = sorted(celdas_cubiertas(FichaAnimada(2, 1.0, 2.25)))
+        self.assertEqual(cubiertas, [((1, 2), 0.0, 0.25), ((1, 3), 0.0, -0.75)])
+        self.assertEqual(celdas_cubiertas(FichaAnimada(2, 3.0, 0.0)), [((3, 0), 0.0, 0.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from announcer import PlanificadorAnuncios
+
+
+class RelojFalso:
+    def __init__(self):
+        self.t = 100.0
+
+    def __call__(self):
+        return self.t
+
+
+class TestPlanificadorAnuncios(unittest.TestCase):
+    def setUp(self):
+        self.reloj = RelojFalso()
+        self.emitidos = []
+        self.programados = []
+        self.plan = PlanificadorAnuncios(self.emitidos.append,
+                                         lambda ms, fn: self.programados.append((ms, fn)),
+                                         reloj=self.reloj, ventana_ms=50, intervalo_min_ms=100)
+
+    def ejecutar_programado(self, avance_ms):
+        self.reloj.t += avance_ms / 1000.0
+        _, fn = self.programados.pop(0)
+        fn()
+
+    def test_misma_pulsacion_se_combina(self):
+        self.plan.nueva_entrada()
+        self.plan.anunciar("Hito 2048")
+        self.plan.anunciar("Juego terminado")
+        self.assertEqual(len(self.programados), 1)
+        self.ejecutar_programado(50)
+        self.assertEqual(self.emitidos, ["Hito 2048. Juego terminado"])
+
+    def test_pulsacion_nueva_sustituye(self):
+        for i in range(5):
+            self.plan.nueva_entrada()
+            self.plan.anunciar(f"Movimiento {i}", historial=False)
+        self.ejecutar_programado(50)
+        self.assertEqual(self.emitidos, ["Movimiento 4"])
+        self.assertEqual(self.plan.sustituidos, 4)
+        self.assertEqual(len(self.plan.historial), 0)
+
+    def test_limite_de_frecuencia(self):
+        self.plan.anunciar("Uno", inmediato=True)
+        self.plan.nueva_entrada()
+        self.plan.anunciar("Dos")
+        # Next emission waits for the minimum interval, not just the window
+        self.assertEqual(self.programados[0][0], 100)
+        self.ejecutar_programado(40)
+        self.assertEqual(self.emitidos, ["Uno"])
+        self.ejecutar_programado(60)
+        self.assertEqual(self.emitidos, ["Uno", "Dos"])
+
+    def test_historial_acotado(self):
+        for i in range(30):
+            self.plan.anunciar(f"Anuncio {i}")
+            self.plan.anunciar(f"Anuncio {i}")
+        self.assertEqual(len(self.plan.historial), 20)
+        self.assertEqual(self.plan.historial[0], "Anuncio 10")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import random
+import tempfile
+import unittest
+
+from autoplay import Autojugador
+from game_logic import Logica2048
+
+
+class TestAutojugador(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        random.seed(3)
+        self.juego = Logica2048(tamano=4)
+        self.juego.ARCHIVO_GUARDADO = os.path.join(self.dir.name, "savegame.json")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_juega_sin_guardar(self):
+        jugadas = []
+        auto = Autojugador(self.juego, al_mover=jugadas.append)
+        hechos = auto.ejecutar(30)
+        self.assertGreater(hechos, 0)
+        self.assertEqual(len(jugadas), hechos)
+        self.assertEqual(auto.movimientos, hechos)
+        self.assertFalse(os.path.exists(self.juego.ARCHIVO_GUARDADO))
+
+    def test_hasta_el_final(self):
+        auto = Autojugador(self.juego)
+        while auto.paso():
+            pass
+        self.assertTrue(auto.terminado)
+        self.assertTrue(self.juego.juego_terminado())
+        self.assertFalse(auto.paso())
+
+    def test_sin_sugerencia_termina(self):
+        auto = Autojugador(self.juego, elegir=lambda tablero: "Ninguna")
+        self.assertEqual(auto.ejecutar(10), 0)
+        self.assertTrue(auto.terminado)
+
+if __name__ == '__main__':
+    unittest.main()
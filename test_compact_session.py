@@ -0,0 +1,73 @@
+import os
+import random
+import tempfile
+import unittest
+
+from compact_session import SesionCompacta, medir_bytes_por_sesion
+from game_logic import DIRECCIONES, Logica2048
+
+
+def jugar(crear, semilla, jugadas=200):
+    """Traza de una partida con deshacer ocasional (el azar global se consume en orden)."""
+    rng = random.Random(semilla + 100)
+    random.seed(semilla)
+    juego = crear(4)
+    traza = []
+    for _ in range(jugadas):
+        if rng.random() < 0.1:
+            hecho = juego.deshacer()
+        else:
+            hecho = juego.mover(rng.choice(DIRECCIONES), guardar=False)
+        traza.append((hecho, juego.tablero, juego.puntuacion, juego.max_ficha))
+    datos = juego.to_dict()
+    datos.pop('tamano', None)
+    return traza, datos, juego.juego_terminado()
+
+
+class TestSesionCompacta(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.dir.name) # Logica2048 lee settings.json del directorio actual
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.dir.cleanup()
+
+    def test_mismas_reglas_que_logica(self):
+        for semilla in range(5):
+            self.assertEqual(jugar(Logica2048, semilla), jugar(SesionCompacta, semilla))
+
+    def test_conversion(self):
+        random.seed(1)
+        juego = Logica2048(4)
+        for d in DIRECCIONES * 5:
+            juego.mover(d, guardar=False)
+        juego.hitos_alcanzados = [2048]
+        sesion = SesionCompacta.desde_logica(juego)
+        self.assertEqual(sesion.tablero, juego.tablero)
+        self.assertEqual(sesion.hitos_alcanzados, [2048])
+        vuelta = sesion.a_logica()
+        self.assertEqual(vuelta.to_dict(), juego.to_dict())
+        self.assertTrue(sesion.deshacer())
+        self.assertEqual(sesion.tablero, juego.history[-1]['tablero'])
+
+    def test_from_dict_invalido(self):
+        sesion = SesionCompacta(4)
+        self.assertFalse(sesion.from_dict({'tablero': [[0] * 3] * 3}))
+        self.assertFalse(sesion.from_dict({'tablero': [[0] * 4] * 4, 'history': [{'tablero': 1}]}))
+        # Un diccionario rechazado no cambia nada de la sesión
+        antes = sesion.to_dict()
+        self.assertFalse(sesion.from_dict({'tablero': [[0] * 3] * 3, 'high_score': 999}))
+        self.assertFalse(sesion.from_dict({'tablero': [[2] * 4] * 4, 'high_score': 999,
+                                           'history': [{'tablero': 1}]}))
+        self.assertEqual(sesion.to_dict(), antes)
+
+    def test_sin_dict_y_menor(self):
+        self.assertFalse(hasattr(SesionCompacta(4), '__dict__'))
+        compacta = medir_bytes_por_sesion(SesionCompacta, 50, movimientos=8)
+        completa = medir_bytes_por_sesion(Logica2048, 50, movimientos=8)
+        self.assertLess(compacta * 5, completa)
+
+if __name__ == '__main__':
+    unittest.main()
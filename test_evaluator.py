@@ -0,0 +1,61 @@
+import random
+import unittest
+
+from evaluator import EvaluadorTablas, PESOS_DEFECTO, exponentes, puntuar_linea
+
+
+def evaluar_directo(tablero, pesos):
+    total = 0.0
+    for fila in tablero:
+        total += puntuar_linea(exponentes(fila), pesos)
+    for columna in zip(*tablero):
+        total += puntuar_linea(exponentes(columna), pesos)
+    return total
+
+
+class TestEvaluador(unittest.TestCase):
+    TABLERO = [[2, 4, 8, 16], [0, 2, 0, 4], [0, 0, 0, 0], [2, 0, 0, 2]]
+
+    def test_tabla_coincide_con_calculo_directo(self):
+        ev = EvaluadorTablas(4)
+        self.assertAlmostEqual(ev(self.TABLERO), evaluar_directo(self.TABLERO, PESOS_DEFECTO))
+
+    def test_fichas_grandes_usan_tabla_perezosa(self):
+        ev = EvaluadorTablas(4)
+        tablero = [fila[:] for fila in self.TABLERO]
+        tablero[0][0] = 65536
+        self.assertAlmostEqual(ev(tablero), evaluar_directo(tablero, PESOS_DEFECTO))
+        self.assertTrue(ev.tabla_perezosa)
+
+    def test_tablero_grande(self):
+        ev = EvaluadorTablas(5)
+        self.assertIsNone(ev.tabla)
+        tablero = [[2, 2, 0, 4, 8] for _ in range(5)]
+        self.assertAlmostEqual(ev(tablero), evaluar_directo(tablero, PESOS_DEFECTO))
+
+    def test_tabla_perezosa_acotada(self):
+        ev = EvaluadorTablas(6, max_perezosa=20)
+        rng = random.Random(5)
+        for _ in range(50):
+            tablero = [[rng.choice((0, 2, 4, 8, 16, 32)) for _ in range(6)] for _ in range(6)]
+            self.assertAlmostEqual(ev(tablero), evaluar_directo(tablero, PESOS_DEFECTO))
+            self.assertLessEqual(len(ev.tabla_perezosa), 20)
+
+    def test_terminos(self):
+        solo = lambda termino: {k: (1.0 if k == termino else 0.0) for k in PESOS_DEFECTO}
+        self.assertEqual(puntuar_linea([0, 1, 0, 0], solo('vacias')), 3.0)
+        self.assertEqual(puntuar_linea([1, 0, 1, 2], solo('fusiones')), 1.0)
+        self.assertEqual(puntuar_linea([3, 2, 1, 0], solo('monotonicidad')), 0.0)
+        self.assertLess(puntuar_linea([1, 3, 1, 3], solo('monotonicidad')), 0.0)
+        self.assertEqual(puntuar_linea([1, 3, 0, 2], solo('suavidad')), -2.0)
+
+    def test_pesos_configurables(self):
+        base = EvaluadorTablas(4)
+        sin_vacias = EvaluadorTablas(4, pesos={'vacias': 0.0})
+        libres = sum(1 for fila in self.TABLERO for v in fila if v == 0)
+        # Each empty cell is counted once in its row and once in its column
+        self.assertAlmostEqual(base(self.TABLERO) - sin_vacias(self.TABLERO),
+                               2 * libres * PESOS_DEFECTO['vacias'])
+
+if __name__ == '__main__':
+    unittest.main()
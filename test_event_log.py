@@ -0,0 +1,60 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+import event_log
+
+
+class TestEventLog(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.dir.name, "game_events.log")
+        event_log.fijar_categorias_desactivadas([])
+
+    def tearDown(self):
+        event_log.detener()
+        event_log.fijar_categorias_desactivadas([])
+        self.dir.cleanup()
+
+    def leer_lineas(self):
+        with open(self.ruta, encoding='utf-8') as f:
+            return [json.loads(l) for l in f if l.strip()]
+
+    def test_json_lines(self):
+        event_log.iniciar(self.ruta)
+        event_log.registrar("INPUT", "Tecla: %d, Shift: %s", 317, True)
+        event_log.registrar("ANNOUNCE", "Hola ")
+        event_log.detener()
+
+        lineas = self.leer_lineas()
+        self.assertEqual([l['cat'] for l in lineas], ["INPUT", "ANNOUNCE"])
+        self.assertEqual(lineas[0]['msg'], "Tecla: 317, Shift: True")
+        # Trailing whitespace used to force screen reader repeats is stripped
+        self.assertEqual(lineas[1]['msg'], "Hola")
+
+    def test_categoria_desactivada(self):
+        event_log.iniciar(self.ruta)
+        event_log.activar_categoria("WINAPI_NOTIFY", False)
+        self.assertFalse(event_log.categoria_activa("WINAPI_NOTIFY"))
+        event_log.registrar("WINAPI_NOTIFY", "Cell %d,%d", 0, 0)
+        event_log.registrar("INPUT", "Tecla")
+        event_log.detener()
+
+        self.assertEqual([l['cat'] for l in self.leer_lineas()], ["INPUT"])
+
+    def test_rotacion_comprimida(self):
+        event_log.iniciar(self.ruta, max_bytes=500, copias=2)
+        for i in range(100):
+            event_log.registrar("INPUT", "Tecla: %d", i)
+        event_log.detener()
+
+        rotado = self.ruta + ".1.gz"
+        self.assertTrue(os.path.exists(rotado))
+        self.assertFalse(os.path.exists(self.ruta + ".3.gz"))
+        with gzip.open(rotado, 'rt', encoding='utf-8') as f:
+            self.assertEqual(json.loads(f.readline())['cat'], "INPUT")
+
+if __name__ == '__main__':
+    unittest.main()
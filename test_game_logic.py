@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 from game_logic import Logica2048
 
@@ -76,6 +78,36 @@ class TestGameLogic(unittest.TestCase):
         self.game.deshacer()
         self.assertEqual(self.game.tablero, orig_tablero)
 
+    def test_celdas_cambiadas(self):
+        self.game.tablero = [
+            [2, 2, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0]
+        ]
+        antes = [fila[:] for fila in self.game.tablero]
+        self.game.consumir_celdas_cambiadas()
+        self.game.mover('IZQUIERDA')
+        cambiadas = self.game.consumir_celdas_cambiadas()
+        # Merge target plus every cell that differs (vacated source, spawned tile)
+        esperadas = {(r, c) for r in range(4) for c in range(4)
+                     if antes[r][c] != self.game.tablero[r][c]}
+        self.assertIn((0, 0), cambiadas)
+        self.assertEqual(cambiadas, esperadas)
+        self.assertEqual(self.game.celdas_cambiadas, set())
+
+        self.game.deshacer()
+        self.assertEqual(self.game.consumir_celdas_cambiadas(), cambiadas)
+
+    def test_mover_sin_guardar(self):
+        with tempfile.TemporaryDirectory() as d:
+            self.game.ARCHIVO_GUARDADO = os.path.join(d, "savegame.json")
+            self.game.tablero = [[2, 2, 0, 0]] + [[0] * 4 for _ in range(3)]
+            self.assertTrue(self.game.mover('IZQUIERDA', guardar=False))
+            self.assertFalse(os.path.exists(self.game.ARCHIVO_GUARDADO))
+            self.game.mover('DERECHA')
+            self.assertTrue(os.path.exists(self.game.ARCHIVO_GUARDADO))
+
     def test_board_analysis(self):
         # Summary test
         self.game.tablero = [[2, 2, 0, 0] for _ in range(4)]
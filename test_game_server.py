@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from constants import TAMANO_MAXIMO, TAMANO_MINIMO
+from game_logic import DIRECCIONES
+from game_server import ClienteJuego, ErrorRPC, ERROR_SESION, ServidorJuego, generar_carga
+
+
+class TestServidorJuego(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.ejecutor = ThreadPoolExecutor(2)
+        self.servidor = ServidorJuego(os.path.join(self.dir.name, "sesiones"), self.ejecutor,
+                                      intervalo_guardado=60)
+        await self.servidor.iniciar("127.0.0.1", 0)
+        self.puerto = self.servidor.direccion[1]
+        self.cliente = await ClienteJuego.conectar("127.0.0.1", self.puerto)
+
+    async def asyncTearDown(self):
+        await self.cliente.cerrar()
+        await self.servidor.detener()
+        self.ejecutor.shutdown()
+        self.dir.cleanup()
+
+    async def test_partida(self):
+        nueva = await self.cliente.llamar('new_game')
+        sesion = nueva['session']
+        self.assertEqual(sum(1 for fila in nueva['state']['tablero'] for v in fila if v), 2)
+
+        movido = False
+        for d in DIRECCIONES:
+            r = await self.cliente.llamar('move', session=sesion, direccion=d)
+            if r['movido']:
+                movido = True
+                break
+        self.assertTrue(movido)
+        deshecho = await self.cliente.llamar('undo', session=sesion)
+        self.assertTrue(deshecho['deshecho'])
+        self.assertEqual(deshecho['state']['tablero'], nueva['state']['tablero'])
+
+        sugerencia = await self.cliente.llamar('hint', session=sesion, profundidad=1)
+        self.assertIn(sugerencia['direccion'], DIRECCIONES)
+
+    async def test_errores(self):
+        with self.assertRaises(ErrorRPC) as ctx:
+            await self.cliente.llamar('state', session="noexiste")
+        self.assertEqual(ctx.exception.codigo, ERROR_SESION)
+        with self.assertRaises(ErrorRPC):
+            await self.cliente.llamar('volar')
+        sesion = (await self.cliente.llamar('new_game'))['session']
+        with self.assertRaises(ErrorRPC):
+            await self.cliente.llamar('move', session=sesion, direccion='DIAGONAL')
+        # Mismo rango de tamaños que la interfaz
+        with self.assertRaises(ErrorRPC):
+            await self.cliente.llamar('new_game', tamano=TAMANO_MINIMO - 1)
+        grande = await self.cliente.llamar('new_game', tamano=TAMANO_MAXIMO)
+        self.assertEqual(len(grande['state']['tablero']), TAMANO_MAXIMO)
+        self.assertIsNone(await self.servidor.procesar(b'{"method":"state","params":{"session":"x"}}'))
+        self.assertEqual((await self.servidor.procesar(b'{no json'))['error']['code'], -32700)
+
+    async def test_guardado_por_lotes(self):
+        sesion = (await self.cliente.llamar('new_game'))['session']
+        ruta = os.path.join(self.servidor.directorio, f"{sesion}.json")
+        self.assertFalse(os.path.exists(ruta))
+        self.assertEqual(await self.servidor.guardar_lote(), 1)
+        self.assertTrue(os.path.exists(ruta))
+        self.assertEqual(await self.servidor.guardar_lote(), 0)
+
+        # Se recupera desde disco si no está en memoria
+        estado = (await self.cliente.llamar('state', session=sesion))['state']
+        del self.servidor.sesiones[sesion]
+        self.assertEqual((await self.cliente.llamar('state', session=sesion))['state'], estado)
+
+    async def test_generador_de_carga(self):
+        r = await generar_carga(5, 20, "127.0.0.1", self.puerto)
+        self.assertEqual(r['peticiones'], 100)
+        self.assertGreater(r['rps'], 0)
+        self.assertLessEqual(r['p50_ms'], r['p99_ms'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import types
+import unittest
+
+from game_logic import Logica2048
+from lifetime_stats import EstadisticasVida
+from storage import AlmacenJuego
+
+try:
+    import game_ui
+except ImportError: # Sin wxPython
+    game_ui = None
+
+
+@unittest.skipIf(game_ui is None, "wxPython no instalado")
+class TestReiniciarPartida(unittest.TestCase):
+    """VentanaJuego.reiniciar_partida sobre una ventana de mentira (sin crear widgets)."""
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.almacen = AlmacenJuego(os.path.join(self.dir.name, "datos.db"))
+        juego = Logica2048(4, almacen=self.almacen, perfil="Ana")
+        juego.guardar_juego_estado()
+        self.estadisticas = EstadisticasVida()
+        self.estadisticas.registrar_movimiento()
+        self.nuevas = []
+        self.ventana = types.SimpleNamespace(
+            juego=juego, estadisticas=self.estadisticas, desafio=None,
+            sounds=types.SimpleNamespace(play=lambda sonido: None),
+            nueva_partida=self.nuevas.append, anunciar=lambda texto: None)
+
+    def tearDown(self):
+        self.almacen.cerrar()
+        self.dir.cleanup()
+
+    def test_cancelar_no_toca_nada(self):
+        self.ventana.pedir_tamano = lambda: None
+        guardada = self.almacen.cargar_partida("Ana")
+        antes = self.estadisticas.to_dict()
+        self.assertFalse(game_ui.VentanaJuego.reiniciar_partida(self.ventana))
+        self.assertEqual(self.almacen.cargar_partida("Ana"), guardada)
+        self.assertEqual(self.estadisticas.to_dict(), antes)
+        self.assertEqual(self.nuevas, [])
+
+    def test_confirmar_reinicia(self):
+        self.ventana.pedir_tamano = lambda: 5
+        self.assertTrue(game_ui.VentanaJuego.reiniciar_partida(self.ventana))
+        self.assertIsNone(self.almacen.cargar_partida("Ana"))
+        self.assertEqual(self.estadisticas.abandonadas, 1)
+        self.assertEqual(self.nuevas, [5])
+
+
+if __name__ == '__main__':
+    unittest.main()
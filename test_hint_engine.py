@@ -0,0 +1,81 @@
+import threading
+import unittest
+
+from evaluator import EvaluadorTablas
+from hint_engine import (PrecalculadorSugerencias, buscar, evaluar_basico, valorar_movimientos,
+                         Cancelado)
+
+
+class TestHintEngine(unittest.TestCase):
+    def test_fusion_evidente(self):
+        tablero = [[2, 2, 0, 0] for _ in range(4)]
+        res = buscar(tablero, 2)
+        self.assertIn(res.direccion, ('IZQUIERDA', 'DERECHA'))
+        self.assertEqual(res.profundidad, 2)
+        self.assertTrue(res.completa)
+
+    def test_no_elige_la_jugada_que_pierde(self):
+        # ARRIBA deja el tablero lleno sin fusiones sea cual sea la ficha nueva
+        tablero = [[64, 256, 2, 8], [0, 32, 64, 16], [128, 128, 8, 256], [32, 64, 16, 32]]
+        for evaluar in (EvaluadorTablas(4), evaluar_basico):
+            valores = valorar_movimientos(tablero, 2, evaluar)
+            self.assertLess(valores['ARRIBA'], min(v for d, v in valores.items() if d != 'ARRIBA'))
+            self.assertNotEqual(buscar(tablero, 2, evaluar).direccion, 'ARRIBA')
+
+    def test_sin_movimientos(self):
+        tablero = [[2, 4, 2, 4], [4, 2, 4, 2], [2, 4, 2, 4], [4, 2, 4, 2]]
+        self.assertEqual(buscar(tablero, 3).direccion, "Ninguna")
+
+    def test_cancelacion(self):
+        tablero = [[2, 0, 0, 0], [0, 4, 0, 0], [0, 0, 8, 0], [0, 0, 0, 16]]
+        with self.assertRaises(Cancelado):
+            buscar(tablero, 3, cancelado=lambda: True)
+
+    def test_precalculo_en_cache(self):
+        tablero = [[2, 2, 0, 0], [0, 0, 0, 0], [0, 4, 0, 0], [0, 0, 0, 0]]
+        pre = PrecalculadorSugerencias(profundidad_max=2)
+        pre.solicitar(tablero)
+        pre.esperar(5)
+        res = pre.consultar(tablero)
+        self.assertIsNotNone(res)
+        self.assertTrue(res.completa)
+        self.assertIsNone(pre.consultar([[0] * 4 for _ in range(4)]))
+
+    def test_precalculo_en_proceso(self):
+        tablero = [[2, 2, 0, 0], [0, 0, 0, 0], [0, 4, 0, 0], [0, 0, 0, 0]]
+        pre = PrecalculadorSugerencias(profundidad_max=2, en_proceso=True)
+        try:
+            pre.solicitar(tablero)
+            pre.esperar(30)
+            self.assertEqual(pre.consultar(tablero), buscar(tablero, 2))
+            # Cambiar de evaluador lo envía de nuevo al proceso
+            pre.evaluar = EvaluadorTablas(4, precalcular=False)
+            otro = [[4, 2, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 2]]
+            pre.solicitar(otro)
+            pre.esperar(30)
+            self.assertEqual(pre.consultar(otro), buscar(otro, 2, EvaluadorTablas(4, precalcular=False)))
+        finally:
+            pre.detener()
+
+    def test_nueva_solicitud_cancela_la_anterior(self):
+        bloqueo = threading.Event()
+        liberar = threading.Event()
+
+        def evaluar_lento(tablero):
+            bloqueo.set()
+            liberar.wait(5)
+            return 0.0
+
+        pre = PrecalculadorSugerencias(profundidad_max=3, evaluar=evaluar_lento)
+        primero = [[2, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 2]]
+        pre.solicitar(primero)
+        bloqueo.wait(5)
+        pre.solicitar([[4, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 4]])
+        liberar.set()
+        pre.esperar(5)
+        res = pre.consultar(primero)
+        # The first search never completes once superseded
+        self.assertTrue(res is None or not res.completa)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+
+from lifetime_stats import TRAMOS_MOVIMIENTOS, EstadisticasVida
+from storage import AlmacenJuego
+
+
+class TestEstadisticasVida(unittest.TestCase):
+    def test_contadores_y_resumen(self):
+        est = EstadisticasVida()
+        self.assertIn("ninguna partida", est.resumen())
+        for _ in range(60):
+            est.registrar_movimiento()
+        est.registrar_deshacer()
+        est.registrar_fin(1000, 128)
+        est.registrar_movimiento(10)
+        est.registrar_fin(3000, 256)
+        self.assertEqual(est.partidas, 2)
+        self.assertEqual(est.movimientos, 70)
+        self.assertEqual(est.media_puntos, 2000)
+        self.assertEqual(est.media_movimientos, 35)
+        self.assertEqual(est.partidas_con_ficha(128), 2)
+        self.assertEqual(est.partidas_con_ficha(256), 1)
+        self.assertEqual(est.tramos_movimientos[0], 1) # 10 movimientos
+        self.assertEqual(est.tramos_movimientos[1], 1) # 60 movimientos
+        resumen = est.resumen()
+        self.assertIn("2 partidas", resumen)
+        self.assertIn("256 en el 50%", resumen)
+        self.assertIn("1 deshacer", resumen)
+
+    def test_abandono_no_cuenta_en_medias(self):
+        est = EstadisticasVida()
+        est.registrar_movimiento(5)
+        est.registrar_abandono()
+        est.registrar_abandono() # Sin movimientos: no es un abandono
+        self.assertEqual((est.partidas, est.abandonadas, est.movimientos_partida), (0, 1, 0))
+        self.assertEqual(len(est.tramos_movimientos), len(TRAMOS_MOVIMIENTOS) + 1)
+
+    def test_volcado_por_lotes(self):
+        volcados = []
+        est = EstadisticasVida(lambda *cambios: volcados.append(cambios), lote=10)
+        for _ in range(9):
+            est.registrar_movimiento()
+        self.assertEqual(volcados, [])
+        est.registrar_movimiento()
+        self.assertEqual(len(volcados), 1)
+        est.registrar_fin(100, 16) # El fin de partida vuelca siempre
+        self.assertEqual(len(volcados), 2)
+        est.vaciar() # Nada pendiente: no escribe
+        self.assertEqual(len(volcados), 2)
+        # Cada volcado lleva solo lo que cambió desde el anterior
+        sumas, maximos, fijos = volcados[1]
+        self.assertEqual(sumas, {'partidas': 1, 'suma_puntos': 100, 'suma_movimientos': 10,
+                                 'fichas_max:16': 1, 'tramos_movimientos:0': 1})
+        self.assertEqual((maximos, fijos), ({'mejor_puntuacion': 100}, {'movimientos_partida': 0}))
+
+    def test_persistencia(self):
+        with tempfile.TemporaryDirectory() as d:
+            almacen = AlmacenJuego(os.path.join(d, "datos.db"))
+            try:
+                est = EstadisticasVida(lambda *cambios: almacen.guardar_estadisticas("Ana", *cambios))
+                est.registrar_movimiento(3)
+                est.registrar_fin(500, 64)
+                self.assertIsNone(almacen.cargar_estadisticas("Luis"))
+                otra = EstadisticasVida()
+                self.assertTrue(otra.from_dict(almacen.cargar_estadisticas("Ana")))
+                self.assertEqual(otra.to_dict(), est.to_dict())
+                self.assertEqual(otra.partidas_con_ficha(64), 1)
+            finally:
+                almacen.cerrar()
+
+    def test_dos_instancias_no_se_pisan(self):
+        with tempfile.TemporaryDirectory() as d:
+            ruta = os.path.join(d, "datos.db")
+            almacenes = [AlmacenJuego(ruta), AlmacenJuego(ruta)]
+            try:
+                instancias = []
+                for almacen in almacenes:
+                    est = EstadisticasVida(lambda *cambios, a=almacen: a.guardar_estadisticas("Ana", *cambios))
+                    est.from_dict(almacen.cargar_estadisticas("Ana"))
+                    instancias.append(est)
+                a, b = instancias
+                a.registrar_movimiento(3)
+                a.registrar_fin(500, 64)
+                b.registrar_movimiento(7)
+                b.registrar_fin(300, 128)
+                a.registrar_deshacer()
+                a.vaciar()
+                total = EstadisticasVida()
+                self.assertTrue(total.from_dict(almacenes[0].cargar_estadisticas("Ana")))
+                self.assertEqual((total.partidas, total.movimientos, total.deshacer), (2, 10, 1))
+                self.assertEqual((total.suma_puntos, total.mejor_puntuacion), (800, 500))
+                self.assertEqual(total.fichas_max, {64: 1, 128: 1})
+            finally:
+                for almacen in almacenes:
+                    almacen.cerrar()
+
+    def test_datos_invalidos(self):
+        est = EstadisticasVida()
+        self.assertFalse(est.from_dict(None))
+        self.assertFalse(est.from_dict({'partidas': 'muchas'}))
+        self.assertFalse(est.from_dict({'tramos_movimientos:99': 1}))
+        self.assertEqual(est.partidas, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import log_analyzer
+
+LEGACY = """2025-03-01 10:00:00,000 - INFO - --- LOG START ---
+2025-03-01 10:00:00,010 - INFO - Log de eventos activo en: game_events.log
+2025-03-01 10:00:01,000 - INFO - [INPUT] Tecla: 317, Shift: True, Ctrl: False
+2025-03-01 10:00:02,000 - INFO - [ANNOUNCE] 4 se fusionó en A1
+2025-03-01 10:00:05,000 - INFO - [INPUT] Tecla: 72, Shift: False, Ctrl: False
+"""
+
+
+def linea_json(ts, cat, msg):
+    return json.dumps({'ts': ts, 'lvl': 'INFO', 'cat': cat, 'msg': msg}) + "\n"
+
+
+class TestLogAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.dir.name, "game_events.log")
+        with open(self.ruta, 'w', encoding='utf-8') as f:
+            f.write(LEGACY)
+            f.write(linea_json(2000.0, "LOG_START", "--- LOG START ---"))
+            for i in range(50):
+                f.write(linea_json(2001.0 + i, "INPUT", "Tecla: 314, Shift: True, Ctrl: False"))
+            f.write(linea_json(2100.0, "ANNOUNCE", "Juego guardado"))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_sesiones_mixtas(self):
+        indice = log_analyzer.construir_indice(self.ruta, procesos=1)
+        sesiones = indice['sesiones']
+        self.assertEqual(len(sesiones), 2)
+        self.assertEqual(sesiones[0]['teclas'], {"Shift+ABAJO": 1, "H": 1})
+        self.assertEqual(sesiones[1]['teclas'], {"Shift+IZQUIERDA": 50})
+        resumen = log_analyzer.resumen_sesion(1, sesiones[1])
+        self.assertEqual(resumen['duracion_s'], 100.0)
+        self.assertEqual(resumen['movimientos'], 50)
+        self.assertEqual(resumen['anuncios'], 1)
+
+    def test_paralelo_equivale_a_secuencial(self):
+        secuencial = log_analyzer.analizar_rango(self.ruta, 0, os.path.getsize(self.ruta), procesos=1)
+        with mock.patch.object(log_analyzer, 'MIN_BYTES_PARALELO', 0):
+            paralelo = log_analyzer.analizar_rango(self.ruta, 0, os.path.getsize(self.ruta), procesos=3)
+        self.assertEqual(paralelo, secuencial)
+
+    def test_indice_incremental_y_extraccion(self):
+        log_analyzer.construir_indice(self.ruta, procesos=1)
+        with open(self.ruta, 'a', encoding='utf-8') as f:
+            f.write(linea_json(2200.0, "ANNOUNCE", "Historial vacío"))
+        indice = log_analyzer.construir_indice(self.ruta, procesos=1)
+        self.assertEqual(len(indice['sesiones']), 2)
+        self.assertEqual(indice['sesiones'][1]['categorias']['ANNOUNCE'], 2)
+
+        mensajes = [m for _, _, m in log_analyzer.extraer_categoria(self.ruta, indice, "ANNOUNCE")]
+        self.assertEqual(mensajes, ["4 se fusionó en A1", "Juego guardado", "Historial vacío"])
+
+    def test_categoria_escasa_salta_lo_demas(self):
+        with open(self.ruta, 'a', encoding='utf-8') as f:
+            for i in range(200):
+                f.write(linea_json(2200.0 + i, "MOVE", "Movimiento ABAJO"))
+            f.write(linea_json(2500.0, "ANNOUNCE", "Desafío superado"))
+        with mock.patch.object(log_analyzer, 'BYTES_BLOQUE', 1024):
+            indice = log_analyzer.construir_indice(self.ruta, procesos=1)
+        rangos = indice['sesiones'][1]['rangos']['ANNOUNCE']
+        self.assertEqual(len(rangos), 2)
+        self.assertLess(sum(fin - ini for ini, fin in rangos), 400)
+        mensajes = [m for _, _, m in log_analyzer.extraer_categoria(self.ruta, indice, "ANNOUNCE", 1)]
+        self.assertEqual(mensajes, ["Juego guardado", "Desafío superado"])
+
+    def test_log_rotado_se_reindexa(self):
+        indice = log_analyzer.construir_indice(self.ruta, procesos=1)
+        tamano = indice['tamano']
+        # Rotación: el archivo nuevo acaba superando el tamaño que tenía el indexado
+        os.remove(self.ruta)
+        with open(self.ruta, 'w', encoding='utf-8') as f:
+            f.write(linea_json(3000.0, "LOG_START", "--- LOG START ---"))
+            while f.tell() <= tamano:
+                f.write(linea_json(3001.0, "INPUT", "Tecla: 315, Shift: True, Ctrl: False"))
+        indice = log_analyzer.construir_indice(self.ruta, procesos=1)
+        self.assertEqual(len(indice['sesiones']), 1)
+        self.assertEqual(list(indice['sesiones'][0]['teclas']), ["Shift+ARRIBA"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import move_analyzer
+from hint_engine import valorar_movimientos
+from move_analyzer import AnalisisJugada, analizar, escribir, jugadas_costosas, resumen
+from opening_book import LibroAperturas
+from test_replay import partida_grabada
+
+
+class TestAnalizadorJugadas(unittest.TestCase):
+    def setUp(self):
+        self.grabacion, self.estados = partida_grabada(30)
+
+    def test_un_resultado_por_movimiento_en_orden(self):
+        analisis = list(analizar(self.grabacion, profundidad=1))
+        self.assertEqual([a.movimiento for a in analisis], list(range(1, len(self.grabacion) + 1)))
+        for a in analisis:
+            self.assertGreaterEqual(a.perdida, 0.0)
+            self.assertGreaterEqual(a.valor_mejor, a.valor_jugada)
+
+    def test_coincide_con_la_busqueda_sin_simetrias(self):
+        analisis = list(analizar(self.grabacion, profundidad=1))
+        evaluador = move_analyzer._evaluador_proceso
+        for a, (tablero, _) in zip(analisis, self.estados):
+            valores = valorar_movimientos(tablero, 1, evaluador)
+            self.assertAlmostEqual(valores[a.mejor], max(valores.values()))
+            self.assertAlmostEqual(valores[a.jugada], a.valor_jugada)
+
+    def test_pool_da_lo_mismo(self):
+        secuencial = list(analizar(self.grabacion, profundidad=1))
+        with ThreadPoolExecutor(2) as ejecutor:
+            paralelo = list(analizar(self.grabacion, profundidad=1, ejecutor=ejecutor))
+        self.assertEqual(secuencial, paralelo)
+
+    def test_cerrar_cancela_lotes_pendientes(self):
+        grabacion, _ = partida_grabada(120)
+        futuros = []
+
+        class EjecutorAnotado(ThreadPoolExecutor):
+            def submit(self, *args, **kwargs):
+                futuro = super().submit(*args, **kwargs)
+                futuros.append(futuro)
+                return futuro
+
+        with EjecutorAnotado(1) as ejecutor:
+            analisis = analizar(grabacion, profundidad=2, ejecutor=ejecutor)
+            next(analisis)
+            analisis.close()
+            self.assertGreater(len(futuros), 2)
+            self.assertTrue(futuros[-1].cancelled())
+
+    def test_libro_como_cache(self):
+        with tempfile.TemporaryDirectory() as d:
+            libro = LibroAperturas(os.path.join(d, "libro.bin"))
+            primero = list(analizar(self.grabacion, 1, libro=libro))
+            segundo = list(analizar(self.grabacion, 1, libro=libro))
+            libro.cerrar()
+        for a, b in zip(primero, segundo):
+            if a.jugada == a.mejor:
+                self.assertEqual(b.mejor, b.jugada)
+                self.assertEqual(b.perdida, 0.0)
+            else:
+                self.assertEqual(a, b)
+
+    def test_resumen(self):
+        analisis = [
+            AnalisisJugada(1, 'ARRIBA', 'ARRIBA', 10.0, 10.0, 0.0, False),
+            AnalisisJugada(2, 'ABAJO', 'IZQUIERDA', 5.0, 10.0, 5.0, True),
+            AnalisisJugada(3, 'ABAJO', 'DERECHA', 2.0, 10.0, 8.0, True),
+        ]
+        self.assertIn("2 jugadas costosas, la peor en el movimiento 3", resumen(analisis))
+        self.assertIn("33%", resumen(analisis))
+        self.assertEqual([a.movimiento for a in jugadas_costosas(analisis, maximo=1)], [3])
+        self.assertIn("Ninguna", resumen(analisis[:1]))
+        self.assertEqual(resumen([]), "No hay movimientos que analizar")
+
+    def test_escribir_csv_y_json(self):
+        analisis = list(analizar(self.grabacion, profundidad=1))
+        with tempfile.TemporaryDirectory() as d:
+            ruta_csv = os.path.join(d, "a.csv")
+            ruta_json = os.path.join(d, "a.jsonl")
+            escribir(iter(analisis), ruta_csv)
+            escribir(iter(analisis), ruta_json)
+            with open(ruta_csv, encoding='utf-8', newline='') as f:
+                filas = list(csv.DictReader(f))
+            with open(ruta_json, encoding='utf-8') as f:
+                lineas = [json.loads(l) for l in f]
+        self.assertEqual(len(filas), len(analisis))
+        self.assertEqual(int(filas[-1]['movimiento']), analisis[-1].movimiento)
+        self.assertEqual(lineas[0], analisis[0]._asdict())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import pickle
+import random
+import tempfile
+import unittest
+
+from game_logic import simetrias, tablero_canonico
+from ntuple import RedNTuplas, cargar_red, entrenar, jugar
+
+
+class TestRedNTuplas(unittest.TestCase):
+    TABLERO = [[2, 4, 0, 0], [0, 8, 0, 2], [16, 0, 0, 0], [0, 0, 4, 2]]
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.dir.name, "red.bin")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_simetrias(self):
+        sims = simetrias(self.TABLERO)
+        self.assertEqual(len(sims), 8)
+        self.assertEqual(sims[0], self.TABLERO)
+        self.assertEqual(len({tablero_canonico(t) for t in sims}), 1)
+
+    def test_valor_invariante_por_simetria(self):
+        red = RedNTuplas()
+        random.seed(0)
+        for i in range(red.num_pesos):
+            red.pesos[i] = random.random()
+        valor = red.evaluar(self.TABLERO)
+        for t in simetrias(self.TABLERO):
+            self.assertAlmostEqual(red.evaluar(t), valor, places=3)
+
+    def test_actualizar(self):
+        red = RedNTuplas()
+        red.actualizar(self.TABLERO, 3.2)
+        # Algunas instancias pueden compartir peso, así que el valor sube al menos delta
+        self.assertGreaterEqual(red.evaluar(self.TABLERO), 3.2 - 1e-4)
+        self.assertEqual(red.evaluar([[0] * 4 for _ in range(4)]), 0.0)
+
+    def test_guardar_y_proyectar(self):
+        red = RedNTuplas()
+        entrenar(red, 3, semilla=1)
+        red.guardar(self.ruta)
+        leida = RedNTuplas.cargar(self.ruta)
+        try:
+            self.assertEqual(leida.tuplas, red.tuplas)
+            self.assertAlmostEqual(leida.evaluar(self.TABLERO), red.evaluar(self.TABLERO), places=3)
+            with self.assertRaises(TypeError):
+                leida.pesos[0] = 1.0 # Solo lectura
+        finally:
+            leida.cerrar()
+        self.assertIsNone(cargar_red(self.ruta, tamano=5))
+
+    def test_se_envia_a_otro_proceso(self):
+        red = RedNTuplas()
+        entrenar(red, 3, semilla=2)
+        copia = pickle.loads(pickle.dumps(red))
+        self.assertEqual(copia.firma, red.firma)
+        red.guardar(self.ruta)
+        leida = RedNTuplas.cargar(self.ruta)
+        proyectada = pickle.loads(pickle.dumps(leida))
+        try:
+            # Se vuelve a proyectar el archivo en lugar de copiar los pesos
+            self.assertIsNotNone(proyectada._mmap)
+            self.assertEqual(proyectada.firma, leida.firma)
+            self.assertEqual(proyectada.evaluar(self.TABLERO), leida.evaluar(self.TABLERO))
+        finally:
+            proyectada.cerrar()
+            leida.cerrar()
+
+    def test_aprende(self):
+        red = RedNTuplas()
+        entrenar(red, 5, semilla=2)
+        self.assertNotEqual(red.evaluar(self.TABLERO), 0.0)
+        puntos, max_ficha = jugar(red, random.Random(3))
+        self.assertGreater(puntos, 0)
+        self.assertGreaterEqual(max_ficha, 8)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+
+from game_logic import DIRECCIONES, desplazar_tablero, simetrias
+from hint_engine import PrecalculadorSugerencias
+from evaluator import EvaluadorTablas
+from hint_engine import firma_evaluador
+from opening_book import LibroAperturas, llenar
+
+
+class TestLibroAperturas(unittest.TestCase):
+    TABLERO = [[2, 4, 0, 0], [0, 8, 0, 2], [0, 0, 0, 0], [0, 0, 4, 2]]
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.dir.name, "libro.bin")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_simetrias_comparten_entrada(self):
+        libro = LibroAperturas(self.ruta)
+        self.assertTrue(libro.registrar(self.TABLERO, 'IZQUIERDA', 12.5, 3))
+        esperado = desplazar_tablero(self.TABLERO, 'IZQUIERDA')[0]
+        for k, t in enumerate(simetrias(self.TABLERO)):
+            jugada = libro.consultar(t)
+            self.assertIsNotNone(jugada)
+            # La jugada traducida produce la misma posición transformada
+            self.assertEqual(desplazar_tablero(t, jugada.direccion)[0], simetrias(esperado)[k])
+        self.assertEqual(len(libro), 1)
+        libro.cerrar()
+
+    def test_persistencia_y_profundidad(self):
+        libro = LibroAperturas(self.ruta)
+        libro.registrar(self.TABLERO, 'IZQUIERDA', 1.0, 3)
+        self.assertFalse(libro.registrar(self.TABLERO, 'DERECHA', 2.0, 2))
+        self.assertTrue(libro.registrar(self.TABLERO, 'ABAJO', 3.0, 4))
+        libro.cerrar()
+        with open(self.ruta, 'ab') as f:
+            f.write(b'\x04\x01') # Registro a medias
+        leido = LibroAperturas(self.ruta)
+        jugada = leido.consultar(self.TABLERO)
+        self.assertEqual((jugada.direccion, jugada.profundidad), ('ABAJO', 4))
+        leido.registrar([[2, 0, 0, 0]] + [[0] * 4] * 3, 'DERECHA', 0.0, 3)
+        leido.cerrar()
+        self.assertEqual(len(LibroAperturas(self.ruta)), 2)
+
+    def test_evaluadores_no_comparten_entradas(self):
+        tablas = firma_evaluador(EvaluadorTablas(4, precalcular=False))
+        libro = LibroAperturas(self.ruta)
+        libro.registrar(self.TABLERO, 'IZQUIERDA', -700000.0, 3, tablas)
+        self.assertIsNone(libro.consultar(self.TABLERO))
+        self.assertTrue(libro.registrar(self.TABLERO, 'ARRIBA', 40.0, 3))
+        self.assertEqual(libro.consultar(self.TABLERO, tablas).direccion, 'IZQUIERDA')
+        self.assertEqual(libro.consultar(self.TABLERO).direccion, 'ARRIBA')
+        otros = firma_evaluador(EvaluadorTablas(4, {'monotonicidad': 1.0}, precalcular=False))
+        self.assertNotEqual(otros, tablas)
+        self.assertIsNone(libro.consultar(self.TABLERO, otros))
+        libro.cerrar()
+
+    def test_libro_antiguo_se_descarta(self):
+        with open(self.ruta, 'wb') as f:
+            f.write(b'OBK1' + bytes(40))
+        libro = LibroAperturas(self.ruta)
+        self.assertEqual(len(libro), 0)
+        libro.registrar(self.TABLERO, 'IZQUIERDA', 1.0, 3)
+        libro.cerrar()
+        self.assertEqual(len(LibroAperturas(self.ruta)), 1)
+
+    def test_carga_en_segundo_plano_e_indice_grande(self):
+        libro = LibroAperturas(self.ruta)
+        tableros = []
+        for i in range(3000):
+            tablero = [[0] * 4 for _ in range(4)]
+            for k in range(12):
+                if i >> k & 1:
+                    tablero[k // 4][k % 4] = 2 << (k % 3)
+            tablero[3][3] = 2048
+            tableros.append(tablero)
+            libro.registrar(tablero, 'IZQUIERDA', float(i), 2)
+        total = len(libro)
+        libro.cerrar()
+        leido = LibroAperturas(self.ruta, en_segundo_plano=True)
+        self.assertTrue(leido.esperar_carga(10))
+        self.assertEqual(len(leido), total)
+        for tablero in tableros[::97]:
+            self.assertEqual(leido.consultar(tablero).profundidad, 2)
+        leido.cerrar()
+
+    def test_expulsion(self):
+        libro = LibroAperturas(self.ruta, max_bytes=400)
+        llenar(libro, partidas=2, profundidad=1, jugadas=20, semilla=4)
+        libro.consultar(self.TABLERO)
+        libro.cerrar()
+        self.assertLessEqual(os.path.getsize(self.ruta), 400)
+        self.assertGreater(len(LibroAperturas(self.ruta)), 0)
+
+    def test_precalculador_usa_libro(self):
+        libro = LibroAperturas(self.ruta)
+        pre = PrecalculadorSugerencias(profundidad_max=2, libro=libro)
+        pre.solicitar(self.TABLERO)
+        pre.esperar(10)
+        buscado = pre.consultar(self.TABLERO)
+        self.assertIn(buscado.direccion, DIRECCIONES)
+        self.assertEqual(libro.consultar(self.TABLERO).direccion, buscado.direccion)
+
+        # Otra sesión: la simetría reflejada sale del libro sin lanzar búsqueda
+        reflejo = simetrias(self.TABLERO)[1]
+        otro = PrecalculadorSugerencias(profundidad_max=2, libro=libro)
+        otro.solicitar(reflejo)
+        self.assertIsNone(otro._hilo)
+        self.assertTrue(otro.consultar(reflejo).completa)
+        libro.cerrar()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import random
+import tempfile
+import unittest
+
+from game_logic import Logica2048, tablero_canonico
+from puzzle_generator import (ALCANZAR, NIVELES, SOBREVIVIR, Desafio, PaqueteDesafios,
+                              escribir_paquete, generar)
+
+
+class TestGeneradorDesafios(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.desafios = generar([1, 2], intentos=2)
+
+    def test_genera_y_gradua(self):
+        self.assertTrue(self.desafios)
+        for d in self.desafios:
+            self.assertIn(d.tipo, (ALCANZAR, SOBREVIVIR))
+            self.assertTrue(0.0 <= d.dificultad < 1.0)
+            self.assertIn(d.nivel, NIVELES)
+            if d.tipo == ALCANZAR:
+                self.assertEqual(d.objetivo, 2 * d.max_ficha)
+
+    def test_sin_posiciones_simetricas_repetidas(self):
+        claves = [(d.tipo, tablero_canonico(d.tablero)) for d in self.desafios]
+        self.assertEqual(len(claves), len(set(claves)))
+
+    def test_determinista(self):
+        self.assertEqual(generar([1], intentos=2), generar([1], intentos=2))
+
+    def test_se_carga_en_la_logica(self):
+        d = self.desafios[0]
+        juego = Logica2048(tamano=4)
+        self.assertTrue(juego.from_dict(d.partida()))
+        self.assertEqual(juego.tablero, d.tablero)
+        self.assertEqual(juego.max_ficha, d.max_ficha)
+        self.assertTrue(juego.sin_records)
+
+    def test_resultado(self):
+        tablero = [[0] * 4 for _ in range(4)]
+        alcanzar = Desafio(ALCANZAR, 256, 50, 0.5, tablero, 0, 128)
+        self.assertIsNone(alcanzar.resultado(10, 128, False))
+        self.assertTrue(alcanzar.resultado(10, 256, False))
+        self.assertFalse(alcanzar.resultado(50, 128, False))
+        sobrevivir = Desafio(SOBREVIVIR, 0, 20, 0.5, tablero, 0, 128)
+        self.assertFalse(sobrevivir.resultado(5, 128, True))
+        self.assertTrue(sobrevivir.resultado(20, 128, False))
+
+
+class TestPaqueteDesafios(unittest.TestCase):
+    def test_ida_y_vuelta_por_nivel(self):
+        rng = random.Random(3)
+        desafios = []
+        for i in range(30):
+            tablero = [[rng.choice((0, 2, 4, 8, 64)) for _ in range(4)] for _ in range(4)]
+            tipo = ALCANZAR if i % 2 else SOBREVIVIR
+            desafios.append(Desafio(tipo, 128 if tipo == ALCANZAR else 0, 50 if i % 2 else 20,
+                                    rng.choice((0.0, 0.5, 0.875)), tablero, 4 * i, 64))
+        with tempfile.TemporaryDirectory() as d:
+            ruta = os.path.join(d, "desafios.bin")
+            cuentas = escribir_paquete(ruta, desafios)
+            paquete = PaqueteDesafios(ruta)
+            try:
+                self.assertEqual(len(paquete), len(desafios))
+                self.assertEqual(sum(cuentas), len(desafios))
+                leidos = []
+                for nivel in NIVELES:
+                    for i in range(paquete.cantidades[nivel]):
+                        desafio = paquete.leer(i, nivel)
+                        self.assertEqual(desafio.nivel, nivel)
+                        leidos.append(desafio)
+                    self.assertEqual(paquete.aleatorio(nivel, rng).nivel, nivel)
+                self.assertEqual(sorted(leidos), sorted(desafios))
+                with self.assertRaises(IndexError):
+                    paquete.leer(len(desafios))
+            finally:
+                paquete.cerrar()
+
+    def test_archivo_que_no_es_paquete(self):
+        with tempfile.TemporaryDirectory() as d:
+            ruta = os.path.join(d, "otro.bin")
+            with open(ruta, 'wb') as f:
+                f.write(b"no es un paquete")
+            with self.assertRaises(ValueError):
+                PaqueteDesafios(ruta)
+
+
+if __name__ == "__main__":
+    unittest.main()
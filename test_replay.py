@@ -0,0 +1,66 @@
+import os
+import random
+import tempfile
+import unittest
+
+from game_logic import DIRECCIONES, desplazar_tablero
+from replay import GrabacionPartida, Repeticion
+
+
+def partida_grabada(movimientos, semilla=7):
+    """Juega al azar guardando cada estado para comparar con la repetición."""
+    rng = random.Random(semilla)
+    tablero = [[0] * 4 for _ in range(4)]
+    tablero[0][0] = 2
+    tablero[1][1] = 2
+    grabacion = GrabacionPartida(tablero, 0, 2)
+    estados = [([f[:] for f in tablero], 0)]
+    puntos = 0
+    while len(grabacion) < movimientos:
+        direccion = rng.choice(DIRECCIONES)
+        nuevo, pts, cambio = desplazar_tablero(tablero, direccion)
+        if not cambio:
+            if not any(desplazar_tablero(tablero, d)[2] for d in DIRECCIONES):
+                break
+            continue
+        libres = [(r, c) for r in range(4) for c in range(4) if nuevo[r][c] == 0]
+        r, c = rng.choice(libres)
+        nuevo[r][c] = 2
+        tablero = nuevo
+        puntos += pts
+        grabacion.registrar(direccion, (r, c, 2))
+        estados.append(([f[:] for f in tablero], puntos))
+    return grabacion, estados
+
+
+class TestReplay(unittest.TestCase):
+    def test_acceso_aleatorio(self):
+        grabacion, estados = partida_grabada(150)
+        repeticion = Repeticion(grabacion, intervalo=16)
+        for n in (0, 1, 15, 16, 17, 64, len(grabacion)):
+            estado = repeticion.estado(n)
+            self.assertEqual(estado.tablero, estados[n][0])
+            self.assertEqual(estado.puntuacion, estados[n][1])
+        self.assertEqual(repeticion.final.tablero, estados[-1][0])
+        with self.assertRaises(IndexError):
+            repeticion.estado(len(grabacion) + 1)
+
+    def test_estado_no_altera_fotogramas(self):
+        grabacion, _ = partida_grabada(40)
+        repeticion = Repeticion(grabacion, intervalo=8)
+        estado = repeticion.estado(8)
+        estado.tablero[0][0] = 99999
+        self.assertNotEqual(repeticion.estado(8).tablero[0][0], 99999)
+
+    def test_guardar_y_cargar(self):
+        grabacion, _ = partida_grabada(30)
+        grabacion.deshacer()
+        with tempfile.TemporaryDirectory() as d:
+            ruta = os.path.join(d, "replay.json")
+            grabacion.guardar(ruta)
+            cargada = GrabacionPartida.cargar(ruta)
+        self.assertEqual(cargada.movimientos, grabacion.movimientos)
+        self.assertEqual(Repeticion(cargada).final, Repeticion(grabacion).final)
+
+if __name__ == '__main__':
+    unittest.main()
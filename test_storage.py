@@ -0,0 +1,135 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from game_logic import Logica2048
+from storage import AlmacenJuego
+
+
+class TestAlmacenJuego(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.dir.name, "datos.db")
+        self.almacen = AlmacenJuego(self.ruta)
+
+    def tearDown(self):
+        self.almacen.cerrar()
+        self.dir.cleanup()
+
+    def test_wal_y_perfiles(self):
+        modo = self.almacen.con.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(modo, 'wal')
+        a = self.almacen.perfil("Ana")
+        self.assertEqual(self.almacen.perfil("Ana"), a)
+        self.assertNotEqual(self.almacen.perfil("Luis"), a)
+        self.assertEqual(self.almacen.perfiles(), ["Ana", "Luis"])
+
+    def test_partida_por_perfil(self):
+        ana = Logica2048(4, almacen=self.almacen, perfil="Ana")
+        luis = Logica2048(4, almacen=self.almacen, perfil="Luis")
+        ana.puntuacion = ana.high_score = 500
+        ana.guardar_juego_estado()
+        self.assertIsNone(self.almacen.cargar_partida("Luis"))
+        self.assertEqual(self.almacen.record("Ana", 4), (500, ana.max_ficha))
+
+        otra = Logica2048(4, almacen=self.almacen, perfil="Ana")
+        self.assertTrue(otra.cargar_juego())
+        self.assertEqual((otra.tablero, otra.puntuacion, otra.high_score), (ana.tablero, 500, 500))
+        self.assertFalse(luis.cargar_juego())
+        otra.borrar_partida_guardada()
+        self.assertFalse(Logica2048(4, almacen=self.almacen, perfil="Ana").cargar_juego())
+
+    def test_tamano_desde_partida(self):
+        juego = Logica2048(5, almacen=self.almacen)
+        juego.guardar_juego_estado()
+        cargado = Logica2048(almacen=self.almacen)
+        self.assertTrue(cargado.cargar_juego())
+        self.assertEqual(cargado.tamano, 5)
+
+    def test_ajustes_y_record(self):
+        juego = Logica2048(4, almacen=self.almacen, perfil="Ana")
+        juego.verbosidad = 2
+        juego.tablero_unico = True
+        juego.guardar_ajustes()
+        leido = Logica2048(4, almacen=self.almacen, perfil="Ana")
+        self.assertEqual((leido.verbosidad, leido.tablero_unico), (2, True))
+        self.almacen.registrar_record("Ana", 4, 300, 64)
+        self.almacen.registrar_record("Ana", 4, 100, 128)
+        self.assertEqual(self.almacen.record("Ana", 4), (300, 128))
+        self.assertEqual(Logica2048(4, almacen=self.almacen, perfil="Ana").high_score, 300)
+
+    def test_partida_de_desafio_sin_record(self):
+        juego = Logica2048(4, almacen=self.almacen, perfil="Ana")
+        tablero = [[2, 2, 0, 0], [4, 8, 16, 32], [0, 0, 0, 0], [0, 0, 0, 0]]
+        self.assertTrue(juego.from_dict({'tablero': tablero, 'puntuacion': 5000, 'max_ficha': 32,
+                                         'sin_records': True}))
+        self.assertTrue(juego.mover('IZQUIERDA'))
+        self.assertEqual(juego.high_score, 0)
+        self.assertEqual(self.almacen.record("Ana", 4), (0, 0))
+        # Sigue sin contar al retomar la partida guardada
+        retomada = Logica2048(4, almacen=self.almacen, perfil="Ana")
+        self.assertTrue(retomada.cargar_juego())
+        self.assertTrue(retomada.sin_records)
+        retomada.iniciar_juego()
+        self.assertFalse(retomada.sin_records)
+
+    def test_transaccion_revierte(self):
+        with self.assertRaises(RuntimeError):
+            with self.almacen.transaccion():
+                self.almacen.guardar_ajustes("Ana", {'verbosidad': 0})
+                raise RuntimeError()
+        self.assertEqual(self.almacen.cargar_ajustes("Ana"), {})
+
+    def test_lectura_durante_escritura(self):
+        self.almacen.guardar_ajustes("Ana", {'verbosidad': 1})
+        otra = AlmacenJuego(self.ruta, espera_bloqueo=0.1)
+        try:
+            with self.almacen.transaccion():
+                self.almacen.guardar_ajustes("Ana", {'verbosidad': 2})
+                # Otra instancia lee la última versión confirmada sin bloquearse
+                self.assertEqual(otra.cargar_ajustes("Ana"), {'verbosidad': 1})
+                with self.assertRaises(sqlite3.OperationalError):
+                    otra.guardar_ajustes("Ana", {'verbosidad': 0})
+            self.assertEqual(otra.cargar_ajustes("Ana"), {'verbosidad': 2})
+        finally:
+            otra.cerrar()
+
+    def test_migracion(self):
+        guardado = os.path.join(self.dir.name, "savegame.json")
+        ajustes = os.path.join(self.dir.name, "settings.json")
+        juego = Logica2048(4)
+        juego.high_score = 900
+        with open(guardado, 'w') as f:
+            json.dump(juego.to_dict(), f)
+        with open(ajustes, 'w') as f:
+            json.dump({'verbosidad': 0}, f)
+        self.assertTrue(self.almacen.migrar_json("Ana", guardado, ajustes))
+        self.assertFalse(os.path.exists(guardado))
+        self.assertTrue(os.path.exists(guardado + ".migrado"))
+        self.assertEqual(self.almacen.cargar_partida("Ana")['tablero'], juego.tablero)
+        self.assertEqual(self.almacen.cargar_ajustes("Ana"), {'verbosidad': 0})
+        self.assertEqual(self.almacen.record("Ana", 4)[0], 900)
+        self.assertFalse(self.almacen.migrar_json("Ana", guardado, ajustes))
+
+    def test_base_de_datos_anterior_a_las_estadisticas(self):
+        ruta = os.path.join(self.dir.name, "v1.db")
+        con = sqlite3.connect(ruta)
+        con.executescript("""
+            CREATE TABLE perfiles (id INTEGER PRIMARY KEY, nombre TEXT NOT NULL UNIQUE, creado REAL NOT NULL);
+            INSERT INTO perfiles VALUES (1, 'Ana', 0);
+            PRAGMA user_version = 1;
+        """)
+        con.close()
+        almacen = AlmacenJuego(ruta)
+        try:
+            self.assertIsNone(almacen.cargar_estadisticas("Ana"))
+            almacen.guardar_estadisticas("Ana", {'partidas': 1}, {'mejor_puntuacion': 900})
+            almacen.guardar_estadisticas("Ana", {'partidas': 2}, {'mejor_puntuacion': 400})
+            self.assertEqual(almacen.cargar_estadisticas("Ana"), {'partidas': 3, 'mejor_puntuacion': 900})
+        finally:
+            almacen.cerrar()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import random
+import unittest
+
+from game_logic import Logica2048
+from tile_index import IndiceFichas
+
+
+def _posiciones_esperadas(tablero):
+    esperado = {}
+    for r, fila in enumerate(tablero):
+        for c, v in enumerate(fila):
+            esperado.setdefault(v, []).append(r * len(tablero) + c)
+    return esperado
+
+
+class TestIndiceFichas(unittest.TestCase):
+    def setUp(self):
+        self.tablero = [
+            [2, 2, 0, 8],
+            [0, 4, 0, 8],
+            [16, 4, 2, 0],
+            [0, 0, 0, 16],
+        ]
+        self.indice = IndiceFichas(self.tablero)
+
+    def test_siguiente_da_la_vuelta(self):
+        self.assertEqual(self.indice.maximo(), 16)
+        self.assertEqual(self.indice.siguiente(16, (0, 0)), (2, 0))
+        self.assertEqual(self.indice.siguiente(16, (2, 0)), (3, 3))
+        self.assertEqual(self.indice.siguiente(16, (3, 3)), (2, 0))
+        self.assertEqual(self.indice.siguiente(16, (2, 0), atras=True), (3, 3))
+        self.assertEqual(self.indice.siguiente(0, (3, 3)), (0, 2))
+        self.assertIsNone(self.indice.siguiente(64, (0, 0)))
+        self.assertEqual(self.indice.cantidad(2), 3)
+
+    def test_pares(self):
+        self.assertEqual(self.indice.siguiente_par((0, 0)), ((0, 3), (1, 3)))
+        self.assertEqual(self.indice.siguiente_par((0, 3)), ((1, 1), (2, 1)))
+        self.assertEqual(self.indice.siguiente_par((1, 1)), ((0, 0), (0, 1)))
+        self.assertEqual(self.indice.siguiente_par((0, 0), atras=True), ((1, 1), (2, 1)))
+        # Celda con par horizontal y vertical: desde el horizontal se llega al vertical
+        indice = IndiceFichas([[2, 2], [2, 0]])
+        self.assertEqual(indice.siguiente_par((0, 0), orientacion=0), ((0, 0), (1, 0)))
+        self.assertEqual(indice.siguiente_par((0, 0)), ((0, 0), (0, 1)))
+
+    def test_colocar_actualiza_pares(self):
+        self.tablero[3][2] = 16
+        self.indice.colocar(3, 2, 16)
+        self.assertNotIn(14, self.indice.posiciones[0])
+        self.assertEqual(self.indice.siguiente(16, (3, 0)), (3, 2))
+        self.assertEqual(self.indice.siguiente_par((3, 0)), ((3, 2), (3, 3)))
+        self.assertEqual(self.indice.posiciones, _posiciones_esperadas(self.tablero))
+
+
+class TestIndiceEnLogica(unittest.TestCase):
+    def test_se_mantiene_al_dia(self):
+        random.seed(3)
+        juego = Logica2048(10)
+        juego.guardar_juego_estado = lambda: None
+        direcciones = ['IZQUIERDA', 'ARRIBA', 'DERECHA', 'ABAJO']
+        for i in range(200):
+            juego.mover(direcciones[i % 4], guardar=False)
+            if i % 7 == 0:
+                juego.deshacer()
+            indice = juego.indice
+            self.assertIs(indice.tablero, juego.tablero)
+            self.assertEqual(indice.posiciones, _posiciones_esperadas(juego.tablero))
+            self.assertEqual(indice.pares, IndiceFichas(juego.tablero).pares)
+
+    def test_tablero_asignado_desde_fuera(self):
+        juego = Logica2048(4)
+        juego.tablero = [[0, 0, 0, 0], [0, 64, 0, 0], [0, 0, 0, 0], [0, 0, 0, 2]]
+        self.assertEqual(juego.indice.maximo(), 64)
+        self.assertEqual(juego.indice.siguiente(64, (0, 0)), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
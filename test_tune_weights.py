@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+import unittest
+
+from evaluator import PESOS_DEFECTO, cargar_pesos_evaluador
+from game_logic import PESOS_SUGERENCIA_DEFECTO, cargar_pesos_sugerencia
+from tune_weights import RAPIDA, AjustadorPesos, aptitud, guardar_pesos, jugar_partida
+
+
+class TestAjustePesos(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_partida_determinista(self):
+        for pesos, heuristica in (({'fusiones': 500.0}, 'evaluador'), ({'libres': 5.0}, RAPIDA)):
+            a = jugar_partida(pesos, semilla=7, max_movimientos=60, heuristica=heuristica)
+            b = jugar_partida(pesos, semilla=7, max_movimientos=60, heuristica=heuristica)
+            self.assertEqual(a, b)
+            self.assertGreater(a[0], 0)
+
+    def test_aptitud(self):
+        self.assertEqual(aptitud([(100, 256), (300, 512)], 'puntuacion'), 200)
+        self.assertAlmostEqual(aptitud([(20000, 2048), (100, 256)], 'victoria'), 0.5, places=2)
+
+    def test_reanudar_checkpoint(self):
+        ruta = os.path.join(self.dir.name, "ckpt.json")
+        continuo = AjustadorPesos(semilla=1, poblacion=3, partidas=2, max_movimientos=40)
+        continuo.generacion_siguiente()
+        continuo.generacion_siguiente()
+
+        partido = AjustadorPesos(semilla=1, poblacion=3, partidas=2, max_movimientos=40)
+        partido.generacion_siguiente()
+        partido.guardar(ruta)
+        reanudado = AjustadorPesos.cargar(ruta)
+        reanudado.generacion_siguiente()
+
+        self.assertEqual(reanudado.generacion, 2)
+        self.assertEqual(reanudado.media, continuo.media)
+        self.assertEqual(reanudado.pesos_resultado(), continuo.pesos_resultado())
+        self.assertTrue(all(v > 0 for v in reanudado.pesos_resultado().values()))
+        # Por defecto se ajusta el evaluador de la búsqueda de sugerencias
+        self.assertEqual(set(reanudado.pesos_resultado()), set(PESOS_DEFECTO))
+
+    def test_cargar_pesos(self):
+        ruta = os.path.join(self.dir.name, "pesos.json")
+        self.assertEqual(cargar_pesos_sugerencia(ruta), PESOS_SUGERENCIA_DEFECTO)
+        with open(ruta, 'w') as f:
+            json.dump({'libres': 3.5, 'otro': 1}, f)
+        pesos = cargar_pesos_sugerencia(ruta)
+        self.assertEqual(pesos['libres'], 3.5)
+        self.assertEqual(pesos['esquina'], PESOS_SUGERENCIA_DEFECTO['esquina'])
+        self.assertNotIn('otro', pesos)
+
+    def test_pesos_del_evaluador_comparten_archivo(self):
+        ruta = os.path.join(self.dir.name, "pesos.json")
+        guardar_pesos(ruta, {'libres': 3.5})
+        guardar_pesos(ruta, {'fusiones': 900.0})
+        self.assertEqual(cargar_pesos_sugerencia(ruta)['libres'], 3.5)
+        pesos = cargar_pesos_evaluador(ruta)
+        self.assertEqual(pesos['fusiones'], 900.0)
+        self.assertEqual(pesos['vacias'], PESOS_DEFECTO['vacias'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import random
+import unittest
+
+import vector_env
+from compact_session import SesionCompacta
+from game_logic import DIRECCIONES
+from vector_env import EntornoVectorial, medir_pasos_por_segundo
+
+
+class TestEntornoVectorial(unittest.TestCase):
+    def test_equivale_a_sesion_compacta(self):
+        # La partida i con semilla s consume su generador igual que SesionCompacta el global
+        semillas = [11, 12, 13]
+        entorno = EntornoVectorial(3, auto_reiniciar=False)
+        obs = entorno.reset(seed=semillas)
+        sesiones = []
+        for s in semillas:
+            random.seed(s)
+            sesiones.append((SesionCompacta(4), random.getstate()))
+        rng = random.Random(0)
+        for _ in range(300):
+            acciones = [rng.randrange(4) for _ in semillas]
+            obs, recompensas, terminados, info = entorno.step(acciones)
+            for i, (sesion, estado_rng) in enumerate(sesiones):
+                if sesion.juego_terminado():
+                    self.assertTrue(terminados[i])
+                    continue
+                random.setstate(estado_rng)
+                antes = sesion.puntuacion
+                movio = sesion.mover(DIRECCIONES[acciones[i]])
+                sesiones[i] = (sesion, random.getstate())
+                self.assertEqual(bool(info['validos'][i]), movio)
+                self.assertEqual(recompensas[i], sesion.puntuacion - antes)
+                self.assertEqual(bytes(entorno.estado[i * 16:(i + 1) * 16]), bytes(sesion.celdas))
+                self.assertEqual(bool(terminados[i]), sesion.juego_terminado())
+
+    def test_vistas_sin_copia(self):
+        entorno = EntornoVectorial(2)
+        obs = entorno.reset(seed=3)
+        obs2, recompensas, terminados, _ = entorno.step([0, 1])
+        self.assertIs(obs2, obs)
+        entorno.estado[0] = 7
+        self.assertEqual(obs[0, 0, 0], 7)
+        self.assertEqual(len(recompensas), 2)
+
+    def test_semilla_reproduce_partidas(self):
+        a = EntornoVectorial(4)
+        b = EntornoVectorial(4)
+        a.reset(seed=5)
+        b.reset(seed=5)
+        self.assertEqual(a.estado, b.estado)
+        # La partida 2 no depende del tamaño del lote
+        c = EntornoVectorial(1)
+        c.reset(seed=["5-2"])
+        self.assertEqual(c.estado, a.estado[32:48])
+
+    def test_reinicio_automatico(self):
+        entorno = EntornoVectorial(1, tamano=2)
+        entorno.reset(seed=1)
+        terminadas = []
+        for paso in range(200):
+            _, _, terminados, info = entorno.step([paso % 4])
+            if terminados[0]:
+                terminadas.extend(info['reiniciadas'])
+                final = bytes(entorno.finales[:4])
+                self.assertNotIn(0, final)
+                self.assertEqual(sum(1 for e in entorno.estado[:4] if e), 2) # Partida nueva
+        self.assertTrue(terminadas)
+        self.assertTrue(all(puntos >= 0 and movs > 0 for _, puntos, movs in terminadas))
+
+    def test_sin_reinicio_se_detiene(self):
+        entorno = EntornoVectorial(1, tamano=2, auto_reiniciar=False)
+        entorno.reset(seed=1)
+        for paso in range(200):
+            _, recompensas, terminados, _ = entorno.step([paso % 4])
+            if terminados[0]:
+                estado = bytes(entorno.estado)
+                _, recompensas, _, info = entorno.step([0])
+                self.assertEqual((recompensas[0], info['validos'][0]), (0, 0))
+                self.assertEqual(bytes(entorno.estado), estado)
+                return
+        self.fail("La partida de 2x2 no terminó")
+
+    @unittest.skipIf(vector_env.np is None, "NumPy no instalado")
+    def test_vistas_numpy(self):
+        entorno = EntornoVectorial(3)
+        obs = entorno.reset(seed=0)
+        self.assertEqual(obs.shape, (3, 4, 4))
+        self.assertFalse(obs.flags.owndata)
+        _, recompensas, terminados, _ = entorno.step([0, 1, 2])
+        self.assertEqual(recompensas.dtype.name, 'int32')
+        self.assertEqual(terminados.dtype.name, 'bool')
+
+    def test_medir(self):
+        self.assertGreater(medir_pasos_por_segundo(4, 10), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
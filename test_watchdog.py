@@ -0,0 +1,64 @@
+import json
+import os
+import queue
+import tempfile
+import time
+import unittest
+
+from watchdog import VigilanteUI
+
+
+def bloqueo_simulado(segundos):
+    time.sleep(segundos)
+
+
+class TestVigilanteUI(unittest.TestCase):
+    """El hilo de la prueba hace de bucle de eventos: atiende la cola de latidos."""
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.dir.name, "bloqueos.log")
+        self.cola = queue.Queue()
+        self.vigilante = VigilanteUI(self.cola.put, self.ruta, umbral=0.03, latido=0.01, muestreo=0.002)
+
+    def tearDown(self):
+        self.vigilante.detener()
+        self.dir.cleanup()
+
+    def bucle(self, segundos, bloquear=None):
+        fin = time.perf_counter() + segundos
+        while time.perf_counter() < fin:
+            try:
+                tarea = self.cola.get(timeout=0.005)
+            except queue.Empty:
+                continue
+            tarea()
+            if bloquear:
+                bloquear()
+                bloquear = None
+
+    def test_sin_bloqueos(self):
+        self.vigilante.iniciar()
+        self.bucle(0.2)
+        self.assertEqual(self.vigilante.bloqueos, 0)
+        self.assertIn("Sin bloqueos", self.vigilante.resumen())
+        self.assertFalse(os.path.exists(self.ruta))
+
+    def test_detecta_y_muestrea_el_bloqueo(self):
+        self.vigilante.iniciar()
+        self.bucle(0.5, bloquear=lambda: bloqueo_simulado(0.2))
+        self.assertGreaterEqual(self.vigilante.bloqueos, 1)
+        peor = self.vigilante.peor
+        self.assertGreaterEqual(peor.duracion, 0.15)
+        self.assertGreater(peor.muestras, 0)
+        self.assertTrue(any("bloqueo_simulado" in marco for marco, _ in peor.propias))
+        self.assertTrue(any("bucle" in marco for marco, _ in peor.acumuladas))
+        self.assertIn("milisegundos", self.vigilante.resumen())
+
+        with open(self.ruta, encoding='utf-8') as f:
+            lineas = [json.loads(linea) for linea in f]
+        self.assertEqual(len(lineas), self.vigilante.bloqueos)
+        self.assertGreaterEqual(max(l['duracion_ms'] for l in lineas), 150)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Índice de posiciones por valor de ficha, para la navegación por saltos.
+
+Cada valor (0 = casilla libre) guarda la lista ordenada de sus celdas en
+orden de lectura (índice lineal r * tamaño + c), y aparte se guardan los
+pares fusionables (dos fichas iguales contiguas). Logica2048 lo reconstruye
+al aplicar un movimiento, que ya recorre el tablero entero, y lo actualiza
+en O(1) al aparecer una ficha nueva; las consultas son búsquedas binarias
+sobre esas listas y nunca recorren el tablero.
+"""
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Tuple
+
+Tablero = List[List[int]]
+Posicion = Tuple[int, int]
+
+# Un par fusionable se guarda como 2 * índice de su primera celda + orientación
+HORIZONTAL = 0
+VERTICAL = 1
+
+
+class IndiceFichas:
+    def __init__(self, tablero: Optional[Tablero] = None):
+        self.tablero: Optional[Tablero] = None # El tablero indexado (por identidad)
+        self.tamano = 0
+        self.posiciones: Dict[int, List[int]] = {}
+        self.pares: List[int] = []
+        if tablero is not None:
+            self.reconstruir(tablero)
+
+    def reconstruir(self, tablero: Tablero) -> None:
+        """Indexa el tablero completo en una sola pasada (ya salen ordenadas)."""
+        n = len(tablero)
+        posiciones: Dict[int, List[int]] = {}
+        pares: List[int] = []
+        for r in range(n):
+            fila = tablero[r]
+            debajo = tablero[r + 1] if r + 1 < n else None
+            for c in range(n):
+                v = fila[c]
+                i = r * n + c
+                lista = posiciones.get(v)
+                if lista is None:
+                    posiciones[v] = [i]
+                else:
+                    lista.append(i)
+                if v:
+                    if c + 1 < n and fila[c + 1] == v:
+                        pares.append(2 * i + HORIZONTAL)
+                    if debajo is not None and debajo[c] == v:
+                        pares.append(2 * i + VERTICAL)
+        self.tablero = tablero
+        self.tamano = n
+        self.posiciones = posiciones
+        self.pares = pares
+
+    def colocar(self, r: int, c: int, valor: int) -> None:
+        """Una ficha nueva en una casilla libre (solo mira las 4 vecinas)."""
+        n = self.tamano
+        i = r * n + c
+        libres = self.posiciones.get(0)
+        if libres:
+            j = bisect_left(libres, i)
+            if j < len(libres) and libres[j] == i:
+                del libres[j]
+            if not libres:
+                del self.posiciones[0]
+        insort(self.posiciones.setdefault(valor, []), i)
+        tablero = self.tablero
+        if tablero is None:
+            return
+        if c > 0 and tablero[r][c - 1] == valor:
+            insort(self.pares, 2 * (i - 1) + HORIZONTAL)
+        if c + 1 < n and tablero[r][c + 1] == valor:
+            insort(self.pares, 2 * i + HORIZONTAL)
+        if r > 0 and tablero[r - 1][c] == valor:
+            insort(self.pares, 2 * (i - n) + VERTICAL)
+        if r + 1 < n and tablero[r + 1][c] == valor:
+            insort(self.pares, 2 * i + VERTICAL)
+
+    # --- Consultas ---
+    def _posicion(self, i: int) -> Posicion:
+        return divmod(i, self.tamano)
+
+    @staticmethod
+    def _siguiente_en(lista: List[int], desde: int, atras: bool) -> Optional[int]:
+        """Elemento siguiente (o anterior) a 'desde' en una lista ordenada, dando la vuelta."""
+        if not lista:
+            return None
+        if atras:
+            j = bisect_left(lista, desde) - 1
+            return lista[j] # j == -1 da la vuelta al último
+        j = bisect_right(lista, desde)
+        return lista[j] if j < len(lista) else lista[0]
+
+    def maximo(self) -> int:
+        # Como mucho un valor distinto por exponente: recorrer las claves es O(1) en la práctica
+        return max(self.posiciones) if self.posiciones else 0
+
+    def cantidad(self, valor: int) -> int:
+        return len(self.posiciones.get(valor, ()))
+
+    def siguiente(self, valor: int, desde: Posicion, atras: bool = False) -> Optional[Posicion]:
+        """Siguiente celda con 'valor' tras 'desde' en orden de lectura (0: casilla libre)."""
+        i = self._siguiente_en(self.posiciones.get(valor, []), desde[0] * self.tamano + desde[1], atras)
+        return None if i is None else self._posicion(i)
+
+    def siguiente_par(self, desde: Posicion, atras: bool = False,
+                      orientacion: Optional[int] = None) -> Optional[Tuple[Posicion, Posicion]]:
+        """
+        Siguiente par de fichas iguales contiguas tras 'desde'. 'orientacion' es
+        la del par visitado que empieza en 'desde' (None: se saltan los dos).
+        """
+        i = desde[0] * self.tamano + desde[1]
+        if orientacion is None:
+            orientacion = HORIZONTAL if atras else VERTICAL
+        pivote = 2 * i + orientacion
+        clave = self._siguiente_en(self.pares, pivote, atras)
+        if clave is None:
+            return None
+        celda, orientacion = divmod(clave, 2)
+        r, c = self._posicion(celda)
+        return (r, c), ((r, c + 1) if orientacion == HORIZONTAL else (r + 1, c))
@@ -0,0 +1,273 @@
+"""
+Ajuste fuera de línea de los pesos de la sugerencia mediante autojuego.
+
+Por defecto ajusta los pesos de EvaluadorTablas, el evaluador con el que la
+búsqueda expectimax calcula las sugerencias (H), el libro de aperturas, el
+servidor y el análisis de partidas; cada partida se juega con esa búsqueda a
+un movimiento de profundidad. Con --heuristica rapida ajusta en su lugar la
+heurística de un movimiento de obtener_sugerencia, que solo se usa mientras
+no hay sugerencia precalculada y en el juego automático.
+
+Cada generación evalúa una población de candidatos jugando el mismo lote de
+partidas con semilla (números aleatorios comunes) en un pool de procesos y
+actualiza una estrategia evolutiva (mu/mu, lambda) con paso adaptativo por
+peso, una versión reducida de CMA-ES con covarianza diagonal. El estado se
+guarda tras cada generación para poder reanudar ejecuciones largas.
+
+Uso:
+    python tune_weights.py --generaciones 30 --partidas 16
+    python tune_weights.py --reanudar            # continúa desde el checkpoint
+
+Los pesos se añaden a hint_weights.json sin borrar los de la otra heurística.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from constants import ARCHIVO_PESOS, VALOR_VICTORIA
+from evaluator import PESOS_DEFECTO, EvaluadorTablas
+from game_logic import Logica2048, PESOS_SUGERENCIA_DEFECTO
+from hint_engine import buscar
+
+ARCHIVO_CHECKPOINT = "tune_weights.checkpoint.json"
+EVALUADOR = 'evaluador'
+RAPIDA = 'rapida'
+# (pesos por defecto, pesos ajustables). Las dos solo comparan movimientos
+# entre sí, así que un peso queda fijo y da la escala ('vacias' / 'puntos')
+HEURISTICAS: Dict[str, Tuple[Dict[str, float], Tuple[str, ...]]] = {
+    EVALUADOR: (PESOS_DEFECTO, ('fusiones', 'monotonicidad', 'suavidad')),
+    RAPIDA: (PESOS_SUGERENCIA_DEFECTO, ('libres', 'esquina')),
+}
+OBJETIVOS = ('puntuacion', 'victoria')
+MAX_MOVIMIENTOS_DEFECTO = 5000
+
+Resultado = Tuple[int, int] # (puntuación, ficha máxima)
+
+
+_evaluador_proceso: Optional[EvaluadorTablas] = None
+
+def _evaluador(pesos: Dict[str, float], tamano: int) -> EvaluadorTablas:
+    """La tabla se construye una vez por proceso y candidato, no por partida."""
+    global _evaluador_proceso
+    completos = dict(PESOS_DEFECTO, **pesos)
+    if (_evaluador_proceso is None or _evaluador_proceso.tamano != tamano
+            or _evaluador_proceso.pesos != completos):
+        _evaluador_proceso = EvaluadorTablas(tamano, completos)
+    return _evaluador_proceso
+
+
+def jugar_partida(pesos: Dict[str, float], semilla: int, tamano: int = 4,
+                  max_movimientos: int = MAX_MOVIMIENTOS_DEFECTO,
+                  heuristica: str = EVALUADOR) -> Resultado:
+    """Juega una partida sin UI ni disco siguiendo la heurística dada con los pesos dados."""
+    random.seed(semilla)
+    juego = Logica2048(tamano)
+    if heuristica == EVALUADOR:
+        evaluador = _evaluador(pesos, tamano)
+        elegir = lambda: buscar(juego.tablero, 1, evaluador).direccion
+    else:
+        juego.pesos_sugerencia = dict(PESOS_SUGERENCIA_DEFECTO, **pesos)
+        elegir = juego.obtener_sugerencia
+    for _ in range(max_movimientos):
+        direccion = elegir()
+        if direccion == "Ninguna" or not juego.mover(direccion, guardar=False):
+            break
+    return juego.puntuacion, juego.max_ficha
+
+
+def _jugar_lote(args: Tuple[Dict[str, float], Sequence[int], int, int, str]) -> List[Resultado]:
+    pesos, semillas, tamano, max_movimientos, heuristica = args
+    return [jugar_partida(pesos, s, tamano, max_movimientos, heuristica) for s in semillas]
+
+
+def aptitud(resultados: Sequence[Resultado], objetivo: str) -> float:
+    if not resultados:
+        return 0.0
+    if objetivo == 'victoria':
+        # Tasa de 2048 con la puntuación media como desempate
+        tasa = sum(1 for _, m in resultados if m >= VALOR_VICTORIA) / len(resultados)
+        return tasa + sum(p for p, _ in resultados) / len(resultados) * 1e-7
+    return sum(p for p, _ in resultados) / len(resultados)
+
+
+def a_pesos(x: Sequence[float], claves: Sequence[str]) -> Dict[str, float]:
+    """Los pesos se buscan en escala logarítmica para que sigan siendo positivos."""
+    return {clave: math.exp(v) for clave, v in zip(claves, x)}
+
+
+def guardar_json_atomico(ruta: str, datos: Dict[str, Any]) -> None:
+    temp = ruta + ".tmp"
+    with open(temp, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, indent=4)
+    os.replace(temp, ruta)
+
+
+class AjustadorPesos:
+    """
+    Estrategia evolutiva sobre el logaritmo de los pesos. Todo el estado es
+    serializable a JSON; el azar de cada generación se deriva de la semilla y
+    el número de generación, así que reanudar da el mismo resultado.
+    """
+    def __init__(self, semilla: int = 0, poblacion: int = 8, partidas: int = 16,
+                 objetivo: str = 'puntuacion', tamano: int = 4,
+                 max_movimientos: int = MAX_MOVIMIENTOS_DEFECTO,
+                 inicial: Optional[Dict[str, float]] = None, sigma: float = 0.5,
+                 heuristica: str = EVALUADOR):
+        if objetivo not in OBJETIVOS:
+            raise ValueError(f"Objetivo desconocido: {objetivo}")
+        if heuristica not in HEURISTICAS:
+            raise ValueError(f"Heurística desconocida: {heuristica}")
+        defecto, self.claves = HEURISTICAS[heuristica]
+        base = dict(defecto, **(inicial or {}))
+        self.heuristica = heuristica
+        self.semilla = semilla
+        self.poblacion = max(2, poblacion)
+        self.partidas = partidas
+        self.objetivo = objetivo
+        self.tamano = tamano
+        self.max_movimientos = max_movimientos
+        self.media: List[float] = [math.log(base[k]) for k in self.claves]
+        self.sigma: List[float] = [sigma] * len(self.claves)
+        self.generacion = 0
+        self.mejor: Optional[Dict[str, Any]] = None
+        self.historial: List[Dict[str, Any]] = []
+
+    # --- Persistencia ---
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'semilla': self.semilla, 'poblacion': self.poblacion, 'partidas': self.partidas,
+            'objetivo': self.objetivo, 'tamano': self.tamano, 'max_movimientos': self.max_movimientos,
+            'heuristica': self.heuristica, 'media': self.media, 'sigma': self.sigma, 'generacion': self.generacion,
+            'mejor': self.mejor, 'historial': self.historial,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AjustadorPesos":
+        # Los checkpoints sin 'heuristica' son de cuando solo se ajustaba la rápida
+        ajustador = cls(int(data['semilla']), int(data['poblacion']), int(data['partidas']),
+                        str(data['objetivo']), int(data['tamano']), int(data['max_movimientos']),
+                        heuristica=str(data.get('heuristica', RAPIDA)))
+        ajustador.media = [float(v) for v in data['media']]
+        ajustador.sigma = [float(v) for v in data['sigma']]
+        ajustador.generacion = int(data['generacion'])
+        ajustador.mejor = data.get('mejor')
+        ajustador.historial = list(data.get('historial', []))
+        return ajustador
+
+    def guardar(self, ruta: str) -> None:
+        guardar_json_atomico(ruta, self.to_dict())
+
+    @classmethod
+    def cargar(cls, ruta: str) -> "AjustadorPesos":
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    # --- Búsqueda ---
+    def muestrear(self) -> Tuple[List[List[float]], List[int]]:
+        """Candidatos y semillas de partida de la generación actual."""
+        rng = random.Random(f"{self.semilla}-{self.generacion}")
+        candidatos = [list(self.media)] # La media actual siempre compite
+        while len(candidatos) < self.poblacion:
+            candidatos.append([m + s * rng.gauss(0.0, 1.0) for m, s in zip(self.media, self.sigma)])
+        semillas = [rng.randrange(1 << 30) for _ in range(self.partidas)]
+        return candidatos, semillas
+
+    def actualizar(self, candidatos: List[List[float]], aptitudes: List[float]) -> None:
+        orden = sorted(range(len(candidatos)), key=lambda i: aptitudes[i], reverse=True)
+        elite = [candidatos[i] for i in orden[:max(1, len(candidatos) // 2)]]
+        # Recombinación con pesos logarítmicos decrecientes (como en CMA-ES)
+        w = [math.log(len(elite) + 0.5) - math.log(i + 1) for i in range(len(elite))]
+        suma_w = sum(w)
+        nueva_media = [sum(wi * x[j] for wi, x in zip(w, elite)) / suma_w for j in range(len(self.media))]
+        # Paso por coordenada: se adapta a la dispersión de la élite, sin colapsar del todo
+        nuevo_sigma = []
+        for j, s in enumerate(self.sigma):
+            var = sum(wi * (x[j] - self.media[j]) ** 2 for wi, x in zip(w, elite)) / suma_w
+            nuevo_sigma.append(max(0.02, 0.7 * s + 0.3 * math.sqrt(var)))
+        mejor_i = orden[0]
+        if self.mejor is None or aptitudes[mejor_i] > self.mejor['aptitud']:
+            self.mejor = {'pesos': a_pesos(candidatos[mejor_i], self.claves), 'aptitud': aptitudes[mejor_i],
+                          'generacion': self.generacion}
+        self.historial.append({'generacion': self.generacion, 'mejor': aptitudes[mejor_i],
+                               'media_poblacion': sum(aptitudes) / len(aptitudes)})
+        self.media = nueva_media
+        self.sigma = nuevo_sigma
+        self.generacion += 1
+
+    def generacion_siguiente(self, ejecutor: Optional[ProcessPoolExecutor] = None) -> float:
+        """Evalúa una generación (en el pool si se da) y devuelve la mejor aptitud."""
+        candidatos, semillas = self.muestrear()
+        tareas = [(a_pesos(x, self.claves), semillas, self.tamano, self.max_movimientos, self.heuristica)
+                  for x in candidatos]
+        if ejecutor is not None:
+            lotes = list(ejecutor.map(_jugar_lote, tareas))
+        else:
+            lotes = [_jugar_lote(t) for t in tareas]
+        aptitudes = [aptitud(lote, self.objetivo) for lote in lotes]
+        self.actualizar(candidatos, aptitudes)
+        return max(aptitudes)
+
+    def pesos_resultado(self) -> Dict[str, float]:
+        # La media de la distribución: el mejor individuo de una generación
+        # suele deber parte de su aptitud a las semillas de ese lote
+        return dict(HEURISTICAS[self.heuristica][0], **a_pesos(self.media, self.claves))
+
+
+def guardar_pesos(ruta: str, pesos: Dict[str, float]) -> None:
+    """Añade los pesos a los que ya haya en 'ruta' (la otra heurística conserva los suyos)."""
+    datos: Dict[str, Any] = {}
+    if os.path.exists(ruta):
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                leidos = json.load(f)
+            if isinstance(leidos, dict):
+                datos = leidos
+        except ValueError:
+            pass
+    datos.update(pesos)
+    guardar_json_atomico(ruta, datos)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ajuste de los pesos de sugerencia por autojuego")
+    parser.add_argument('--generaciones', type=int, default=20)
+    parser.add_argument('--poblacion', type=int, default=8)
+    parser.add_argument('--partidas', type=int, default=16, help="Partidas por candidato y generación")
+    parser.add_argument('--objetivo', choices=OBJETIVOS, default='puntuacion')
+    parser.add_argument('--heuristica', choices=tuple(HEURISTICAS), default=EVALUADOR,
+                        help="evaluador: el de la búsqueda de sugerencias; rapida: la de un movimiento")
+    parser.add_argument('--tamano', type=int, default=4)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--procesos', type=int, default=None, help="Procesos de autojuego (por defecto, uno por CPU)")
+    parser.add_argument('--checkpoint', default=ARCHIVO_CHECKPOINT)
+    parser.add_argument('--reanudar', action='store_true', help="Continúa desde el checkpoint si existe")
+    parser.add_argument('--salida', default=ARCHIVO_PESOS, help="Archivo de pesos que carga el juego")
+    args = parser.parse_args(argv)
+
+    if args.reanudar and os.path.exists(args.checkpoint):
+        ajustador = AjustadorPesos.cargar(args.checkpoint)
+        print(f"Reanudando en la generación {ajustador.generacion}")
+    else:
+        ajustador = AjustadorPesos(args.semilla, args.poblacion, args.partidas,
+                                   args.objetivo, args.tamano, heuristica=args.heuristica)
+
+    with ProcessPoolExecutor(max_workers=args.procesos) as ejecutor:
+        while ajustador.generacion < args.generaciones:
+            mejor = ajustador.generacion_siguiente(ejecutor)
+            ajustador.guardar(args.checkpoint)
+            pesos = a_pesos(ajustador.media, ajustador.claves)
+            print(f"Generación {ajustador.generacion}: mejor {mejor:.2f}, media "
+                  + ", ".join(f"{k}={v:.3f}" for k, v in pesos.items()))
+
+    guardar_pesos(args.salida, ajustador.pesos_resultado())
+    print(f"Pesos guardados en {args.salida}: {ajustador.pesos_resultado()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
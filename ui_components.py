@@ -1,18 +1,17 @@
 """Componentes UI accesibles para el tablero 2048."""
 import ctypes
-import logging
+from collections import OrderedDict
 
 import wx
 
-from constants import EVENT_OBJECT_NAMECHANGE, OBJID_CLIENT, CHILDID_SELF
+import event_log
+from constants import EVENT_OBJECT_FOCUS, EVENT_OBJECT_NAMECHANGE, OBJID_CLIENT, CHILDID_SELF
 
 user32 = ctypes.windll.user32
 # Define signature to avoid unwanted 64-bit expansion of negative args
 user32.NotifyWinEvent.argtypes = [ctypes.c_uint, ctypes.c_void_p, ctypes.c_long, ctypes.c_long]
 user32.NotifyWinEvent.restype = None
 
-logger = logging.getLogger("2048_Accesible")
-
 class AccessibleCustom(wx.Accessible):
     def __init__(self, win, name=""):
         super().__init__(win)
@@ -23,12 +22,151 @@ class AccessibleCustom(wx.Accessible):
             return wx.ACC_OK, self.name
         return wx.ACC_FALSE, ""
 
+class AtlasFichas:
+    """
+    LRU cache of pre-rendered tile bitmaps keyed by (value, width, height,
+    high contrast, focused). Each tile is drawn once and blitted afterwards.
+    """
+    RADIO = 8
+
+    def __init__(self, config, max_bytes=32 * 1024 * 1024):
+        self.COLORS = config['colores_fondo']
+        self.TEXT_DARK = config['color_texto_oscuro']
+        self.TEXT_LIGHT = config['color_texto_claro']
+        self.COLORS_TEXT_HC = config['high_contrast_colors']
+        self.max_bytes = max_bytes
+        self.bytes_usados = 0
+        self._bitmaps = OrderedDict()
+        self._fuentes = {}
+        self._tamano_actual = None
+        # Draft mode (window being resized): scale cached tiles instead of re-rendering
+        self.borrador = False
+        self._borradores = {}
+        self._tamano_borrador = None
+
+    def invalidar(self):
+        """Descarta todos los bitmaps (p. ej. tras cambiar la paleta)."""
+        self._bitmaps.clear()
+        self.bytes_usados = 0
+
+    def iniciar_borrador(self):
+        """Durante un redimensionado se sirven escalados de las fichas ya renderizadas."""
+        self.borrador = True
+
+    def finalizar_borrador(self):
+        """Vuelve a renderizar a calidad completa y descarta los escalados."""
+        self.borrador = False
+        self._borradores.clear()
+        self._tamano_borrador = None
+
+    def obtener(self, value, w, h, hc_mode, focused):
+        if self.borrador and self._tamano_actual is not None and (w, h) != self._tamano_actual:
+            return self._obtener_escalado(value, w, h, hc_mode, focused)
+        # All cells share one size: a new size makes every cached tile stale
+        if (w, h) != self._tamano_actual:
+            self._tamano_actual = (w, h)
+            self.invalidar()
+        clave = (value, w, h, hc_mode, focused)
+        bmp = self._bitmaps.get(clave)
+        if bmp is not None:
+            self._bitmaps.move_to_end(clave)
+            return bmp
+        bmp = self._renderizar(value, w, h, hc_mode, focused)
+        self._bitmaps[clave] = bmp
+        self.bytes_usados += w * h * 4
+        while self.bytes_usados > self.max_bytes and len(self._bitmaps) > 1:
+            (_, vw, vh, _, _), _ = self._bitmaps.popitem(last=False)
+            self.bytes_usados -= vw * vh * 4
+        return bmp
+
+    def _obtener_escalado(self, value, w, h, hc_mode, focused):
+        if (w, h) != self._tamano_borrador:
+            self._tamano_borrador = (w, h)
+            self._borradores.clear()
+        clave = (value, hc_mode, focused)
+        bmp = self._borradores.get(clave)
+        if bmp is None:
+            bw, bh = self._tamano_actual
+            base = self.obtener(value, bw, bh, hc_mode, focused)
+            bmp = base.ConvertToImage().Scale(w, h, wx.IMAGE_QUALITY_NORMAL).ConvertToBitmap()
+            self._borradores[clave] = bmp
+        return bmp
+
+    def _fuente(self, font_size):
+        font = self._fuentes.get(font_size)
+        if font is None:
+            # Modern system font (Segoe UI on Windows)
+            font = wx.Font(font_size, wx.FONTFAMILY_DEFAULT, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_BOLD, faceName="Segoe UI")
+            if not font.IsOk():
+                font = wx.Font(font_size, wx.FONTFAMILY_SWISS, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_BOLD)
+            self._fuentes[font_size] = font
+        return font
+
+    def _renderizar(self, value, w, h, hc_mode, focused):
+        bmp = wx.Bitmap(w, h)
+        dc = wx.MemoryDC(bmp)
+        radius = self.RADIO
+
+        # Background
+        if hc_mode:
+            # Black bg, Colored Text
+            txt_color = self.COLORS_TEXT_HC.get(value, (255, 255, 255))
+            if value == 0: txt_color = (0,0,0) # Invisible
+            dc.SetBackground(wx.Brush(wx.BLACK))
+            dc.Clear()
+            # HC Mode: Simple thick border
+            dc.SetPen(wx.Pen(wx.WHITE, 2))
+            dc.SetBrush(wx.TRANSPARENT_BRUSH)
+            dc.DrawRoundedRectangle(1, 1, w-2, h-2, radius)
+        else:
+            bg_color = self.COLORS.get(value, (60, 58, 50))
+            txt_color = self.TEXT_DARK if value <= 4 else self.TEXT_LIGHT
+            dc.SetBackground(wx.Brush(wx.Colour(*bg_color)))
+            dc.Clear()
+            # Subtle Shadow
+            dc.SetPen(wx.TRANSPARENT_PEN)
+            dc.SetBrush(wx.Brush(wx.Colour(0, 0, 0, 40))) # Very light shadow
+            dc.DrawRoundedRectangle(3, 3, w-4, h-4, radius)
+            # Main Background
+            dc.SetBrush(wx.Brush(wx.Colour(*bg_color)))
+            dc.DrawRoundedRectangle(0, 0, w-2, h-2, radius)
+
+        # Text Rendering
+        if value != 0:
+            # Dynamic Font Scaling based on cell height
+            base_size = h // 3
+            if value < 100:
+                font_size = base_size
+            elif value < 1000:
+                font_size = int(base_size * 0.8)
+            else:
+                font_size = int(base_size * 0.6)
+            if font_size < 8: font_size = 8 # Bottom limit
+
+            dc.SetFont(self._fuente(font_size))
+            dc.SetTextForeground(wx.Colour(*txt_color))
+            txt = str(value)
+            tw, th = dc.GetTextExtent(txt)
+            # Center precisely
+            dc.DrawText(txt, (w - tw) // 2, (h - th) // 2)
+
+        # Focus Ring
+        if focused:
+            focus_color = wx.Colour(0, 120, 255) if not hc_mode else wx.Colour(255, 255, 0)
+            dc.SetPen(wx.Pen(focus_color, 4))
+            dc.SetBrush(wx.TRANSPARENT_BRUSH)
+            # Focus ring with slightly larger padding for style
+            dc.DrawRoundedRectangle(2, 2, w-4, h-4, radius)
+
+        dc.SelectObject(wx.NullBitmap)
+        return bmp
+
 class Celda(wx.Panel):
     """
     Accessible UI component representing a single tile on the 2048 board.
     Handles custom painting with shadows, focus rings, and WinAPI accessibility events.
     """
-    def __init__(self, parent, size, r, c, config):
+    def __init__(self, parent, size, r, c, config, atlas=None):
         """Initializes the cell with position and color configuration."""
         super().__init__(parent, size=(size, size))
         self.r = r
@@ -37,12 +175,17 @@ class Celda(wx.Panel):
         self.acc_name = ""
         self.is_focused = False
         self.hc_mode = False
+        # Animación: la celda se pinta vacía y encima las fichas que pasan por ella
+        self.oculta = False
+        self.superpuestas = [] # [(valor, dx, dy)] en píxeles respecto a la celda
         
         self.COLORS = config['colores_fondo']
         self.COLORS_HC = config['colores_fondo_hc']
         self.TEXT_DARK = config['color_texto_oscuro']
         self.TEXT_LIGHT = config['color_texto_claro']
         self.COLORS_TEXT_HC = config['high_contrast_colors']
+        # Shared tile atlas; a standalone cell gets its own
+        self.atlas = atlas if atlas is not None else AtlasFichas(config)
         
         self.SetBackgroundStyle(wx.BG_STYLE_PAINT)
         self.Bind(wx.EVT_PAINT, self.on_paint)
@@ -56,6 +199,8 @@ class Celda(wx.Panel):
         return self.acc_name if self.acc_name else ""
 
     def actualizar(self, value, nombre_accesible, notify=False, force_notify=False, hc_mode=None):
+        # Only repaint when something visible changed; name-only updates are free
+        repintar = value != self.value or (hc_mode is not None and hc_mode != self.hc_mode)
         self.value = value
         if hc_mode is not None:
             self.hc_mode = hc_mode
@@ -73,98 +218,255 @@ class Celda(wx.Panel):
             # Si 'changed' es True pero no tiene el foco, actualizamos el nombre interno
             # pero NO lanzamos el evento WinAPI para evitar lecturas dobles/no deseadas.
             if (changed and notify) or force_notify:
-                 # Clean name for log
-                 nombre_log = str(self.acc_name).rstrip()
-                 logger.info(f"[WINAPI_NOTIFY] Cell {self.r},{self.c} - Name: {nombre_log} - Force: {force_notify}")
+                 event_log.registrar("WINAPI_NOTIFY", "Cell %d,%d - Name: %s - Force: %s",
+                                     self.r, self.c, self.acc_name, force_notify)
                  user32.NotifyWinEvent(EVENT_OBJECT_NAMECHANGE, self.GetHandle(), OBJID_CLIENT, CHILDID_SELF)
         
-        self.Refresh()
+        if repintar:
+            self.Refresh()
+
+    def fijar_contraste(self, hc_mode):
+        """Cambia la paleta de la celda y la repinta solo si es distinta."""
+        if hc_mode != self.hc_mode:
+            self.hc_mode = hc_mode
+            self.Refresh()
+
+    def fijar_animacion(self, oculta, superpuestas):
+        if oculta != self.oculta or superpuestas != self.superpuestas:
+            self.oculta = oculta
+            self.superpuestas = superpuestas
+            self.Refresh()
 
     def on_paint(self, event):
-        dc = wx.AutoBufferedPaintDC(self)
-        
-        # Determine Check Parent High Contrast logic?
-        # Ideally passed in params or checked from parent.
-        # But we don't have direct access to 'parent.alto_contraste' easily without coupling.
-        # Let's check a property or method if exists
-        
-        hc_mode = self.hc_mode
+        dc = wx.PaintDC(self)
+        w, h = self.GetSize()
+        if w <= 0 or h <= 0:
+            return
+        # The atlas renders each (value, size, palette, focus) tile only once
+        bmp = self.atlas.obtener(0 if self.oculta else self.value, w, h, self.hc_mode, self.is_focused)
+        dc.DrawBitmap(bmp, 0, 0)
+        # Moving tiles are clipped to the panel; each one is blitted from the atlas
+        for valor, dx, dy in self.superpuestas:
+            dc.DrawBitmap(self.atlas.obtener(valor, w, h, self.hc_mode, False), dx, dy)
 
-        # Background
-        if hc_mode:
-            # Black bg, Colored Text
-            bg_color = (0,0,0)
-            dc.SetBackground(wx.Brush(wx.Colour(*bg_color)))
-            
-            # Text Color based on value map
-            val_idx = self.value
-            txt_color = self.COLORS_TEXT_HC.get(val_idx, (255, 255, 255))
-            if self.value == 0: txt_color = (0,0,0) # Invisible
-            
+
+class AccessibleTablero(wx.Accessible):
+    """
+    Accessible object for TableroCanvas. Each tile is exposed as a simple
+    child element with ID r * tamano + c + 1 (0 is the board itself).
+    """
+    def __init__(self, tablero):
+        super().__init__(tablero)
+        self.tablero = tablero
+
+    def _celda(self, childId):
+        if 1 <= childId <= len(self.tablero.lista_celdas):
+            return self.tablero.lista_celdas[childId - 1]
+        return None
+
+    def GetChildCount(self):
+        return wx.ACC_OK, len(self.tablero.lista_celdas)
+
+    def GetChild(self, childId):
+        if childId == wx.ACC_SELF:
+            return wx.ACC_OK, self
+        # Simple elements: no accessible object of their own
+        return wx.ACC_OK, None
+
+    def GetParent(self):
+        return wx.ACC_NOT_IMPLEMENTED, None
+
+    def GetName(self, childId):
+        if childId == wx.ACC_SELF:
+            return wx.ACC_OK, "Tablero"
+        celda = self._celda(childId)
+        if celda is None:
+            return wx.ACC_FALSE, ""
+        return wx.ACC_OK, celda.acc_name
+
+    def GetRole(self, childId):
+        if childId == wx.ACC_SELF:
+            return wx.ACC_OK, wx.ROLE_SYSTEM_TABLE
+        return wx.ACC_OK, wx.ROLE_SYSTEM_CELL
+
+    def GetState(self, childId):
+        if childId == wx.ACC_SELF:
+            return wx.ACC_OK, wx.ACC_STATE_SYSTEM_FOCUSABLE
+        estado = wx.ACC_STATE_SYSTEM_FOCUSABLE | wx.ACC_STATE_SYSTEM_SELECTABLE
+        celda = self._celda(childId)
+        if celda is not None and celda.is_focused:
+            estado |= wx.ACC_STATE_SYSTEM_FOCUSED | wx.ACC_STATE_SYSTEM_SELECTED
+        return wx.ACC_OK, estado
+
+    def GetFocus(self):
+        if not self.tablero.HasFocus():
+            return wx.ACC_FALSE, 0, None
+        return wx.ACC_OK, self.tablero.foco_id, None
+
+    def GetLocation(self, elementId):
+        if elementId == wx.ACC_SELF:
+            rect = self.tablero.GetClientRect()
         else:
-            bg_color = self.COLORS.get(self.value, (60, 58, 50))
-            dc.SetBackground(wx.Brush(wx.Colour(*bg_color)))
-            
-            if self.value <= 4:
-                txt_color = self.TEXT_DARK
-            else:
-                txt_color = self.TEXT_LIGHT
-        
-        dc.Clear()
-        
-        sz = self.GetSize()
-        w, h = sz.width, sz.height
-        radius = 8
-        
-        if not hc_mode:
-            # Subtle Shadow
-            dc.SetPen(wx.TRANSPARENT_PEN)
-            dc.SetBrush(wx.Brush(wx.Colour(0, 0, 0, 40))) # Very light shadow
-            dc.DrawRoundedRectangle(3, 3, w-4, h-4, radius)
-            
-            # Main Background
-            dc.SetBrush(wx.Brush(wx.Colour(*bg_color)))
-            dc.DrawRoundedRectangle(0, 0, w-2, h-2, radius)
+            celda = self._celda(elementId)
+            if celda is None:
+                return wx.ACC_FALSE, wx.Rect()
+            rect = self.tablero.rect_celda(celda.r, celda.c)
+        origen = self.tablero.ClientToScreen(rect.GetPosition())
+        return wx.ACC_OK, wx.Rect(origen, rect.GetSize())
+
+    def HitTest(self, pt):
+        pos = self.tablero.ScreenToClient(pt)
+        celda = self.tablero.celda_en(pos.x, pos.y)
+        if celda is None:
+            return wx.ACC_OK, wx.ACC_SELF, None
+        return wx.ACC_OK, celda.child_id, None
+
+class CeldaVirtual:
+    """
+    Lightweight stand-in for Celda on a TableroCanvas. Exposes the same
+    interface (actualizar, SetFocus, is_focused, Refresh) without a native window.
+    """
+    __slots__ = ('tablero', 'r', 'c', 'child_id', 'value', 'acc_name', 'is_focused', 'hc_mode',
+                 'oculta', 'superpuestas')
+
+    def __init__(self, tablero, r, c):
+        self.tablero = tablero
+        self.r = r
+        self.c = c
+        self.child_id = r * tablero.tamano + c + 1
+        self.value = 0
+        self.acc_name = ""
+        self.is_focused = False
+        self.hc_mode = False
+        self.oculta = False
+        self.superpuestas = []
+
+    def actualizar(self, value, nombre_accesible, notify=False, force_notify=False, hc_mode=None):
+        repintar = value != self.value or (hc_mode is not None and hc_mode != self.hc_mode)
+        self.value = value
+        if hc_mode is not None:
+            self.hc_mode = hc_mode
+
+        changed = nombre_accesible != self.acc_name
+        self.acc_name = nombre_accesible
+
+        # Same rule as Celda: only the focused child (or a forced repeat) notifies
+        if ((changed and notify) or force_notify) and self.tablero.GetHandle():
+            event_log.registrar("WINAPI_NOTIFY", "Cell %d,%d - Name: %s - Force: %s",
+                                self.r, self.c, self.acc_name, force_notify)
+            self.tablero.notificar(EVENT_OBJECT_NAMECHANGE, self.child_id)
+
+        if repintar:
+            self.Refresh()
+
+    def fijar_contraste(self, hc_mode):
+        if hc_mode != self.hc_mode:
+            self.hc_mode = hc_mode
+            self.Refresh()
+
+    def fijar_animacion(self, oculta, superpuestas):
+        if oculta != self.oculta or superpuestas != self.superpuestas:
+            self.oculta = oculta
+            self.superpuestas = superpuestas
+            self.Refresh()
+
+    def Update(self):
+        self.tablero.Update()
+
+    def SetFocus(self):
+        self.tablero.fijar_foco_virtual(self)
+
+    def Refresh(self):
+        self.tablero.RefreshRect(self.tablero.rect_celda(self.r, self.c), eraseBackground=False)
+
+class TableroCanvas(wx.Panel):
+    """
+    Single double-buffered window that draws the whole board from the tile
+    atlas. Alternative to a grid of Celda panels for large boards: one HWND,
+    one paint handler and one accessible object with virtual children.
+    """
+    SEPARACION = 10 # Same spacing as the GridSizer layout
+    MARGEN_CELDA = 2
+
+    def __init__(self, parent, tamano, config, atlas, color_fondo):
+        super().__init__(parent, style=wx.WANTS_CHARS)
+        self.tamano = tamano
+        self.atlas = atlas
+        self.color_fondo = wx.Colour(*color_fondo)
+        self.celdas = [[CeldaVirtual(self, r, c) for c in range(tamano)] for r in range(tamano)]
+        self.lista_celdas = [celda for fila in self.celdas for celda in fila]
+        self.foco_id = 1
+
+        self.SetBackgroundStyle(wx.BG_STYLE_PAINT)
+        self.Bind(wx.EVT_PAINT, self.on_paint)
+        self.Bind(wx.EVT_SIZE, self.on_size)
+        self.Bind(wx.EVT_SET_FOCUS, self.on_set_focus)
+
+        self.accessible_obj = AccessibleTablero(self)
+        self.SetAccessible(self.accessible_obj)
+
+    def AcceptsFocus(self):
+        return True
+
+    def _paso(self):
+        w, h = self.GetClientSize()
+        sep = self.SEPARACION
+        return (w - sep * (self.tamano - 1)) / self.tamano, (h - sep * (self.tamano - 1)) / self.tamano
+
+    def rect_celda(self, r, c):
+        pw, ph = self._paso()
+        m = self.MARGEN_CELDA
+        x = int(c * (pw + self.SEPARACION))
+        y = int(r * (ph + self.SEPARACION))
+        return wx.Rect(x + m, y + m, max(int(pw) - 2 * m, 0), max(int(ph) - 2 * m, 0))
+
+    def celda_en(self, x, y):
+        pw, ph = self._paso()
+        if pw <= 0 or ph <= 0:
+            return None
+        c = int(x // (pw + self.SEPARACION))
+        r = int(y // (ph + self.SEPARACION))
+        if 0 <= r < self.tamano and 0 <= c < self.tamano and self.rect_celda(r, c).Contains(x, y):
+            return self.celdas[r][c]
+        return None
+
+    def notificar(self, evento, child_id):
+        user32.NotifyWinEvent(evento, self.GetHandle(), OBJID_CLIENT, child_id)
+
+    def fijar_foco_virtual(self, celda):
+        self.foco_id = celda.child_id
+        if not self.HasFocus():
+            # on_set_focus announces the virtual child
+            self.SetFocus()
         else:
-            # HC Mode: Simple thick border
-            dc.SetBackground(wx.Brush(wx.BLACK))
-            dc.Clear()
-            dc.SetPen(wx.Pen(wx.WHITE, 2))
-            dc.SetBrush(wx.TRANSPARENT_BRUSH)
-            dc.DrawRoundedRectangle(1, 1, w-2, h-2, radius)
+            self.notificar(EVENT_OBJECT_FOCUS, self.foco_id)
 
-        # Text Rendering
-        if self.value != 0:
-            # Dynamic Font Scaling based on cell height
-            base_size = h // 3
-            if self.value < 100:
-                font_size = base_size
-            elif self.value < 1000:
-                font_size = int(base_size * 0.8)
-            else:
-                font_size = int(base_size * 0.6)
-            
-            if font_size < 8: font_size = 8 # Bottom limit
-            # Modern system font (Segoe UI on Windows)
-            font = wx.Font(font_size, wx.FONTFAMILY_DEFAULT, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_BOLD, faceName="Segoe UI")
-            if not font.IsOk():
-                font = wx.Font(font_size, wx.FONTFAMILY_SWISS, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_BOLD)
-            
-            dc.SetFont(font)
-            dc.SetTextForeground(wx.Colour(*txt_color))
-            
-            txt = str(self.value)
-            tw, th = dc.GetTextExtent(txt)
-            
-            # Center precisely
-            tx = (w - tw) // 2
-            ty = (h - th) // 2
-            dc.DrawText(txt, tx, ty)
-            
-        # Focus Ring
-        if self.is_focused:
-            focus_color = wx.Colour(0, 120, 255) if not hc_mode else wx.Colour(255, 255, 0)
-            dc.SetPen(wx.Pen(focus_color, 4))
-            dc.SetBrush(wx.TRANSPARENT_BRUSH)
-            # Focus ring with slightly larger padding for style
-            dc.DrawRoundedRectangle(2, 2, w-4, h-4, radius)
+    def on_set_focus(self, event):
+        self.notificar(EVENT_OBJECT_FOCUS, self.foco_id)
+        event.Skip()
+
+    def on_size(self, event):
+        self.Refresh(eraseBackground=False)
+        event.Skip()
+
+    def on_paint(self, event):
+        dc = wx.AutoBufferedPaintDC(self)
+        dc.SetBackground(wx.Brush(self.color_fondo))
+        dc.Clear()
+        region = self.GetUpdateRegion()
+        for celda in self.lista_celdas:
+            rect = self.rect_celda(celda.r, celda.c)
+            if rect.width <= 0 or rect.height <= 0:
+                continue
+            if region.Contains(rect) == wx.OutRegion:
+                continue
+            valor = 0 if celda.oculta else celda.value
+            bmp = self.atlas.obtener(valor, rect.width, rect.height, celda.hc_mode, celda.is_focused)
+            dc.DrawBitmap(bmp, rect.x, rect.y)
+            if celda.superpuestas:
+                # Same clipping as a Celda panel: a moving tile only shows inside the cells it covers
+                dc.SetClippingRegion(rect)
+                for v, dx, dy in celda.superpuestas:
+                    bmp = self.atlas.obtener(v, rect.width, rect.height, celda.hc_mode, False)
+                    dc.DrawBitmap(bmp, rect.x + dx, rect.y + dy)
+                dc.DestroyClippingRegion()
@@ -0,0 +1,223 @@
+"""
+Entorno vectorizado (estilo Gym) para entrenar modelos contra el motor.
+
+EntornoVectorial lleva B partidas sin interfaz ni disco en un único
+bytearray de exponentes (partida, fila, columna). reset() y step() devuelven
+siempre las mismas vistas sobre ese estado, sin copiarlo: arrays de NumPy
+(np.frombuffer) si está instalado o memoryview con forma si no. Las reglas
+y el consumo del generador aleatorio son los de Logica2048 y SesionCompacta,
+pero cada partida tiene su propio random.Random, así que una semilla
+reproduce exactamente la misma partida independientemente del lote.
+
+Acciones: índices de DIRECCIONES (0 izquierda, 1 derecha, 2 arriba, 3 abajo).
+
+    python vector_env.py --entornos 256 --pasos 500   # pasos por segundo
+"""
+import argparse
+import random
+import sys
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from compact_session import lineas_tablero
+from game_logic import DIRECCIONES
+
+try:
+    import numpy as np
+except ImportError: # Opcional: sin NumPy las vistas son memoryview
+    np = None
+
+Semillas = Union[None, int, Sequence[Any]]
+
+
+class EntornoVectorial:
+    """
+    'num' partidas de 'tamano' x 'tamano'. Con auto_reiniciar, una partida que
+    termina empieza otra en el mismo paso (su tablero final queda en
+    info['observacion_final']).
+    """
+    def __init__(self, num: int, tamano: int = 4, auto_reiniciar: bool = True):
+        if num < 1 or tamano < 2:
+            raise ValueError("Hacen falta al menos 1 partida de 2x2")
+        self.num = num
+        self.tamano = tamano
+        self.auto_reiniciar = auto_reiniciar
+        celdas = tamano * tamano
+        self._celdas = celdas
+        self._lineas = [lineas_tablero(tamano, d) for d in DIRECCIONES]
+
+        # Estado y salidas: buffers fijos; las vistas se crean una vez y no se copian
+        self.estado = bytearray(num * celdas)
+        self.finales = bytearray(num * celdas) # Tablero final de las partidas reiniciadas
+        self.recompensas = array('i', bytes(4 * num))
+        self.terminados = bytearray(num)
+        self.validos = bytearray(num)
+        self.puntuaciones = array('q', bytes(8 * num))
+        self.movimientos = array('q', bytes(8 * num))
+        self.rngs: List[random.Random] = [random.Random(i) for i in range(num)]
+
+        forma = (num, tamano, tamano)
+        self.observacion = self._vista(self.estado, 'uint8', forma)
+        self.observacion_final = self._vista(self.finales, 'uint8', forma)
+        self._vista_recompensas = self._vista(self.recompensas, 'int32', (num,))
+        self._vista_terminados = self._vista(self.terminados, 'bool', (num,))
+        self._vista_validos = self._vista(self.validos, 'bool', (num,))
+
+    @staticmethod
+    def _vista(buffer, dtype: str, forma: Tuple[int, ...]):
+        if np is not None:
+            return np.frombuffer(buffer, dtype=dtype).reshape(forma)
+        # Las vistas con varias dimensiones solo se piden sobre bytearray
+        return memoryview(buffer).cast('B', forma) if len(forma) > 1 else memoryview(buffer)
+
+    # --- API ---
+    def reset(self, seed: Semillas = None):
+        """
+        Reinicia todas las partidas. 'seed': un entero (la partida i usa
+        '{seed}-{i}'), una secuencia con una semilla por partida o None.
+        """
+        if seed is None:
+            semillas: Sequence[Any] = [random.random() for _ in range(self.num)]
+        elif isinstance(seed, int):
+            semillas = [f"{seed}-{i}" for i in range(self.num)]
+        else:
+            semillas = list(seed)
+            if len(semillas) != self.num:
+                raise ValueError(f"Se esperaban {self.num} semillas")
+        self.rngs = [random.Random(s) for s in semillas]
+        for i in range(self.num):
+            self._reiniciar(i)
+            self.terminados[i] = 0
+            self.recompensas[i] = 0
+            self.validos[i] = 0
+        return self.observacion
+
+    def step(self, acciones: Sequence[int]):
+        """
+        Aplica una acción por partida. Devuelve (observaciones, recompensas,
+        terminados, info); recompensa = puntos de la jugada (0 si no mueve nada).
+        """
+        if len(acciones) != self.num:
+            raise ValueError(f"Se esperaban {self.num} acciones")
+        reiniciadas = []
+        for i in range(self.num):
+            if self.terminados[i]:
+                if not self.auto_reiniciar:
+                    self.recompensas[i] = 0
+                    self.validos[i] = 0
+                    continue
+                self.terminados[i] = 0
+            puntos = self._mover(i, int(acciones[i]))
+            self.validos[i] = puntos >= 0
+            self.recompensas[i] = max(puntos, 0)
+            if puntos >= 0 and self._terminado(i):
+                self.terminados[i] = 1
+                if self.auto_reiniciar:
+                    base = i * self._celdas
+                    self.finales[base:base + self._celdas] = self.estado[base:base + self._celdas]
+                    reiniciadas.append((i, self.puntuaciones[i], self.movimientos[i]))
+                    self._reiniciar(i)
+        info: Dict[str, Any] = {
+            'validos': self._vista_validos,
+            'observacion_final': self.observacion_final,
+            # (partida, puntuación final, movimientos) de las que terminaron en este paso
+            'reiniciadas': reiniciadas,
+        }
+        return self.observacion, self._vista_recompensas, self._vista_terminados, info
+
+    # --- Reglas (mismas que SesionCompacta) ---
+    def _agregar_ficha(self, i: int) -> None:
+        base = i * self._celdas
+        estado = self.estado
+        libres = [k for k in range(self._celdas) if not estado[base + k]]
+        if libres:
+            rng = self.rngs[i]
+            k = rng.choice(libres)
+            estado[base + k] = 2 if rng.random() > 0.9 else 1
+
+    def _reiniciar(self, i: int) -> None:
+        base = i * self._celdas
+        self.estado[base:base + self._celdas] = bytes(self._celdas)
+        self.puntuaciones[i] = 0
+        self.movimientos[i] = 0
+        self._agregar_ficha(i)
+        self._agregar_ficha(i)
+
+    def _mover(self, i: int, accion: int) -> int:
+        """Puntos de la jugada, o -1 si no cambia nada."""
+        estado = self.estado
+        base = i * self._celdas
+        puntos = 0
+        cambio = False
+        for linea in self._lineas[accion]:
+            fichas = [estado[base + k] for k in linea if estado[base + k]]
+            j = 0
+            t = 0
+            while t < len(fichas):
+                e = fichas[t]
+                if t + 1 < len(fichas) and fichas[t + 1] == e:
+                    e += 1
+                    puntos += 1 << e
+                    t += 2
+                else:
+                    t += 1
+                k = base + linea[j]
+                if estado[k] != e:
+                    estado[k] = e
+                    cambio = True
+                j += 1
+            for pos in linea[j:]:
+                if estado[base + pos]:
+                    estado[base + pos] = 0
+                    cambio = True
+        if not cambio:
+            return -1
+        self.puntuaciones[i] += puntos
+        self.movimientos[i] += 1
+        self._agregar_ficha(i)
+        return puntos
+
+    def _terminado(self, i: int) -> bool:
+        estado = self.estado
+        base = i * self._celdas
+        n = self.tamano
+        if 0 in estado[base:base + self._celdas]:
+            return False
+        for r in range(n):
+            for c in range(n):
+                e = estado[base + r * n + c]
+                if c + 1 < n and estado[base + r * n + c + 1] == e:
+                    return False
+                if r + 1 < n and estado[base + (r + 1) * n + c] == e:
+                    return False
+        return True
+
+
+def medir_pasos_por_segundo(num: int, pasos: int, tamano: int = 4, semilla: int = 0) -> float:
+    """Pasos de partida por segundo (num partidas x pasos) con acciones aleatorias."""
+    entorno = EntornoVectorial(num, tamano)
+    entorno.reset(semilla)
+    rng = random.Random(semilla)
+    lotes = [[rng.randrange(len(DIRECCIONES)) for _ in range(num)] for _ in range(pasos)]
+    inicio = time.perf_counter()
+    for acciones in lotes:
+        entorno.step(acciones)
+    return num * pasos / (time.perf_counter() - inicio)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rendimiento del entorno vectorizado")
+    parser.add_argument('--entornos', type=int, default=256)
+    parser.add_argument('--pasos', type=int, default=500)
+    parser.add_argument('--tamano', type=int, default=4)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args(argv)
+    pps = medir_pasos_por_segundo(args.entornos, args.pasos, args.tamano, args.semilla)
+    vistas = "NumPy" if np is not None else "memoryview"
+    print(f"{args.entornos} partidas x {args.pasos} pasos: {pps:,.0f} pasos/s (vistas {vistas})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
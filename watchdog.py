@@ -0,0 +1,151 @@
+"""
+Vigilante de bloqueos del hilo de la interfaz.
+
+Un hilo aparte envía un latido al bucle de eventos (wx.CallAfter) y espera
+la respuesta. Si tarda más que el umbral, el bucle está bloqueado: mientras
+dure, se toman muestras de la pila del hilo principal con
+sys._current_frames() y, al volver la respuesta, se guarda el bloqueo (su
+duración y los marcos más frecuentes en las muestras) como una línea JSON
+en ui_stalls.log. Las muestras solo se toman durante un bloqueo, así que
+con la interfaz fluida el coste es un latido cada LATIDO_S.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import event_log
+from constants import ARCHIVO_BLOQUEOS
+
+UMBRAL_BLOQUEO_S = 0.05
+LATIDO_S = 0.05
+MUESTREO_S = 0.005
+MARCOS_INFORME = 8 # Marcos calientes que se guardan por bloqueo
+
+
+class Bloqueo(NamedTuple):
+    inicio: float # time.time() del latido sin respuesta
+    duracion: float
+    muestras: int
+    propias: List[Tuple[str, int]] # Marco en la cima de la pila -> muestras
+    acumuladas: List[Tuple[str, int]] # Marco en cualquier punto de la pila -> muestras
+
+
+def describir_marco(marco) -> str:
+    codigo = marco.f_code
+    return f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{marco.f_lineno})"
+
+
+class VigilanteUI:
+    """
+    'programar' encola una función en el bucle de eventos vigilado (en la
+    aplicación, wx.CallAfter). Se crea y se inicia desde ese mismo hilo.
+    """
+    def __init__(self, programar: Callable[[Callable[[], None]], None],
+                 ruta: Optional[str] = ARCHIVO_BLOQUEOS, umbral: float = UMBRAL_BLOQUEO_S,
+                 latido: float = LATIDO_S, muestreo: float = MUESTREO_S):
+        self.programar = programar
+        self.ruta = ruta
+        self.umbral = umbral
+        self.latido = latido
+        self.muestreo = muestreo
+        self.id_hilo = threading.get_ident()
+        self.bloqueos = 0
+        self.peor: Optional[Bloqueo] = None
+        self._respuesta = threading.Event()
+        self._hora_respuesta = 0.0
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def iniciar(self) -> None:
+        if self._hilo is None:
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._vigilar, name="VigilanteUI", daemon=True)
+            self._hilo.start()
+
+    def detener(self) -> None:
+        self._detener.set()
+        self._respuesta.set() # Despierta un muestreo en curso
+        if self._hilo is not None:
+            self._hilo.join(timeout=1.0)
+            self._hilo = None
+
+    def _responder(self) -> None:
+        # Se ejecuta en el hilo vigilado cuando el bucle de eventos llega al latido
+        self._hora_respuesta = time.perf_counter()
+        self._respuesta.set()
+
+    def _vigilar(self) -> None:
+        while not self._detener.is_set():
+            self._respuesta.clear()
+            enviado = time.perf_counter()
+            inicio = time.time()
+            try:
+                self.programar(self._responder)
+            except Exception:
+                return # El bucle de eventos ya no existe (cierre)
+            if not self._respuesta.wait(self.umbral):
+                propias, acumuladas, muestras = self._muestrear()
+                if self._detener.is_set():
+                    return
+                self._registrar(Bloqueo(inicio, self._hora_respuesta - enviado, muestras,
+                                        propias.most_common(MARCOS_INFORME),
+                                        acumuladas.most_common(MARCOS_INFORME)))
+            self._detener.wait(self.latido)
+
+    def _muestrear(self) -> Tuple[Counter, Counter, int]:
+        """Muestras de la pila del hilo vigilado hasta que responda al latido."""
+        propias: Counter = Counter()
+        acumuladas: Counter = Counter()
+        muestras = 0
+        while not self._respuesta.wait(self.muestreo):
+            marco = sys._current_frames().get(self.id_hilo)
+            if marco is None:
+                continue
+            muestras += 1
+            propias[describir_marco(marco)] += 1
+            # Una recursión cuenta una vez por muestra. Del más interno al más
+            # externo: a igualdad de muestras, most_common da primero el más concreto
+            vistos: Dict[str, None] = {}
+            while marco is not None:
+                vistos[describir_marco(marco)] = None
+                marco = marco.f_back
+            acumuladas.update(vistos.keys())
+        return propias, acumuladas, muestras
+
+    def _registrar(self, bloqueo: Bloqueo) -> None:
+        with self._lock:
+            self.bloqueos += 1
+            if self.peor is None or bloqueo.duracion > self.peor.duracion:
+                self.peor = bloqueo
+        event_log.registrar("STALL", "Interfaz bloqueada %.0f ms en %s", bloqueo.duracion * 1000,
+                            bloqueo.propias[0][0] if bloqueo.propias else "?")
+        if self.ruta is None:
+            return
+        datos = {
+            'ts': round(bloqueo.inicio, 3),
+            'duracion_ms': round(bloqueo.duracion * 1000, 1),
+            'muestras': bloqueo.muestras,
+            'propias': bloqueo.propias,
+            'acumuladas': bloqueo.acumuladas,
+        }
+        try:
+            with open(self.ruta, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(datos, ensure_ascii=False, separators=(',', ':')) + "\n")
+        except OSError as e:
+            logging.error(f"Error escribiendo {self.ruta}: {e}")
+
+    def resumen(self) -> str:
+        with self._lock:
+            bloqueos, peor = self.bloqueos, self.peor
+        if not bloqueos:
+            return "Sin bloqueos de la interfaz en esta sesión"
+        texto = f"{bloqueos} bloqueos de la interfaz. El peor, {peor.duracion * 1000:.0f} milisegundos"
+        if peor.propias:
+            texto += f" en {peor.propias[0][0]}"
+        return texto